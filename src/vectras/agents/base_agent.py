@@ -287,31 +287,19 @@ The bug was fixed by changing the division from `n1 / 0` to `n1 / n2` and adding
     ) -> QueryResponse:
         """Hand off a task to another agent."""
         try:
-            # Get target agent config to find its port
-            target_config = get_agent_config(target_agent_id)
-            if not target_config or not target_config.port:
-                raise ValueError(
-                    f"Target agent {target_agent_id} not found or has no port configured"
-                )
-
-            url = f"http://localhost:{target_config.port}/query"
-            request_data = {"query": query, "context": context or {}}
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url, json=request_data, timeout=self.config.settings.handoff_timeout or 30
-                )
-                response.raise_for_status()
+            response = await handoff_to_agent(
+                target_agent_id, query, context, self.config.settings.handoff_timeout or 30
+            )
 
-                self.log_activity(
-                    "handoff",
-                    {
-                        "target_agent": target_agent_id,
-                        "query": query[:100] + "..." if len(query) > 100 else query,
-                    },
-                )
+            self.log_activity(
+                "handoff",
+                {
+                    "target_agent": target_agent_id,
+                    "query": query[:100] + "..." if len(query) > 100 else query,
+                },
+            )
 
-                return QueryResponse(**response.json())
+            return response
 
         except Exception as e:
             self.error_count += 1
@@ -323,6 +311,30 @@ The bug was fixed by changing the division from `n1 / 0` to `n1 / n2` and adding
         return determine_response_type(self.agent_id, query, response)
 
 
+async def handoff_to_agent(
+    target_agent_id: str,
+    query: str,
+    context: Optional[Dict[str, Any]] = None,
+    timeout: float = 30,
+) -> QueryResponse:
+    """Send a query to another agent's /query endpoint and return its response.
+
+    Shared by BaseAgent and the agents built on the OpenAI Agents SDK.
+    """
+    # Get target agent config to find its port
+    target_config = get_agent_config(target_agent_id)
+    if not target_config or not target_config.port:
+        raise ValueError(f"Target agent {target_agent_id} not found or has no port configured")
+
+    url = f"http://localhost:{target_config.port}/query"
+    request_data = {"query": query, "context": context or {}}
+
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, json=request_data, timeout=timeout)
+        response.raise_for_status()
+        return QueryResponse(**response.json())
+
+
 def determine_response_type(agent_id: str, query: str, response: Any) -> str:
     """Determine the response type based on the agent, query and response content.
 
@@ -18,6 +18,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from ..utils.file_cache import file_cache
+from ..utils.files import DEFAULT_MAX_BYTES
 from .base_agent import determine_response_type_with_llm
 
 
@@ -112,13 +114,24 @@ class CodeFixerManager:
                 return int(match.group(1))
         return None
 
-    def _read_file_content(self, file_path: str) -> str:
-        """Read file content safely."""
+    def _read_file_content(
+        self,
+        file_path: str,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> str:
+        """Read file content safely, optionally limited to a line range or size cap."""
         try:
             full_path = self.project_root / file_path
             if full_path.exists() and full_path.is_file():
-                with open(full_path, "r", encoding="utf-8") as f:
-                    return f.read()
+                file_slice = file_cache.read_slice(
+                    full_path, start_line=start_line, end_line=end_line, max_bytes=max_bytes
+                )
+                if file_slice.is_binary:
+                    print(f"Skipping binary file {file_path}")
+                    return ""
+                return file_slice.text
         except Exception as e:
             print(f"Error reading file {file_path}: {e}")
         return ""
@@ -138,6 +151,25 @@ class CodeFixerManager:
         except Exception as e:
             return {"valid": False, "errors": [{"type": "Error", "message": str(e)}]}
 
+    def _validate_cached_syntax(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Validate Python syntax using the shared cache's parsed AST.
+
+        Returns None when the file cannot be served from the cache.
+        """
+        try:
+            if file_cache.get_ast(self.project_root / file_path) is None:
+                return None
+            return {"valid": True, "errors": []}
+        except SyntaxError as e:
+            return {
+                "valid": False,
+                "errors": [
+                    {"type": "SyntaxError", "message": str(e), "line": e.lineno, "column": e.offset}
+                ],
+            }
+        except Exception as e:
+            return {"valid": False, "errors": [{"type": "Error", "message": str(e)}]}
+
     async def analyze_code(self, file_path: str) -> str:
         """Analyze code in a file for potential issues."""
         try:
@@ -145,8 +177,10 @@ class CodeFixerManager:
             if not content:
                 return f"❌ Could not read file '{file_path}'"
 
-            # Basic syntax validation
-            syntax_result = self._validate_python_syntax(content)
+            # Basic syntax validation, reusing the cached AST when the file is unchanged
+            syntax_result = self._validate_cached_syntax(file_path)
+            if syntax_result is None:
+                syntax_result = self._validate_python_syntax(content)
 
             # Look for common issues
             issues = []
@@ -195,7 +229,9 @@ class CodeFixerManager:
         except Exception as e:
             return f"❌ Error analyzing code: {str(e)}"
 
-    async def analyze_error(self, error_content: str, file_path: Optional[str] = None) -> str:
+    async def analyze_error(
+        self, error_content: str, file_path: Optional[str] = None, context_lines: int = 10
+    ) -> str:
         """Analyze an error and suggest a fix."""
         try:
             # Extract file path from error content if not provided
@@ -205,10 +241,18 @@ class CodeFixerManager:
             # Extract line number
             line_number = self._extract_line_number(error_content)
 
-            # Read file content if available
+            # Read only the code around the error line when it is known
             file_content = ""
             if file_path:
-                file_content = self._read_file_content(file_path)
+                if line_number:
+                    file_content = self._read_file_content(
+                        file_path,
+                        start_line=max(line_number - context_lines, 1),
+                        end_line=line_number + context_lines,
+                        max_bytes=DEFAULT_MAX_BYTES,
+                    )
+                else:
+                    file_content = self._read_file_content(file_path, max_bytes=DEFAULT_MAX_BYTES)
 
             # Analyze the error
             analysis = f"""## Error Analysis
@@ -216,7 +260,19 @@ class CodeFixerManager:
 **Error:** {error_content}
 **File:** {file_path or "Unknown"}
 **Line:** {line_number or "Unknown"}
+"""
+
+            if file_content and line_number:
+                first_line = max(line_number - context_lines, 1)
+                last_line = first_line + len(file_content.splitlines()) - 1
+                analysis += f"""
+**Code Context (lines {first_line}-{last_line}):**
+```python
+{file_content.rstrip()}
+```
+"""
 
+            analysis += """
 **Analysis:**"""
 
             # Provide specific analysis based on error type
@@ -322,6 +378,7 @@ This appears to be a runtime error. The code is syntactically correct but fails
             try:
                 with open(full_path, "w", encoding="utf-8") as f:
                     f.write(content)
+                file_cache.invalidate(full_path)
 
                 self.fix_history.append(
                     {
@@ -401,9 +458,14 @@ async def analyze_code(file_path: str) -> str:
 
 
 @tool
-async def analyze_error(error_content: str, file_path: Optional[str] = None) -> str:
-    """Analyze an error and suggest a fix."""
-    return await code_fixer_manager.analyze_error(error_content, file_path)
+async def analyze_error(
+    error_content: str, file_path: Optional[str] = None, context_lines: int = 10
+) -> str:
+    """Analyze an error and suggest a fix.
+
+    Only context_lines lines around the reported error line are read from the file.
+    """
+    return await code_fixer_manager.analyze_error(error_content, file_path, context_lines)
 
 
 @tool
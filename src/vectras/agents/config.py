@@ -3,10 +3,13 @@
 
 """Configuration loading and management for Vectras agents."""
 
+import asyncio
+import inspect
 import os
 import re
+import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 
 import yaml
 from pydantic import BaseModel, Field
@@ -30,6 +33,13 @@ class AgentSettings(BaseModel):
     monitor_interval: Optional[int] = 5
     error_patterns: Optional[List[str]] = None
     max_log_size: Optional[str] = None
+    max_log_entries: Optional[int] = None
+    max_log_age: Optional[str] = None
+    max_index_size: Optional[str] = None
+    bulk_scan_size: Optional[str] = None
+    anomaly_threshold: Optional[float] = None
+    handoff_debounce: Optional[int] = None
+    auto_handoff: Optional[bool] = None
     github_enabled: Optional[bool] = False
     github_token_env: Optional[str] = None
     branch_prefix: Optional[str] = None
@@ -201,6 +211,34 @@ def ensure_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_size(value: Union[str, int, None]) -> Optional[int]:
+    """Parse a size setting such as "10MB", "512 KB" or 1048576 into bytes."""
+    if value is None or isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*", value.upper())
+    if match is None:
+        raise ValueError(f"Invalid size: {value!r}")
+    number, unit = match.groups()
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def parse_duration(value: Union[str, int, None]) -> Optional[int]:
+    """Parse a duration setting such as "15m", "7d" or 3600 into seconds."""
+    if value is None or isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", value.lower())
+    if match is None:
+        raise ValueError(f"Invalid duration: {value!r}")
+    number, unit = match.groups()
+    return int(float(number) * _DURATION_UNITS[unit or "s"])
+
+
 def get_environment_setting(
     setting_name: str, config: Optional[VectrasConfig] = None
 ) -> Optional[str]:
@@ -243,6 +281,160 @@ def get_service_host(service_name: str, config: Optional[VectrasConfig] = None)
     return get_environment_setting(host_setting, config) or "localhost"
 
 
+SettingsListener = Callable[[Dict[str, Any], Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+class UserSettingsStore:
+    """Cached, concurrency-safe access to the user settings YAML file.
+
+    Reads are served from memory and revalidated against the file's mtime and size.
+    Updates issued within the coalescing window are merged into a single atomic
+    write (temporary file + rename) performed under an asyncio lock. Listeners are
+    notified with the changed keys after every write and whenever an external edit
+    to the file is detected.
+    """
+
+    def __init__(self, path: Union[str, Path], coalesce_delay: float = 0.05):
+        self.path = Path(path)
+        self.coalesce_delay = coalesce_delay
+        self._settings: Optional[Dict[str, Any]] = None
+        self._signature: Optional[tuple] = None
+        self._lock = asyncio.Lock()
+        self._pending: Dict[str, Any] = {}
+        self._flush_future: Optional[asyncio.Future] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listeners: List[SettingsListener] = []
+        self.reads = 0
+        self.writes = 0
+
+    def _stat_signature(self) -> Optional[tuple]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> Dict[str, Any]:
+        """Return the cached settings, re-reading the file only if it changed."""
+        signature = self._stat_signature()
+        if self._settings is not None and signature == self._signature:
+            return self._settings
+
+        if signature is None:
+            settings = {}
+        else:
+            with open(self.path, "r") as f:
+                settings = yaml.safe_load(f) or {}
+            self.reads += 1
+
+        previous = self._settings
+        self._settings = settings
+        self._signature = signature
+
+        if previous is not None:
+            changes = {k: v for k, v in settings.items() if previous.get(k) != v}
+            changes.update({k: None for k in previous if k not in settings})
+            if changes:
+                self._notify(changes)
+        return settings
+
+    def get(self) -> Dict[str, Any]:
+        """Get a copy of the current settings."""
+        return dict(self._load())
+
+    def _write_atomic(self, settings: Dict[str, Any]) -> None:
+        """Write settings to a temporary file and rename it over the settings file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                yaml.dump(settings, f, default_flow_style=False)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates private files; keep the permissions of the file we replace
+            try:
+                os.chmod(tmp_path, self.path.stat().st_mode & 0o777)
+            except FileNotFoundError:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        self.writes += 1
+
+    async def update(self, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge updates into the settings and persist them.
+
+        Returns the settings as written, including updates from concurrent callers
+        that were coalesced into the same write.
+        """
+        self._pending.update(updates)
+        if self._flush_future is None:
+            loop = asyncio.get_running_loop()
+            self._flush_future = loop.create_future()
+            self._flush_task = loop.create_task(self._flush(self._flush_future))
+        return dict(await asyncio.shield(self._flush_future))
+
+    async def _flush(self, future: asyncio.Future) -> None:
+        """Write all pending updates once the coalescing window closes."""
+        try:
+            if self.coalesce_delay > 0:
+                await asyncio.sleep(self.coalesce_delay)
+            async with self._lock:
+                # Later updates start a new batch
+                self._flush_future = None
+                pending, self._pending = self._pending, {}
+
+                current = self._load()
+                settings = {**current, **pending}
+                await asyncio.to_thread(self._write_atomic, settings)
+
+                self._settings = settings
+                self._signature = self._stat_signature()
+        except asyncio.CancelledError:
+            self._abandon(future)
+            future.cancel()
+            raise
+        except Exception as e:
+            self._abandon(future)
+            future.set_exception(e)
+        else:
+            future.set_result(settings)
+            changes = {k: v for k, v in pending.items() if current.get(k) != v}
+            if changes:
+                self._notify(changes)
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        """Let later updates start a new batch after a failed flush."""
+        if self._flush_future is future:
+            self._flush_future = None
+
+    def subscribe(self, listener: SettingsListener) -> Callable[[], None]:
+        """Register a listener called with (changes, settings); returns an unsubscribe function."""
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def _notify(self, changes: Dict[str, Any]) -> None:
+        settings = dict(self._settings or {})
+        for listener in list(self._listeners):
+            try:
+                result = listener(dict(changes), settings)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                print(f"Warning: user settings listener failed: {e}")
+
+
 def get_github_token(config: Optional[VectrasConfig] = None) -> Optional[str]:
     """Get GitHub token from configuration."""
     return get_environment_setting("github_token", config)
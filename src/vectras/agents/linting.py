@@ -17,6 +17,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from ..utils.file_cache import file_cache
 from .base_agent import determine_response_type_with_llm
 
 
@@ -183,10 +184,10 @@ class LintingManager:
             if not path.is_dir():
                 return f"❌ '{directory}' is not a directory."
 
-            # Find all files to lint
+            # Find all files to lint, reusing cached directory listings
             files_to_lint = []
-            for file_path in path.rglob("*"):
-                if file_path.is_file() and self._get_linters_for_file(file_path):
+            for file_path in file_cache.list_files(path):
+                if self._get_linters_for_file(file_path):
                     # Check if file should be excluded
                     should_exclude = False
                     for pattern in self.exclude_patterns:
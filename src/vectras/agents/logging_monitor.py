@@ -5,103 +5,271 @@ This demonstrates how to migrate from the custom agent implementation
 to using the OpenAI Agents SDK for better tool management, handoffs, and tracing.
 """
 
+import asyncio
+import json
+import os
 import re
-from datetime import datetime, timedelta
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 # OpenAI Agents SDK imports
 from agents import Agent, Runner
 from agents.tool import function_tool as tool
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from .base_agent import determine_response_type_with_llm
-
-
-class LogEntry:
-    """Represents a log entry with metadata."""
-
-    def __init__(
-        self, file_path: str, line_number: int, content: str, timestamp: Optional[datetime] = None
-    ):
-        self.file_path = file_path
-        self.line_number = line_number
-        self.content = content
-        self.timestamp = timestamp or datetime.now()
-        self.severity = self._detect_severity(content)
-        self.error_type = self._detect_error_type(content)
-
-    def _detect_severity(self, content: str) -> str:
-        """Detect log severity level."""
-        content_upper = content.upper()
-        if any(level in content_upper for level in ["CRITICAL", "FATAL"]):
-            return "critical"
-        elif "ERROR" in content_upper:
-            return "error"
-        elif "WARNING" in content_upper or "WARN" in content_upper:
-            return "warning"
-        elif "INFO" in content_upper:
-            return "info"
-        else:
-            return "debug"
-
-    def _detect_error_type(self, content: str) -> Optional[str]:
-        """Detect the type of error from content."""
-        error_patterns = {
-            "exception": r"Exception|Error:|Traceback",
-            "http_error": r"HTTP.*[45]\d\d|status.*[45]\d\d",
-            "connection_error": r"connection.*failed|timeout|refused",
-            "import_error": r"ImportError|ModuleNotFoundError",
-            "syntax_error": r"SyntaxError|IndentationError",
-            "permission_error": r"PermissionError|Access.*denied",
-            "file_error": r"FileNotFoundError|No such file",
-        }
+from ..utils.log_analytics import BUCKET_SECONDS, LogColumns, analyze
+from ..utils.log_anomaly import (
+    Z_THRESHOLD,
+    Anomaly,
+    HandoffDebouncer,
+    RateAnomalyDetector,
+    service_name,
+)
+from ..utils.log_clusters import LogClusterer
+from ..utils.log_incidents import Incident, IncidentTracker
+from ..utils.log_index import MAX_INDEX_BYTES, LogIndex
+from ..utils.log_json import JSON_FORMAT, sniff_format
+from ..utils.log_mmap import BULK_SCAN_MIN_BYTES, candidate_literals, scan_candidates
+from ..utils.log_parallel import (
+    PARALLEL_MIN_BYTES,
+    LogParserPool,
+    ParsedLine,
+    parse_lines,
+    split_ranges,
+)
+from ..utils.log_parser import LogClassifier
+from ..utils.log_query import LogQuery, QueryError, parse_query
+from ..utils.log_rotation import (
+    LOG_EXTENSIONS,
+    is_compressed,
+    iter_segment_lines,
+    order_rotation_chains,
+    read_prefix,
+)
+from ..utils.log_sketch import HeavyHitter, HeavyHitterWindows
+from ..utils.log_store import (
+    FLAG_CONTINUATION,
+    FLAG_ERROR,
+    FLAG_WARNING,
+    SEVERITY_CODES,
+    LogRecord,
+    LogStore,
+    to_micros,
+)
+from ..utils.log_stream import SUBSCRIBER_BUFFER, LogBroadcaster, TailFilter
+from ..utils.log_tail import FINGERPRINT_BYTES, LogChunk, LogTailer
+from ..utils.log_watch import LogWatcher
+from .base_agent import determine_response_type_with_llm, handoff_to_agent
+from .config import AgentSettings, get_agent_config, parse_duration, parse_size
+
+# Names of the saved error message counts and clusters in the persistent index
+HEAVY_HITTERS_SUMMARY = "heavy_hitters"
+CLUSTERS_SUMMARY = "clusters"
+
+# Number of recent entries, errors and warnings kept in memory
+MAX_RECENT_ENTRIES = 100
+
+# Most lines returned before and after a line by get_log_context
+MAX_CONTEXT_LINES = 200
+
+# Seconds between keepalive comments on an idle /logs/tail stream
+TAIL_KEEPALIVE_SECONDS = 15
+
+# Delay used to coalesce bursts of file change events into one ingestion pass
+EVENT_DEBOUNCE_SECONDS = 0.05
 
-        for error_type, pattern in error_patterns.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                return error_type
+# Number of incidents, with samples, included in an automatic handoff
+MAX_HANDOFF_INCIDENTS = 5
 
+# Minimum time between two writes of the offset checkpoints while monitoring
+CHECKPOINT_SAVE_INTERVAL = 1.0
+
+# Minimum time between two retention checks of the persistent index
+INDEX_RETENTION_INTERVAL = 30.0
+
+
+def _process_rss() -> Optional[int]:
+    """Resident memory of this process in bytes, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
         return None
 
-    @property
-    def is_error(self) -> bool:
-        """Check if this log entry represents an error."""
-        return self.severity in ["error", "critical"] or self.error_type is not None
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
-        return {
-            "file_path": self.file_path,
-            "line_number": self.line_number,
-            "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
-            "severity": self.severity,
-            "error_type": self.error_type,
-            "is_error": self.is_error,
-        }
+def _store_limits(settings: AgentSettings) -> Dict[str, Any]:
+    """Retention limits for the log store from max_log_size, max_log_entries and max_log_age."""
+    limits: Dict[str, Any] = {}
+    try:
+        max_bytes = parse_size(settings.max_log_size)
+        if max_bytes:
+            limits["max_bytes"] = max_bytes
+    except ValueError as e:
+        print(f"Ignoring max_log_size: {e}")
+    if settings.max_log_entries:
+        limits["max_rows"] = settings.max_log_entries
+    try:
+        max_age = parse_duration(settings.max_log_age)
+        if max_age:
+            limits["max_age"] = timedelta(seconds=max_age)
+    except ValueError as e:
+        print(f"Ignoring max_log_age: {e}")
+    return limits
+
+
+def _bulk_scan_bytes(settings: AgentSettings) -> Optional[int]:
+    """Pending bytes above which a file read for the first time is scanned in bulk.
+
+    bulk_scan_size defaults to BULK_SCAN_MIN_BYTES; 0 disables bulk scans.
+    """
+    try:
+        size = parse_size(settings.bulk_scan_size)
+    except ValueError as e:
+        print(f"Ignoring bulk_scan_size: {e}")
+        size = None
+    if size is None:
+        return BULK_SCAN_MIN_BYTES
+    return size or None
+
+
+def _index_max_bytes(settings: AgentSettings) -> Optional[int]:
+    """Size on disk the persistent index is kept under.
+
+    max_index_size defaults to MAX_INDEX_BYTES; 0 disables the limit.
+    """
+    try:
+        size = parse_size(settings.max_index_size)
+    except ValueError as e:
+        print(f"Ignoring max_index_size: {e}")
+        size = None
+    if size is None:
+        return MAX_INDEX_BYTES
+    return size or None
+
+
+def _load_settings() -> AgentSettings:
+    try:
+        config = get_agent_config("logging-monitor")
+    except Exception as e:
+        print(f"Could not load logging monitor settings: {e}")
+        config = None
+    return config.settings if config else AgentSettings()
 
 
 class LogMonitorManager:
     """Manages log monitoring operations."""
 
     def __init__(self):
-        self.logs_directory = Path("./logs")
-        self.log_entries: List[LogEntry] = []
+        self.settings = _load_settings()
+        self.logs_directory = Path(self.settings.log_directory or "./logs")
+        self.data_directory = Path("./data")
+        self.monitor_interval = float(self.settings.monitor_interval or 5)
+        self.classifier = LogClassifier(self.settings.error_patterns)
+        self.candidate_literals = candidate_literals(self.classifier)
+        self.bulk_scan_bytes = _bulk_scan_bytes(self.settings)
+        self.index_max_bytes = _index_max_bytes(self.settings)
+        self.store = LogStore(**_store_limits(self.settings))
+        self.incidents = IncidentTracker()
+        self.heavy_hitters = HeavyHitterWindows()
+        self.clusters = LogClusterer()
+        self.live = LogBroadcaster()
+        self.parser_pool = LogParserPool(self.settings.error_patterns)
+        self.detector = RateAnomalyDetector(
+            threshold=self.settings.anomaly_threshold or Z_THRESHOLD
+        )
+        self.handoffs = HandoffDebouncer(float(self.settings.handoff_debounce or 30))
+        self.auto_handoff = self.settings.auto_handoff is not False
+        self.handoff_target = "coding"
+        self.last_handoff: Optional[Dict[str, Any]] = None
         self.error_count = 0
         self.warning_count = 0
+        self.total_entries = 0
         self.last_check = datetime.now()
+        self.log_files: List[Path] = []
+        self.ingest_passes = 0
+        self._tailer: Optional[LogTailer] = None
+        self._index: Optional[LogIndex] = None
+        self._index_unavailable: Optional[Path] = None
+        self._rotated_paths: Set[str] = set()
+        self.file_formats: Dict[str, str] = {}
+        self._ingest_lock = threading.Lock()
+        self._last_save = 0.0
+        self._last_retention = 0.0
+        self._monitor_task: Optional[asyncio.Task] = None
+        # Handoffs in flight, referenced until they finish
+        self._handoff_tasks: Set[asyncio.Task] = set()
+        self._watcher: Optional[LogWatcher] = None
+
+    @property
+    def tailer(self) -> LogTailer:
+        """Offset checkpoints for the current data directory."""
+        checkpoint_path = Path(self.data_directory) / "logging_monitor_offsets.json"
+        if self._tailer is None or self._tailer.checkpoint_path != checkpoint_path:
+            self._tailer = LogTailer(checkpoint_path)
+        return self._tailer
+
+    @property
+    def index(self) -> Optional[LogIndex]:
+        """Persistent index in the current data directory, or None if it cannot be opened.
+
+        On opening, lines the checkpoints do not account for are removed and the
+        stored incidents, error message counts and clusters are restored.
+        """
+        index_path = Path(self.data_directory) / "logging_monitor.db"
+        if self._index is not None and self._index.path == index_path:
+            return self._index
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._index_unavailable == index_path:
+            return None
+        try:
+            index = LogIndex(index_path)
+            index.reconcile(self._index_sources())
+            self.incidents.restore(index.load_incidents())
+            heavy_hitters = index.load_summary(HEAVY_HITTERS_SUMMARY)
+            if heavy_hitters is not None:
+                self.heavy_hitters.restore(heavy_hitters)
+            clusters = index.load_summary(CLUSTERS_SUMMARY)
+            if clusters is not None:
+                self.clusters.restore(clusters)
+        except Exception as e:
+            print(f"Persistent log index unavailable: {e}")
+            self._index_unavailable = index_path
+            return None
+        self._index = index
+        return index
+
+    def _index_sources(self) -> Dict[str, Optional[int]]:
+        """Last line read from each tailed file, by inode key; segments are read whole."""
+        tailer = self.tailer
+        sources: Dict[str, Optional[int]] = {
+            checkpoint.key: checkpoint.line for checkpoint in tailer.checkpoints.values()
+        }
+        sources.update((checksum, None) for checksum in tailer.segments)
+        return sources
 
     def _find_log_files(self) -> List[Path]:
-        """Find all log files in the logs directory."""
+        """Find all log files in the logs directory, including rotated segments.
+
+        Each rotation chain is returned oldest segment first, so lines are
+        stored in the order they were written.
+        """
         log_files = []
 
         if not self.logs_directory.exists():
             return log_files
 
-        # Look for common log file patterns
-        patterns = ["*.log", "*.txt", "*.out", "*.err"]
+        # Look for common log file patterns, plus rotated (.1) and compressed copies
+        patterns = [f"*.{extension}*" for extension in LOG_EXTENSIONS]
 
         for pattern in patterns:
             log_files.extend(self.logs_directory.glob(pattern))
@@ -112,94 +280,556 @@ class LogMonitorManager:
                 for pattern in patterns:
                     log_files.extend(subdir.glob(pattern))
 
-        return log_files
+        return order_rotation_chains(path for path in log_files if path.is_file())
 
-    def _parse_log_file(self, file_path: Path) -> List[LogEntry]:
-        """Parse a log file and extract entries."""
-        entries = []
+    @property
+    def log_entries(self) -> List[LogRecord]:
+        """The most recently ingested log lines, newest first."""
+        return self.store.latest(MAX_RECENT_ENTRIES)
 
+    def _read_chunk(self, file_path: Path, load_lines: bool = True) -> Optional[LogChunk]:
+        """Read the new data of a log file, retiring stored lines it invalidated."""
+        try:
+            chunk = self.tailer.read(file_path, load_lines)
+        except OSError as e:
+            print(f"Error reading log file {file_path}: {e}")
+            return None
+
+        if chunk.truncated:
+            self.incidents.discard_file(chunk.path)
+            if chunk.path in self._rotated_paths:
+                # Truncated after being copied to a compressed segment
+                self._rotated_paths.discard(chunk.path)
+            else:
+                # Lines from the previous contents of this file are gone
+                self.store.retire_file(chunk.path)
+                source = self.tailer.paths.get(chunk.path)
+                if self.index is not None and source is not None:
+                    self.index.retire_source(source)
+        return chunk
+
+    def _is_json_lines(self, chunk: LogChunk) -> bool:
+        """Check if a file holds JSON lines, detecting the format when its head is first read."""
+        file_format = self.file_formats.get(chunk.path)
+        if file_format is None or (chunk.start_offset == 0 and chunk.end_offset > 0):
+            file_format = self.file_formats[chunk.path] = sniff_format(chunk.path)
+        return file_format == JSON_FORMAT
+
+    def _ingest_file(self, file_path: Path) -> int:
+        """Store the lines appended to a log file since the last check.
+
+        Returns the number of lines stored.
+        """
+        chunk = self._read_chunk(file_path)
+        if chunk is None:
+            return 0
+        parsed = parse_lines(chunk.lines, self.classifier, date.today(), self._is_json_lines(chunk))
+        return self._store_lines(chunk, [(chunk.first_line, parsed)])
+
+    def _bulk_scan_due(self, file_path: Path) -> bool:
+        """Check if a file is read for the first time and has enough pending data for a bulk scan."""
+        if self.bulk_scan_bytes is None or self.candidate_literals is None:
+            return False
+        checkpoint = self.tailer.checkpoint(file_path)
+        if checkpoint is not None and checkpoint.offset:
+            return False
+        return self.tailer.pending_bytes(file_path) >= self.bulk_scan_bytes
+
+    def _scan_file(self, file_path: Path) -> int:
+        """Store the lines of a file that may be warnings or errors, decoding no others.
+
+        The remaining lines are counted but not stored. Returns the number of
+        lines stored.
+        """
+        chunk = self._read_chunk(file_path, load_lines=False)
+        if chunk is None or chunk.end_offset <= chunk.start_offset:
+            return 0
+        json_lines = self._is_json_lines(chunk)
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                for line_number, line in enumerate(f, 1):
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        # Try to extract timestamp from the beginning of the line
-                        timestamp = None
-                        content = line
-
-                        # Common timestamp patterns
-                        timestamp_patterns = [
-                            r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})",
-                            r"^(\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})",
-                            r"^(\d{2}:\d{2}:\d{2})",
-                        ]
-
-                        for pattern in timestamp_patterns:
-                            match = re.match(pattern, line)
-                            if match:
-                                try:
-                                    timestamp_str = match.group(1)
-                                    if len(timestamp_str) == 8:  # HH:MM:SS
-                                        timestamp = datetime.strptime(timestamp_str, "%H:%M:%S")
-                                        # Use today's date
-                                        today = datetime.now().date()
-                                        timestamp = datetime.combine(today, timestamp.time())
-                                    else:
-                                        timestamp = datetime.strptime(
-                                            timestamp_str, "%Y-%m-%d %H:%M:%S"
-                                        )
-                                    content = line[match.end() :].strip()
-                                    break
-                                except ValueError:
-                                    continue
-
-                        entry = LogEntry(
-                            file_path=str(file_path),
-                            line_number=line_number,
-                            content=content,
-                            timestamp=timestamp,
+            groups = scan_candidates(
+                chunk.path, chunk.start_offset, chunk.end_offset, self.candidate_literals
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error scanning log file {file_path}: {e}")
+            return 0
+
+        today = date.today()
+
+        def batches():
+            next_index = 0
+            for index, lines in groups:
+                if index != next_index:
+                    # The skipped lines end any incident assembled from the lines above
+                    self.incidents.close_file(chunk.path)
+                next_index = index + len(lines)
+                yield (
+                    chunk.first_line + index,
+                    parse_lines(lines, self.classifier, today, json_lines),
+                )
+
+        stored = self._store_lines(chunk, batches())
+        checkpoint = self.tailer.checkpoint(chunk.path)
+        if checkpoint is not None:
+            # Lines that were only counted
+            checkpoint.stats["entries"] = (
+                checkpoint.stats.get("entries", 0) + chunk.line_count - stored
+            )
+        return stored
+
+    def _ingest_segment(self, file_path: Path) -> int:
+        """Store the lines of a compressed rotated segment that was not indexed yet.
+
+        The segment is decompressed as a stream. When it is a compressed copy of
+        a file that was already being tailed, only the bytes past that file's
+        checkpoint are stored.
+
+        Returns the number of lines stored.
+        """
+        path = str(file_path)
+        try:
+            checksum = self.tailer.segment_checksum(path)
+            if self.tailer.segment(checksum) is not None:
+                self.tailer.move_segment(checksum, path)
+                return 0
+
+            skip_bytes = first_line = 0
+            stats: Dict[str, int] = {}
+            json_lines = sniff_format(path) == JSON_FORMAT
+            source = self.tailer.match_prefix(read_prefix(path, FINGERPRINT_BYTES))
+            if source is not None:
+                skip_bytes, first_line = source.offset, source.line
+                # The rows read from the original file stay valid after it is
+                # deleted or truncated, and are counted under the segment
+                stats = dict(source.stats)
+                self._rotated_paths.add(source.path)
+                if self.index is not None:
+                    self.index.move_source(source.key, checksum)
+
+            stored = 0
+            today = date.today()
+            for lines in iter_segment_lines(path, skip_bytes):
+                chunk = LogChunk(path, skip_bytes, skip_bytes, first_line + 1, lines)
+                parsed = parse_lines(lines, self.classifier, today, json_lines)
+                stored += self._store_lines(chunk, [(chunk.first_line, parsed)], stats, checksum)
+                first_line += len(lines)
+        except (OSError, EOFError) as e:
+            print(f"Error reading log segment {file_path}: {e}")
+            return 0
+
+        self.incidents.close_file(path)
+        self.tailer.add_segment(checksum, path, first_line, stats)
+        return stored
+
+    def _store_lines(
+        self,
+        chunk: LogChunk,
+        batches: Iterable[Tuple[int, List[ParsedLine]]],
+        stats: Optional[Dict[str, int]] = None,
+        source: Optional[str] = None,
+    ) -> int:
+        """Store parsed lines of a chunk, given as (first line number, lines) batches.
+
+        Lines are also written to the persistent index under source, by default
+        the inode key of the file. Counts are added to stats, by default the
+        statistics of the file's checkpoint. Returns the number of lines stored.
+        """
+        store = self.store
+        index = self.index
+        source = source or self.tailer.paths.get(chunk.path)
+        if index is not None and source is not None:
+            index_file_id = index.file_id(source, chunk.path)
+        else:
+            index = None
+        feed = self.incidents.feed
+        count_message = self.heavy_hitters.add
+        cluster_message = self.clusters.add
+        now = datetime.now()
+        # Only lines written while monitoring feed the error rates, not the backlog
+        observe = self.detector.observe if self.ingest_passes and stats is None else None
+        service = service_name(chunk.path)
+        wall_clock = time.time()
+        stored = errors = warnings = 0
+        with store.lock:
+            file_id = store.intern_file(chunk.path)
+            for first_line, parsed in batches:
+                index_rows = []
+                for position, raw_line, timestamp, content, severity, error_type, exc in parsed:
+                    line_number = first_line + position
+                    timestamp = timestamp or now
+                    is_error = severity in ("error", "critical") or error_type is not None
+                    if exc is not None:
+                        # A structured record carries its whole traceback
+                        self.incidents.add_traceback(
+                            chunk.path,
+                            store.next_id,
+                            line_number,
+                            content,
+                            exc,
+                            timestamp,
+                            error_type,
+                        )
+                        continuation = False
+                    else:
+                        # Traceback frames and exception lines belong to the incident above them
+                        continuation = not feed(
+                            chunk.path,
+                            store.next_id,
+                            line_number,
+                            raw_line,
+                            content,
+                            timestamp,
+                            is_error,
+                            error_type,
                         )
-                        entries.append(entry)
+                    store.append(
+                        file_id,
+                        line_number,
+                        timestamp,
+                        severity,
+                        error_type,
+                        content,
+                        continuation,
+                    )
+                    stored += 1
+                    if continuation:
+                        flags = FLAG_CONTINUATION
+                    elif is_error:
+                        flags = FLAG_ERROR
+                        errors += 1
+                        count_message(content, timestamp, error_type)
+                        cluster_message(content, timestamp, error_type, service)
+                        if observe is not None:
+                            observe(service, error_type or "unknown", wall_clock)
+                    elif severity == "warning":
+                        flags = FLAG_WARNING
+                        warnings += 1
+                    else:
+                        flags = 0
+                    if index is not None:
+                        index_rows.append(
+                            (
+                                line_number,
+                                to_micros(timestamp),
+                                SEVERITY_CODES[severity],
+                                error_type,
+                                flags,
+                                content,
+                            )
+                        )
+                if index is not None:
+                    index.add(index_file_id, index_rows)
+
+        if stats is None:
+            checkpoint = self.tailer.checkpoint(chunk.path)
+            stats = checkpoint.stats if checkpoint is not None else None
+        if stats is not None and stored:
+            stats["entries"] = stats.get("entries", 0) + stored
+            stats["errors"] = stats.get("errors", 0) + errors
+            stats["warnings"] = stats.get("warnings", 0) + warnings
+        return stored
+
+    def _ingest_parallel(self, log_files: List[Path]) -> None:
+        """Parse the new data of every file in the process pool, then merge in order.
+
+        Large files are split into newline-aligned byte ranges so one file can
+        keep several workers busy.
+        """
+        chunks = []
+        jobs = []
+        for log_file in log_files:
+            chunk = self._read_chunk(log_file, load_lines=False)
+            if chunk is None or chunk.end_offset <= chunk.start_offset:
+                continue
+            ranges = split_ranges(chunk.path, chunk.start_offset, chunk.end_offset)
+            chunks.append((chunk, len(ranges)))
+            json_lines = self._is_json_lines(chunk)
+            jobs.extend((chunk.path, start, end, json_lines) for start, end in ranges)
+
+        results = self.parser_pool.parse(jobs)
+        for chunk, range_count in chunks:
+
+            def batches(chunk=chunk, range_count=range_count):
+                first_line = chunk.first_line
+                for _ in range(range_count):
+                    line_count, parsed = next(results)
+                    yield first_line, parsed
+                    first_line += line_count
+
+            self._store_lines(chunk, batches())
+
+    def _update_counts(self) -> None:
+        """Recompute totals from the per-file checkpoint and segment statistics."""
+        checkpoints = [cp.stats for cp in self.tailer.checkpoints.values()] + [
+            segment["stats"] for segment in self.tailer.segments.values()
+        ]
+        self.total_entries = sum(stats.get("entries", 0) for stats in checkpoints)
+        self.error_count = sum(stats.get("errors", 0) for stats in checkpoints)
+        self.warning_count = sum(stats.get("warnings", 0) for stats in checkpoints)
+
+    def ingest(self, force_save: bool = True) -> range:
+        """Store newly appended lines of every log file and update counters.
+
+        Safe to call from worker threads; concurrent calls are serialized.
+        Returns the ids of the stored rows.
+        """
+        with self._ingest_lock:
+            # Opened before reading, so it is reconciled with the saved checkpoints
+            index = self.index
+            log_files = self._find_log_files()
 
-        except Exception as e:
-            print(f"Error parsing log file {file_path}: {e}")
+            start_id = self.store.next_id
+            # Compressed segments are the oldest part of their chain
+            plain_files = []
+            for log_file in log_files:
+                if is_compressed(log_file):
+                    self._ingest_segment(log_file)
+                elif self._bulk_scan_due(log_file):
+                    self._scan_file(log_file)
+                else:
+                    plain_files.append(log_file)
+
+            pending = sum(self.tailer.pending_bytes(path) for path in plain_files)
+            if self.parser_pool.enabled and pending >= PARALLEL_MIN_BYTES:
+                self._ingest_parallel(plain_files)
+            else:
+                for log_file in plain_files:
+                    self._ingest_file(log_file)
+
+            forgotten = self.tailer.forget_missing(log_files)
+            for path in forgotten:
+                self.incidents.discard_file(path)
+                self.file_formats.pop(path, None)
+                if path in self._rotated_paths:
+                    # Its contents now live on in a compressed segment
+                    self._rotated_paths.discard(path)
+                else:
+                    self.store.retire_file(path)
+            self.incidents.flush()
+
+            updated_incidents = self.incidents.take_updated()
+            now = time.monotonic()
+            save = force_save or now - self._last_save >= CHECKPOINT_SAVE_INTERVAL
+            if index is not None:
+                if forgotten:
+                    # Drop the lines of files that are gone
+                    index.reconcile(self._index_sources())
+                index.save_incidents(updated_incidents)
+                if save:
+                    # Whole summaries are rewritten, so only as often as the checkpoints
+                    for name, summary in (
+                        (HEAVY_HITTERS_SUMMARY, self.heavy_hitters),
+                        (CLUSTERS_SUMMARY, self.clusters),
+                    ):
+                        if summary.updated:
+                            index.save_summary(name, summary.to_dict())
+                            summary.updated = False
+                if now - self._last_retention >= INDEX_RETENTION_INTERVAL:
+                    index.enforce_retention(
+                        self.store.max_rows, self.store.max_age, max_bytes=self.index_max_bytes
+                    )
+                    self._last_retention = now
+                # Lines are committed before the checkpoints that account for them
+                index.commit()
+
+            if save:
+                self.tailer.save()
+                self._last_save = now
+
+            if self.ingest_passes and self.live.subscribers:
+                # Only lines written while monitoring are streamed, not the backlog.
+                # A burst may have evicted the first of them to stay within memory.
+                with self.store.lock:
+                    records = self.store.records(
+                        range(max(start_id, self.store.first_id), self.store.next_id)
+                    )
+                self.live.publish(records)
+
+            self.store.index_pending()
+            self.store.enforce_retention()
+
+            anomalies = self.detector.tick()
+            if anomalies:
+                self.handoffs.add(anomalies)
 
-        return entries
+            # Update counts
+            self._update_counts()
+            self.log_files = log_files
+            self.last_check = datetime.now()
+            self.ingest_passes += 1
 
-    async def check_logs(self) -> str:
-        """Check all log files for errors and issues."""
-        try:
-            log_files = self._find_log_files()
+            return range(start_id, self.store.next_id)
 
-            if not log_files:
-                return "📋 No log files found in the logs directory."
+    @property
+    def is_monitoring(self) -> bool:
+        return self._monitor_task is not None and not self._monitor_task.done()
 
-            all_entries = []
-            error_entries = []
-            warning_entries = []
+    @property
+    def monitor_mode(self) -> str:
+        if not self.is_monitoring:
+            return "stopped"
+        return "watchdog" if self._watcher and self._watcher.running else "polling"
+
+    async def start_monitoring(self) -> None:
+        """Start ingesting log lines in the background as they are written."""
+        if not self.is_monitoring:
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
+
+    async def stop_monitoring(self) -> None:
+        """Stop background ingestion and persist the checkpoints."""
+        task, self._monitor_task = self._monitor_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._handoff_tasks):
+            task.cancel()
+        await asyncio.gather(*self._handoff_tasks, return_exceptions=True)
+        self.tailer.save()
+        if self._index is not None:
+            self._index.commit()
+        await asyncio.to_thread(self.parser_pool.close)
+
+    async def _monitor_loop(self) -> None:
+        """Ingest on file change events, polling every monitor_interval as a fallback."""
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        self._watcher = LogWatcher(
+            self.logs_directory, lambda _path: loop.call_soon_threadsafe(wake.set)
+        )
+        watching = await asyncio.to_thread(self._watcher.start)
+        try:
+            while True:
+                try:
+                    await asyncio.to_thread(self.ingest, False)
+                except Exception as e:
+                    print(f"Error ingesting logs: {e}")
+                if self.auto_handoff and self.handoffs.due():
+                    # The coding agent may take up to handoff_timeout to answer;
+                    # ingestion carries on meanwhile
+                    task = asyncio.create_task(self.dispatch_handoff())
+                    self._handoff_tasks.add(task)
+                    task.add_done_callback(self._handoff_tasks.discard)
+
+                if not watching:
+                    # The directory may have been created since the last attempt
+                    watching = await asyncio.to_thread(self._watcher.start)
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=self.monitor_interval)
+                    await asyncio.sleep(EVENT_DEBOUNCE_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                wake.clear()
+        finally:
+            await asyncio.to_thread(self._watcher.stop)
+
+    def _handoff_query(self, anomalies: List[Anomaly]) -> str:
+        """Describe anomalies, their incidents and message templates for the coding agent."""
+        keys = {anomaly.key for anomaly in anomalies}
+        incidents = [
+            incident
+            for incident in self.incidents.top(MAX_HANDOFF_INCIDENTS * 4)
+            if (service_name(incident.last_file), incident.error_type or "unknown") in keys
+        ][:MAX_HANDOFF_INCIDENTS]
+
+        query = "The logging monitor detected error rate anomalies:"
+        for anomaly in anomalies:
+            query += f"\n- {anomaly.describe(self.detector.bucket_seconds)}"
+        if incidents:
+            query += "\n\nMost frequent incidents behind them:"
+            for incident in incidents:
+                query += (
+                    f"\n\n{incident.title} (x{incident.count}, last seen in "
+                    f"{incident.last_file} line {incident.last_line})\n{incident.sample[:2000]}"
+                )
+        clusters = self.clusters.matching(keys, MAX_HANDOFF_INCIDENTS)
+        if clusters:
+            query += "\n\nMessage templates of these errors (<*> marks varying parts):"
+            for cluster in clusters:
+                query += f"\n- {cluster.template} (x{cluster.count})"
+        query += "\n\nPlease analyze these errors and suggest fixes."
+        return query
+
+    async def dispatch_handoff(self) -> Optional[Dict[str, Any]]:
+        """Hand queued anomalies off to the coding agent once the debounce delay is over.
+
+        Returns a record of the handoff, or None when nothing was due.
+        """
+        if not self.auto_handoff or not self.handoffs.due():
+            return None
+        anomalies = self.handoffs.take()
+        if not anomalies:
+            return None
+
+        record: Dict[str, Any] = {
+            "target_agent": self.handoff_target,
+            "timestamp": datetime.now().isoformat(),
+            "anomalies": [anomaly.to_dict() for anomaly in anomalies],
+        }
+        try:
+            response = await handoff_to_agent(
+                self.handoff_target,
+                self._handoff_query(anomalies),
+                {"source": "logging-monitor", "anomalies": record["anomalies"]},
+                self.settings.handoff_timeout or 30,
+            )
+            record["status"] = response.status
+        except Exception as e:
+            print(f"Error handing anomalies off to {self.handoff_target}: {e}")
+            record["status"] = "error"
+            record["error"] = str(e)
+        self.last_handoff = record
+        return record
+
+    async def get_anomalies(self) -> str:
+        """Report error rate anomalies awaiting handoff and the last handoff."""
+        await self._catch_up()
+
+        detector = self.detector.stats()
+        status = f"""## Error Rate Anomalies
+
+**Tracked Error Rates:** {detector["keys"]} (per service and error type)
+**Bucket Width:** {detector["bucket_seconds"]}s
+**Z-score Threshold:** {detector["threshold"]:g}
+**Anomalies Found:** {detector["anomalies_found"]}
+**Automatic Handoff:** {"enabled" if self.auto_handoff else "disabled"} (to {self.handoff_target}, after {self.handoffs.debounce_seconds:g}s)"""
+
+        if self.handoffs.pending:
+            status += "\n\n**Awaiting Handoff:**"
+            for anomaly in self.handoffs.pending.values():
+                status += f"\n- {anomaly.describe(self.detector.bucket_seconds)}"
+
+        if self.last_handoff:
+            status += (
+                f"\n\n**Last Handoff:** {self.last_handoff['timestamp']} "
+                f"({self.last_handoff['status']}, {len(self.last_handoff['anomalies'])} anomalies)"
+            )
+        return status
 
-            for log_file in log_files:
-                entries = self._parse_log_file(log_file)
-                all_entries.extend(entries)
+    async def _catch_up(self) -> None:
+        """Ingest pending lines unless the background monitor is already doing so."""
+        if not self.is_monitoring:
+            await asyncio.to_thread(self.ingest)
 
-                for entry in entries:
-                    if entry.is_error:
-                        error_entries.append(entry)
-                    elif entry.severity == "warning":
-                        warning_entries.append(entry)
+    async def check_logs(self) -> str:
+        """Check all log files for errors and issues.
 
-            # Update counts
-            self.error_count = len(error_entries)
-            self.warning_count = len(warning_entries)
-            self.last_check = datetime.now()
+        Only bytes appended since the previous check are parsed; totals include
+        everything read from the files so far.
+        """
+        try:
+            new_rows = await asyncio.to_thread(self.ingest)
+            log_files = self.log_files
 
-            # Store recent entries
-            self.log_entries = sorted(all_entries, key=lambda x: x.timestamp, reverse=True)[:100]
+            if not log_files:
+                return "📋 No log files found in the logs directory."
 
             status = f"""## Log Check Results
 
 **Log Files Found:** {len(log_files)}
-**Total Entries:** {len(all_entries)}
+**Total Entries:** {self.total_entries}
+**New Entries:** {len(new_rows)}
 **Errors Found:** {self.error_count}
 **Warnings Found:** {self.warning_count}
 **Last Check:** {self.last_check.strftime("%Y-%m-%d %H:%M:%S")}
@@ -209,14 +839,16 @@ class LogMonitorManager:
             for log_file in log_files:
                 status += f"\n- {log_file.name}"
 
-            if error_entries:
+            recent_errors = self.store.latest(5, errors_only=True)
+            if recent_errors:
                 status += "\n\n**Recent Errors:**"
-                for entry in error_entries[:5]:
+                for entry in reversed(recent_errors):
                     status += f"\n- **{entry.file_path}** (line {entry.line_number}): {entry.content[:100]}..."
 
-            if warning_entries:
+            recent_warnings = self.store.latest(3, warnings_only=True)
+            if recent_warnings:
                 status += "\n\n**Recent Warnings:**"
-                for entry in warning_entries[:3]:
+                for entry in reversed(recent_warnings):
                     status += f"\n- **{entry.file_path}** (line {entry.line_number}): {entry.content[:100]}..."
 
             return status
@@ -224,34 +856,62 @@ class LogMonitorManager:
         except Exception as e:
             return f"❌ Error checking logs: {str(e)}"
 
+    def _recent_activity(
+        self, cutoff_time: datetime
+    ) -> Tuple[int, int, int, List[LogRecord], List[LogRecord]]:
+        """Return (lines, errors, warnings, latest errors, latest warnings) since cutoff_time.
+
+        Uses the persistent index when available, so the history read before a
+        restart is included; otherwise the time index of the in-memory store.
+        """
+        index = self.index
+        if index is not None:
+            return (
+                index.count(start=cutoff_time),
+                index.count(start=cutoff_time, errors_only=True),
+                index.count(start=cutoff_time, warnings_only=True),
+                index.time_range(5, start=cutoff_time, errors_only=True),
+                index.time_range(3, start=cutoff_time, warnings_only=True),
+            )
+
+        recent_rows = self.store.time_range(cutoff_time, reverse=True)
+        error_rows = self.store.select(recent_rows, errors_only=True)
+        warning_rows = self.store.select(recent_rows, warnings_only=True)
+        return (
+            len(recent_rows),
+            len(error_rows),
+            len(warning_rows),
+            self.store.records(error_rows[:5]),
+            self.store.records(warning_rows[:3]),
+        )
+
     async def check_recent_logs(self, hours: int = 1) -> str:
         """Check logs from the last N hours."""
         try:
+            await self._catch_up()
             cutoff_time = datetime.now() - timedelta(hours=hours)
-
-            recent_entries = [entry for entry in self.log_entries if entry.timestamp >= cutoff_time]
-
-            error_entries = [entry for entry in recent_entries if entry.is_error]
-            warning_entries = [entry for entry in recent_entries if entry.severity == "warning"]
+            total, errors, warnings, recent_errors, recent_warnings = await asyncio.to_thread(
+                self._recent_activity, cutoff_time
+            )
 
             status = f"""## Recent Log Activity (Last {hours} hour{"s" if hours != 1 else ""})
 
-**Total Entries:** {len(recent_entries)}
-**Errors:** {len(error_entries)}
-**Warnings:** {len(warning_entries)}
+**Total Entries:** {total}
+**Errors:** {errors}
+**Warnings:** {warnings}
 **Time Range:** {cutoff_time.strftime("%Y-%m-%d %H:%M:%S")} to {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}"""
 
-            if error_entries:
+            if recent_errors:
                 status += "\n\n**Recent Errors:**"
-                for entry in error_entries[:5]:
+                for entry in recent_errors:
                     status += f"\n- **{entry.file_path}** ({entry.timestamp.strftime('%H:%M:%S')}): {entry.content[:100]}..."
 
-            if warning_entries:
+            if recent_warnings:
                 status += "\n\n**Recent Warnings:**"
-                for entry in warning_entries[:3]:
+                for entry in recent_warnings:
                     status += f"\n- **{entry.file_path}** ({entry.timestamp.strftime('%H:%M:%S')}): {entry.content[:100]}..."
 
-            if not recent_entries:
+            if not total:
                 status += "\n\n✅ No log activity in the specified time range."
 
             return status
@@ -259,98 +919,528 @@ class LogMonitorManager:
         except Exception as e:
             return f"❌ Error checking recent logs: {str(e)}"
 
-    async def search_logs(self, search_term: str, file_pattern: Optional[str] = None) -> str:
-        """Search logs for specific terms."""
+    @staticmethod
+    def _matching_paths(file_pattern: str, paths: Iterable[str]) -> List[str]:
+        """Paths that contain file_pattern or match it as a glob."""
+        is_glob = any(char in file_pattern for char in "*?[")
+        return [
+            path
+            for path in paths
+            if file_pattern in path
+            or (is_glob and (fnmatch(path, file_pattern) or fnmatch(Path(path).name, file_pattern)))
+        ]
+
+    def _search(
+        self,
+        search_term: str,
+        file_pattern: Optional[str],
+        regex: bool,
+        severity: Optional[str],
+        offset: int,
+        limit: int,
+    ) -> Tuple[int, List[LogRecord]]:
+        """Search the persistent index when available, else the in-memory store."""
+        filters: Dict[str, Any] = {}
+        if severity:
+            filters["min_severity"] = severity.lower()
+        index = self.index
+        if index is not None:
+            if file_pattern:
+                filters["paths"] = self._matching_paths(file_pattern, index.paths())
+            return index.search(search_term, regex=regex, offset=offset, limit=limit, **filters)
+
+        if file_pattern:
+            filters["file_ids"] = [
+                self.store.file_index[path]
+                for path in self._matching_paths(file_pattern, list(self.store.file_index))
+            ]
+        return self.store.search(search_term, regex=regex, offset=offset, limit=limit, **filters)
+
+    async def search_logs(
+        self,
+        search_term: str,
+        file_pattern: Optional[str] = None,
+        regex: bool = False,
+        severity: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10,
+    ) -> str:
+        """Search every ingested log line for a term or regex.
+
+        Results are newest first. severity keeps lines at or above that level.
+        """
         try:
-            if not self.log_entries:
-                await self.check_logs()
-
-            matching_entries = []
-            search_lower = search_term.lower()
-
-            for entry in self.log_entries:
-                # Check file pattern if specified
-                if file_pattern and file_pattern not in entry.file_path:
-                    continue
-
-                # Check if search term matches
-                if search_lower in entry.content.lower():
-                    matching_entries.append(entry)
+            await self._catch_up()
+
+            start_time = time.perf_counter()
+            page = max(page, 1)
+            page_size = max(page_size, 1)
+            total, matching_entries = await asyncio.to_thread(
+                self._search,
+                search_term,
+                file_pattern,
+                regex,
+                severity,
+                (page - 1) * page_size,
+                page_size,
+            )
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            pages = max((total + page_size - 1) // page_size, 1)
 
             status = f"""## Log Search Results
 
-**Search Term:** "{search_term}"
+**Search Term:** "{search_term}"{" (regex)" if regex else ""}
 **File Pattern:** {file_pattern or "All files"}
-**Matches Found:** {len(matching_entries)}"""
+**Severity:** {severity or "All"}
+**Matches Found:** {total}
+**Page:** {page} of {pages}
+**Search Time:** {elapsed_ms:.1f} ms"""
 
             if matching_entries:
                 status += "\n\n**Matching Entries:**"
-                for entry in matching_entries[:10]:  # Limit to 10 results
-                    status += f"\n- **{entry.file_path}** ({entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')}): {entry.content[:150]}..."
+                for entry in matching_entries:
+                    status += f"\n- **{entry.file_path}** (line {entry.line_number}, {entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')}): {entry.content[:150]}..."
 
-                if len(matching_entries) > 10:
-                    status += f"\n\n... and {len(matching_entries) - 10} more matches"
+                if page < pages:
+                    status += f"\n\n... {total - page * page_size} more matches (page {page + 1} of {pages})"
+            elif total:
+                status += f"\n\n❌ No matches on page {page}."
             else:
                 status += "\n\n❌ No matching entries found."
 
             return status
 
+        except re.error as e:
+            return f"❌ Invalid regular expression: {str(e)}"
         except Exception as e:
             return f"❌ Error searching logs: {str(e)}"
 
-    async def get_error_summary(self) -> str:
-        """Get a summary of errors by type."""
+    def _error_summary(self) -> Tuple[int, int, List[Tuple[str, int, str]], List[Incident]]:
+        """Return (occurrences, unique incidents, [(error type, count, latest title)], top 5).
+
+        Reads the persistent index when available, else the incident tracker.
+        """
+        index = self.index
+        if index is not None:
+            return (*index.error_summary(), index.top_incidents(5))
+
+        incidents = list(self.incidents.incidents.values())
+        error_types: Dict[str, List[Any]] = {}
+        for incident in incidents:
+            name = incident.error_type or "unknown"
+            entry = error_types.setdefault(name, [0, incident])
+            entry[0] += incident.count
+            if incident.last_seen >= entry[1].last_seen:
+                entry[1] = incident
+        by_type = sorted(
+            ((name, count, example.title) for name, (count, example) in error_types.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        total = sum(incident.count for incident in incidents)
+        return total, len(incidents), by_type, self.incidents.top(5)
+
+    def _query_paths(self, query: LogQuery, paths: Iterable[str]) -> List[str]:
+        """Paths selected by the service and file conditions of a query."""
+        selected = list(paths)
+        if query.services:
+            services = set(query.services)
+            selected = [path for path in selected if service_name(path) in services]
+        if query.files:
+            selected = [
+                path
+                for path in selected
+                if any(self._matching_paths(pattern, [path]) for pattern in query.files)
+            ]
+        return selected
+
+    def run_query(
+        self, query: LogQuery, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[LogRecord]]:
+        """Run a parsed query, newest lines first; returns (total matches, page of records).
+
+        Time, file, level and error type conditions select candidate lines
+        through the indexes before their text is compared.
+        """
+        filters: Dict[str, Any] = {
+            "errors_only": query.errors_only,
+            "warnings_only": query.warnings_only,
+        }
+        if query.severities is not None:
+            filters["severities"] = query.severities
+        if query.error_types:
+            filters["error_types"] = query.error_types
+
+        index = self.index
+        if index is not None:
+            if query.has_file_filter:
+                filters["paths"] = self._query_paths(query, index.paths())
+            return index.query(
+                query.terms,
+                query.regexes,
+                offset=offset,
+                limit=limit,
+                start=query.start,
+                end=query.end,
+                **filters,
+            )
+
+        store = self.store
+        with store.lock:
+            if query.has_file_filter:
+                filters["file_ids"] = [
+                    store.file_index[path]
+                    for path in self._query_paths(query, list(store.file_index))
+                ]
+            if query.start is not None or query.end is not None:
+                row_ids = store.time_range(query.start, query.end, reverse=True, **filters)
+            else:
+                row_ids = store.rows(reverse=True, **filters)
+            if query.terms or query.regexes:
+                row_ids = [row_id for row_id in row_ids if query.matches(store.content(row_id))]
+            else:
+                row_ids = list(row_ids)
+            return len(row_ids), store.records(row_ids[offset : offset + limit])
+
+    async def query_logs(self, query: str, page: int = 1, page_size: int = 20) -> str:
+        """Find log lines matching a query such as: level>=error service:api since:15m "timeout"."""
         try:
-            if not self.log_entries:
-                await self.check_logs()
+            parsed = parse_query(query)
+        except QueryError as e:
+            return f"❌ Invalid query: {str(e)}"
 
-            error_entries = [entry for entry in self.log_entries if entry.is_error]
+        try:
+            await self._catch_up()
+
+            start_time = time.perf_counter()
+            page = max(page, 1)
+            page_size = max(page_size, 1)
+            total, entries = await asyncio.to_thread(
+                self.run_query, parsed, (page - 1) * page_size, page_size
+            )
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            pages = max((total + page_size - 1) // page_size, 1)
+
+            status = f"""## Log Query Results
+
+**Query:** `{parsed.text}`
+**Conditions:** {"; ".join(parsed.describe()) or "none"}
+**Matches Found:** {total}
+**Page:** {page} of {pages}
+**Query Time:** {elapsed_ms:.1f} ms"""
+
+            if entries:
+                status += "\n\n**Matching Entries:**"
+                for entry in entries:
+                    status += f"\n- **{entry.file_path}** (line {entry.line_number}, {entry.timestamp.strftime('%Y-%m-%d %H:%M:%S')}, {entry.severity}): {entry.content[:150]}"
 
-            # Group errors by type
-            error_types = {}
-            for entry in error_entries:
-                error_type = entry.error_type or "unknown"
-                if error_type not in error_types:
-                    error_types[error_type] = []
-                error_types[error_type].append(entry)
+                if page < pages:
+                    status += f"\n\n... {total - page * page_size} more matches (page {page + 1} of {pages})"
+            else:
+                status += "\n\n❌ No matching entries found."
+
+            return status
+
+        except Exception as e:
+            return f"❌ Error querying logs: {str(e)}"
+
+    async def get_error_summary(self) -> str:
+        """Get a summary of errors by type, with repeated incidents deduplicated.
+
+        Also lists the most frequent error messages, overall and per time window,
+        from fixed-size sketches, and the templates of near-duplicate messages.
+        """
+        try:
+            await self._catch_up()
+            total_errors, unique, error_types, top = await asyncio.to_thread(self._error_summary)
 
             status = f"""## Error Summary
 
-**Total Errors:** {len(error_entries)}
+**Total Errors:** {total_errors}
+**Unique Incidents:** {unique}
 **Error Types:** {len(error_types)}"""
 
             if error_types:
                 status += "\n\n**Errors by Type:**"
-                for error_type, entries in sorted(
-                    error_types.items(), key=lambda x: len(x[1]), reverse=True
-                ):
-                    status += f"\n- **{error_type.title()}:** {len(entries)} occurrences"
-
-                    # Show example for each type
-                    if entries:
-                        example = entries[0]
-                        status += f"\n  Example: {example.content[:100]}..."
+                for name, count, example in error_types:
+                    status += f"\n- **{name.title()}:** {count} occurrences"
+                    status += f"\n  Example: {example[:100]}..."
+
+                status += "\n\n**Top Incidents:**"
+                for incident in top:
+                    status += (
+                        f"\n- `{incident.fingerprint}` {incident.title[:100]} "
+                        f"(×{incident.count}, first seen {incident.first_seen.strftime('%Y-%m-%d %H:%M:%S')}, "
+                        f"last seen {incident.last_seen.strftime('%Y-%m-%d %H:%M:%S')}, "
+                        f"{incident.last_file} line {incident.last_line})"
+                    )
+
+            top_messages = self.heavy_hitters.top(10)
+            if top_messages:
+                status += (
+                    f"\n\n**Top Error Messages:** (approximate counts of "
+                    f"{self.heavy_hitters.overall.total} errors, numbers and ids masked)"
+                )
+                for hitter in top_messages:
+                    status += f"\n- {self._describe_heavy_hitter(hitter)}"
+                    status += f"\n  Example: {hitter.example[:100]}"
+
+            clusters = self.clusters.top(5)
+            if clusters:
+                status += (
+                    f"\n\n**Error Templates:** {len(self.clusters.clusters)} clusters of "
+                    f"{self.clusters.total} similar messages"
+                )
+                for cluster in clusters:
+                    status += (
+                        f"\n- `{cluster.template[:150]}` (×{cluster.count}, "
+                        f"{', '.join(sorted(cluster.services)) or 'unknown service'})"
+                    )
+
+            windows = self.heavy_hitters.by_window(3)
+            if windows:
+                window_minutes = self.heavy_hitters.window_seconds / 60
+                status += f"\n\n**Top Error Messages per {window_minutes:g} Minutes:**"
+                for start, errors, hitters in windows:
+                    status += f"\n- **{start.strftime('%Y-%m-%d %H:%M')}** ({errors} errors)"
+                    for hitter in hitters:
+                        status += f"\n  - {self._describe_heavy_hitter(hitter)}"
 
             return status
 
         except Exception as e:
             return f"❌ Error getting error summary: {str(e)}"
 
+    @staticmethod
+    def _describe_heavy_hitter(hitter: HeavyHitter) -> str:
+        count = f"×{hitter.count}" if not hitter.error else f"×{hitter.guaranteed}-{hitter.count}"
+        return f"`{hitter.message[:100]}` ({hitter.error_type or 'unknown'}, {count})"
+
+    async def get_incidents(self, limit: int = 10) -> str:
+        """List deduplicated incidents, most frequent first, with a sample of each."""
+        try:
+            await self._catch_up()
+
+            incidents = self.incidents.top(max(limit, 1))
+            if not incidents:
+                return "✅ No incidents recorded."
+
+            status = f"""## Log Incidents
+
+**Unique Incidents:** {len(self.incidents.incidents)}
+**Total Occurrences:** {self.incidents.total}"""
+
+            for incident in incidents:
+                status += f"""
+
+### `{incident.fingerprint}` {incident.title[:150]}
+**Kind:** {incident.kind} | **Type:** {incident.error_type or "unknown"} | **Count:** {incident.count}
+**First Seen:** {incident.first_seen.strftime("%Y-%m-%d %H:%M:%S")} | **Last Seen:** {incident.last_seen.strftime("%Y-%m-%d %H:%M:%S")}
+**Last Location:** {incident.last_file} (line {incident.last_line})
+```
+{incident.sample}
+```"""
+
+            return status
+
+        except Exception as e:
+            return f"❌ Error getting incidents: {str(e)}"
+
+    def log_context(
+        self, file: str, line: int, before: int = 5, after: int = 5
+    ) -> Tuple[str, List[Tuple[int, str]]]:
+        """Return (path, numbered lines) around a line of the one ingested file matching file.
+
+        Tailed files are read from their closest line mark; compressed segments
+        are decompressed from the start. Raises ValueError unless exactly one
+        file matches.
+        """
+        tailer = self.tailer
+        paths = list(tailer.paths) + [segment["path"] for segment in tailer.segments.values()]
+        # A path or file name given in full wins over files that merely contain it
+        exact = [path for path in paths if file in (path, Path(path).name)]
+        matches = exact or self._matching_paths(file, paths)
+        if not matches:
+            raise ValueError(f"No ingested log file matches '{file}'")
+        if len(matches) > 1:
+            raise ValueError(f"'{file}' matches several log files: {', '.join(sorted(matches))}")
+
+        path = matches[0]
+        before = min(max(before, 0), MAX_CONTEXT_LINES)
+        after = min(max(after, 0), MAX_CONTEXT_LINES)
+        if not is_compressed(path):
+            return path, tailer.context(path, line, before, after)
+
+        first, last = max(line - before, 1), line + after
+        lines = []
+        number = 0
+        for batch in iter_segment_lines(path):
+            for content in batch:
+                number += 1
+                if first <= number <= last:
+                    lines.append((number, content))
+            if number >= last:
+                break
+        return path, lines
+
+    async def get_log_context(self, file: str, line: int, before: int = 5, after: int = 5) -> str:
+        """Show the lines around a line of a log file, marking the line itself."""
+        try:
+            path, lines = await asyncio.to_thread(self.log_context, file, line, before, after)
+            if not lines:
+                return f"❌ {path} has no line {line}."
+
+            width = len(str(lines[-1][0]))
+            context = "\n".join(
+                f"{'>' if number == line else ' '} {number:>{width}} | {content}"
+                for number, content in lines
+            )
+            return f"""## Log Context
+
+**File:** {path}
+**Lines:** {lines[0][0]}-{lines[-1][0]}
+```
+{context}
+```"""
+
+        except ValueError as e:
+            return f"❌ {str(e)}"
+        except Exception as e:
+            return f"❌ Error reading log context: {str(e)}"
+
+    def analytics(self, hours: float = 24, bucket_seconds: int = BUCKET_SECONDS) -> Dict[str, Any]:
+        """Compute log analytics over the last N hours, or the whole history when hours <= 0.
+
+        Reads the columns of the persistent index when available, else those of
+        the in-memory store.
+        """
+        start = datetime.now() - timedelta(hours=hours) if hours > 0 else None
+        index = self.index
+        columns = (
+            index.columns(start=start) if index is not None else LogColumns.from_store(self.store)
+        )
+        return analyze(columns, start=start, bucket_seconds=max(int(bucket_seconds), 1))
+
+    async def log_analytics(self, hours: float = 24, bucket_seconds: int = BUCKET_SECONDS) -> str:
+        """Summarize error rates, error bursts and services failing together."""
+        try:
+            await self._catch_up()
+
+            start_time = time.perf_counter()
+            result = await asyncio.to_thread(self.analytics, hours, bucket_seconds)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+            period = f"Last {hours:g} hour{'s' if hours != 1 else ''}" if hours > 0 else "All"
+            status = f"""## Log Analytics ({period})
+
+**Lines:** {result["total_lines"]}
+**Errors:** {result["total_errors"]}
+**Warnings:** {result["total_warnings"]}
+**Bucket Width:** {result["bucket_seconds"]}s ({len(result["buckets"])} buckets)
+**Computed With:** {result["backend"]} in {elapsed_ms:.1f} ms"""
+
+            if not result["total_lines"]:
+                return status + "\n\n✅ No log activity in the specified time range."
+
+            busiest = sorted(result["buckets"], key=lambda b: b["errors"], reverse=True)[:5]
+            busiest = [bucket for bucket in busiest if bucket["errors"]]
+            if busiest:
+                status += "\n\n**Busiest Buckets:**"
+                for bucket in busiest:
+                    status += (
+                        f"\n- {bucket['start']}: {bucket['errors']} errors, "
+                        f"{bucket['warnings']} warnings in {bucket['lines']} lines"
+                    )
+
+            status += "\n\n**Error Rate by Service:**"
+            for service in sorted(result["services"], key=lambda s: s["errors"], reverse=True):
+                status += (
+                    f"\n- **{service['service']}:** {service['errors']} errors in "
+                    f"{service['lines']} lines ({service['error_rate']:.2%})"
+                )
+
+            gaps = result["error_gaps"]
+            if gaps["count"]:
+                status += (
+                    f"\n\n**Time Between Errors:** median {gaps['p50']:g}s, "
+                    f"p90 {gaps['p90']:g}s, p99 {gaps['p99']:g}s, longest {gaps['max']:g}s"
+                )
+
+            services = result["co_occurrence"]["services"]
+            matrix = result["co_occurrence"]["matrix"]
+            pairs = sorted(
+                (
+                    (matrix[i][j], services[i], services[j])
+                    for i in range(len(services))
+                    for j in range(i + 1, len(services))
+                    if matrix[i][j]
+                ),
+                reverse=True,
+            )
+            if pairs:
+                status += "\n\n**Services Failing Together:** (buckets with errors in both)"
+                for count, first, second in pairs[:10]:
+                    status += f"\n- {first} + {second}: {count}"
+
+            return status
+
+        except Exception as e:
+            return f"❌ Error computing log analytics: {str(e)}"
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes held by the in-memory indexes, against the configured limit."""
+        store = self.store.stats()
+        incident_bytes = self.incidents.memory_size
+        summary_bytes = self.heavy_hitters.memory_size + self.clusters.memory_size
+        return {
+            "store_bytes": store["memory_bytes"],
+            "text_index_bytes": store["text_index_bytes"],
+            "time_index_bytes": store["time_index_bytes"],
+            "incident_bytes": incident_bytes,
+            "summary_bytes": summary_bytes,
+            "total_bytes": store["memory_bytes"] + incident_bytes + summary_bytes,
+            "limit_bytes": store["max_bytes"],
+            "process_rss_bytes": _process_rss(),
+        }
+
+    def index_usage(self) -> Optional[Dict[str, Any]]:
+        """Statistics of the persistent index with its size limit, or None if it is not open."""
+        if self._index is None:
+            return None
+        return {**self._index.stats(), "limit_bytes": self.index_max_bytes}
+
     def get_status(self) -> str:
         """Get the status of the logging monitor agent."""
+        memory = self.memory_usage()
+        index = self.index_usage()
+        if index is None:
+            index_status = "not open"
+        else:
+            limit = index["limit_bytes"]
+            limit_text = f"{limit / 1024 / 1024:.1f} MB" if limit else "no limit"
+            index_status = (
+                f"{index['path']} ({index['size_bytes'] / 1024 / 1024:.1f} MB of {limit_text})"
+            )
         status = f"""## Logging Monitor Agent Status
 
 **Logs Directory:** {self.logs_directory}
-**Total Log Entries:** {len(self.log_entries)}
+**Total Log Entries:** {self.total_entries}
+**Tracked Log Files:** {len(self.tailer.checkpoints)}
 **Current Error Count:** {self.error_count}
 **Current Warning Count:** {self.warning_count}
 **Last Check:** {self.last_check.strftime("%Y-%m-%d %H:%M:%S")}
+**Real-time Monitoring:** {self.monitor_mode} (poll interval {self.monitor_interval:g}s)
+**Index Memory:** {memory["total_bytes"] / 1024 / 1024:.1f} MB of {memory["limit_bytes"] / 1024 / 1024:.1f} MB ({self.store.evicted_rows} lines evicted)
+**Persistent Index:** {index_status}
 
 **Available Operations:**
 - Check all logs for errors and warnings
 - Search logs for specific terms
+- Query logs by level, service, file, time range and text
 - Get recent log activity
-- Generate error summaries"""
+- Generate error summaries
+- Compute error rates, bursts and co-occurrence analytics
+- List deduplicated incidents"""
 
         return status
 
@@ -372,9 +1462,34 @@ async def check_recent_logs(hours: int = 1) -> str:
 
 
 @tool
-async def search_logs(search_term: str, file_pattern: Optional[str] = None) -> str:
-    """Search logs for specific terms."""
-    return await log_monitor_manager.search_logs(search_term, file_pattern)
+async def search_logs(
+    search_term: str,
+    file_pattern: Optional[str] = None,
+    regex: bool = False,
+    severity: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 10,
+) -> str:
+    """Search all ingested log lines for a term, or a regular expression when regex is true.
+
+    Optionally filter by file name pattern and minimum severity (debug, info,
+    warning, error, critical). Results are newest first and paginated.
+    """
+    return await log_monitor_manager.search_logs(
+        search_term, file_pattern, regex, severity, page, page_size
+    )
+
+
+@tool
+async def query_logs(query: str, page: int = 1, page_size: int = 20) -> str:
+    """Find log lines with a query; all conditions must hold.
+
+    Conditions: level>=error (also level:, >, <=, <), service:NAME, file:PATTERN,
+    type:ERROR_TYPE, is:error, is:warning, since:15m, until:2h (durations ago or
+    ISO times), "quoted text", bare words and /regex/. Example:
+    level>=error service:coding since:15m "ZeroDivisionError"
+    """
+    return await log_monitor_manager.query_logs(query, page, page_size)
 
 
 @tool
@@ -383,6 +1498,30 @@ async def get_error_summary() -> str:
     return await log_monitor_manager.get_error_summary()
 
 
+@tool
+async def get_incidents(limit: int = 10) -> str:
+    """List deduplicated error incidents (tracebacks grouped into one), most frequent first."""
+    return await log_monitor_manager.get_incidents(limit)
+
+
+@tool
+async def get_log_context(file: str, line: int, before: int = 5, after: int = 5) -> str:
+    """Show the lines before and after a line of a log file, e.g. around an error found by search_logs or get_incidents. file is a path or a pattern matching one file."""
+    return await log_monitor_manager.get_log_context(file, line, before, after)
+
+
+@tool
+async def log_analytics(hours: float = 24, bucket_seconds: int = 60) -> str:
+    """Compute error rates per service, the busiest time buckets, percentiles of the time between errors and services failing together. Use hours=0 for the whole history."""
+    return await log_monitor_manager.log_analytics(hours, bucket_seconds)
+
+
+@tool
+async def get_anomalies() -> str:
+    """Report error rate anomalies detected on the live log stream and the last automatic handoff."""
+    return await log_monitor_manager.get_anomalies()
+
+
 @tool
 async def get_log_monitor_status() -> str:
     """Get the current status of the logging monitor agent."""
@@ -408,8 +1547,13 @@ When users want to search logs, find matching entries and present results.
 You can use the following tools to perform log monitoring operations:
 - check_logs: Check all log files for errors and issues
 - check_recent_logs: Check logs from the last N hours
-- search_logs: Search logs for specific terms
+- search_logs: Search all log lines for a term or regex, with file and severity filters and pages
+- query_logs: Find lines with a query combining conditions, e.g. level>=error service:coding since:15m "ZeroDivisionError"
 - get_error_summary: Get a summary of errors by type
+- log_analytics: Compute error rates per service, error bursts, time between errors and services failing together
+- get_incidents: List deduplicated incidents with a sample traceback; prefer it when handing errors to the Coding Agent
+- get_log_context: Show the lines around a line of a log file, e.g. around an error found by a search
+- get_anomalies: Report error rate spikes detected on the live stream; they are handed to the Coding Agent automatically
 - get_log_monitor_status: Get comprehensive logging monitor agent status
 
 If a user asks about something outside your capabilities (like GitHub operations, testing, or code analysis), you can suggest they ask the appropriate agent:
@@ -420,15 +1564,37 @@ If a user asks about something outside your capabilities (like GitHub operations
 - For project coordination: Ask the Supervisor Agent
 
 Format your responses in markdown for better readability.""",
-    tools=[check_logs, check_recent_logs, search_logs, get_error_summary, get_log_monitor_status],
+    tools=[
+        check_logs,
+        check_recent_logs,
+        search_logs,
+        query_logs,
+        get_error_summary,
+        get_incidents,
+        get_log_context,
+        log_analytics,
+        get_anomalies,
+        get_log_monitor_status,
+    ],
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ingest logs in the background while the service is running."""
+    await log_monitor_manager.start_monitoring()
+    try:
+        yield
+    finally:
+        await log_monitor_manager.stop_monitoring()
+
+
 # FastAPI app for web interface compatibility
 app = FastAPI(
     title="Vectras Logging Monitor Agent",
     description="Log monitoring and analysis agent",
     version="0.2.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS
@@ -490,6 +1656,104 @@ async def query_endpoint(request: QueryRequest) -> QueryResponse:
         )
 
 
+@app.get("/logs/query")
+async def logs_query(q: str, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """Run a log query and return the matching lines as JSON, newest first."""
+    try:
+        parsed = parse_query(q)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    await log_monitor_manager._catch_up()
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 1000)
+    total, entries = await asyncio.to_thread(
+        log_monitor_manager.run_query, parsed, (page - 1) * page_size, page_size
+    )
+    return {
+        "query": parsed.to_dict(),
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "entries": [entry.to_dict() for entry in entries],
+    }
+
+
+@app.get("/logs/analytics")
+async def logs_analytics(hours: float = 24, bucket_seconds: int = BUCKET_SECONDS) -> Dict[str, Any]:
+    """Return log analytics as JSON: histograms, service error rates, error gaps, co-occurrence."""
+    await log_monitor_manager._catch_up()
+    return await asyncio.to_thread(log_monitor_manager.analytics, hours, bucket_seconds)
+
+
+@app.get("/logs/context")
+async def logs_context(file: str, line: int, before: int = 5, after: int = 5) -> Dict[str, Any]:
+    """Return the lines around a line of a log file as JSON."""
+    try:
+        path, lines = await asyncio.to_thread(
+            log_monitor_manager.log_context, file, line, before, after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return {
+        "file": path,
+        "line": line,
+        "lines": [{"line_number": number, "content": content} for number, content in lines],
+    }
+
+
+@app.get("/logs/tail")
+async def logs_tail(
+    level: Optional[str] = None,
+    file: Optional[str] = None,
+    error_type: Optional[str] = None,
+    regex: Optional[str] = None,
+    buffer: int = SUBSCRIBER_BUFFER,
+) -> StreamingResponse:
+    """Stream newly ingested lines as server-sent events, filtered on the server.
+
+    level keeps lines at or above it, file matches paths like search_logs, and
+    regex is searched in the content. Each line is a "line" event holding its
+    JSON. When more than buffer lines arrive at once, only the newest are sent,
+    after a "skipped" event counting the others. A client that has not read its
+    buffer by the time new lines arrive receives a "dropped" event and its
+    stream ends.
+    """
+    try:
+        tail_filter = TailFilter(level, file, error_type, regex)
+    except (ValueError, re.error) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    live = log_monitor_manager.live
+    subscriber = live.subscribe(tail_filter, buffer)
+
+    async def events():
+        skipped = 0
+        try:
+            yield f"event: subscribed\ndata: {json.dumps(tail_filter.to_dict())}\n\n"
+            while True:
+                records = await subscriber.get(TAIL_KEEPALIVE_SECONDS)
+                if records is None:
+                    if subscriber.dropped:
+                        notice = {"reason": "slow consumer", "buffer": subscriber.buffer_size}
+                        yield f"event: dropped\ndata: {json.dumps(notice)}\n\n"
+                    break
+                if not records:
+                    yield ": keepalive\n\n"
+                if subscriber.skipped > skipped:
+                    notice = {"lines": subscriber.skipped - skipped}
+                    skipped = subscriber.skipped
+                    yield f"event: skipped\ndata: {json.dumps(notice)}\n\n"
+                for record in records:
+                    yield f"event: line\ndata: {json.dumps(record.to_dict())}\n\n"
+        finally:
+            live.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok", "service": "logging-monitor-agent"}
@@ -501,13 +1765,29 @@ async def status():
         "agent": "Logging Monitor Agent",
         "status": "active",
         "log_entries_count": len(log_monitor_manager.log_entries),
+        "total_entries": log_monitor_manager.total_entries,
+        "tailer": log_monitor_manager.tailer.stats(),
+        "store": log_monitor_manager.store.stats(),
+        "memory": log_monitor_manager.memory_usage(),
+        "index": log_monitor_manager.index_usage(),
+        "anomaly_detection": log_monitor_manager.detector.stats(),
+        "last_handoff": log_monitor_manager.last_handoff,
+        "incidents": log_monitor_manager.incidents.stats(),
+        "clusters": log_monitor_manager.clusters.stats(),
+        "live_tail": log_monitor_manager.live.stats(),
+        "monitoring": log_monitor_manager.monitor_mode,
         "error_count": log_monitor_manager.error_count,
         "sdk_version": "openai-agents",
         "tools": [
             "check_logs",
             "check_recent_logs",
             "search_logs",
+            "query_logs",
             "get_error_summary",
+            "get_incidents",
+            "get_log_context",
+            "log_analytics",
+            "get_anomalies",
             "get_log_monitor_status",
         ],
     }
@@ -5,13 +5,21 @@ This demonstrates how to migrate from the custom agent implementation
 to using the OpenAI Agents SDK for better tool management, handoffs, and tracing.
 """
 
+import asyncio
+import gzip
+import json
 import os
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_right
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from string import Template
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
-import yaml
 
 # OpenAI Agents SDK imports
 from agents import Agent, Runner
@@ -20,8 +28,519 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from ..utils.file_cache import CachedFile, file_cache
+from ..utils.files import DEFAULT_MAX_BYTES
+from ..utils.trigram import TrigramIndex, regex_literals
 from .base_agent import determine_response_type_with_llm
-from .config import get_openai_model, load_config
+from .config import UserSettingsStore, get_openai_model, load_config
+
+# File types listed, summarized and indexed as project files
+PROJECT_FILE_EXTENSIONS = (".py", ".yaml", ".yml", ".json", ".md", ".txt", ".sh")
+
+# Directories never treated as part of the project sources
+EXCLUDED_DIRECTORIES = ("logs", "__pycache__")
+
+
+def _is_excluded_name(name: str) -> bool:
+    """Check if a file or directory name is excluded from project files."""
+    return name.startswith(".") or name in EXCLUDED_DIRECTORIES
+
+
+def list_project_files(project_root: Path) -> List[str]:
+    """List project files using the existing exclusion rules."""
+    files = file_cache.list_files(project_root, prune=_is_excluded_name)
+    return sorted(
+        str(p.relative_to(project_root))
+        for p in files
+        if p.name.endswith(PROJECT_FILE_EXTENSIONS) and not _is_excluded_name(p.name)
+    )
+
+
+class ProjectSearchIndex:
+    """Persistent trigram index over the project's text files.
+
+    Files are re-indexed incrementally when their mtime or size changes, and the
+    index is saved under ./data so it does not need to be rebuilt on restart.
+    """
+
+    VERSION = 1
+
+    def __init__(self, project_root: Path, refresh_interval: float = 2.0):
+        self.project_root = project_root
+        self.index_path = project_root / "data" / "project_search_index.json.gz"
+        self.refresh_interval = refresh_interval
+        self.index = TrigramIndex()
+        self.files: Dict[str, Tuple[int, int, int]] = {}  # path -> (doc_id, mtime_ns, size)
+        self.paths: Dict[int, str] = {}
+        self.next_doc_id = 0
+        self.last_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        # Held while refresh changes index, files and paths, which search reads
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        """Load a previously saved index, ignoring missing or incompatible files."""
+        try:
+            with gzip.open(self.index_path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                return
+            self.index = TrigramIndex.from_dict(data["index"])
+            self.files = {path: tuple(info) for path, info in data["files"].items()}
+            self.paths = {info[0]: path for path, info in self.files.items()}
+            self.next_doc_id = data["next_doc_id"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: ignoring unreadable search index {self.index_path}: {e}")
+
+    def save(self) -> None:
+        """Atomically write the index to disk."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": self.VERSION,
+            "next_doc_id": self.next_doc_id,
+            "files": self.files,
+            "index": self.index.to_dict(),
+        }
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """Index new and changed files and drop deleted ones."""
+        with self._refresh_lock:
+            return self._refresh(force)
+
+    def _refresh(self, force: bool) -> Dict[str, int]:
+        changes = {"added": 0, "updated": 0, "removed": 0}
+        now = time.monotonic()
+        if not force and now - self.last_refresh < self.refresh_interval:
+            return changes
+        self.last_refresh = now
+
+        seen = set()
+        for path in list_project_files(self.project_root):
+            seen.add(path)
+            try:
+                st = os.stat(self.project_root / path)
+            except OSError:
+                continue
+            known = self.files.get(path)
+            if known and known[1] == st.st_mtime_ns and known[2] == st.st_size:
+                continue
+
+            try:
+                text = file_cache.read_text(self.project_root / path)
+            except OSError:
+                continue
+            with self._lock:
+                if known:
+                    self.index.remove(known[0])
+                    del self.paths[known[0]]
+                    changes["updated"] += 1
+                else:
+                    changes["added"] += 1
+
+                doc_id = self.next_doc_id
+                self.next_doc_id += 1
+                self.index.add(doc_id, text)
+                self.files[path] = (doc_id, st.st_mtime_ns, st.st_size)
+                self.paths[doc_id] = path
+
+        with self._lock:
+            for path in [p for p in self.files if p not in seen]:
+                doc_id = self.files.pop(path)[0]
+                self.index.remove(doc_id)
+                del self.paths[doc_id]
+                changes["removed"] += 1
+
+        if any(changes.values()):
+            try:
+                self.save()
+            except Exception as e:
+                print(f"Warning: could not save search index: {e}")
+        return changes
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        limit: int = 50,
+        per_file: int = 20,
+    ) -> Tuple[List[Tuple[float, str, int, str]], int]:
+        """Find matching lines, ranked by relevance.
+
+        Returns ([(score, path, line_number, line), ...], candidate_file_count).
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        matcher = re.compile(query if regex else re.escape(query), flags)
+        literals = regex_literals(query) if regex else [query]
+
+        with self._lock:
+            candidates = self.index.candidates(literals)
+            if candidates is None:
+                candidate_paths = sorted(self.files)
+            else:
+                candidate_paths = [self.paths[doc_id] for doc_id in candidates]
+
+        query_lower = query.lower()
+        word = re.compile(rf"\b{re.escape(query)}\b") if not regex else None
+        results = []
+        for path in candidate_paths:
+            full_path = self.project_root / path
+            cached = file_cache.get(full_path)
+            if cached is None:
+                try:
+                    text = full_path.read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue
+                cached = CachedFile(str(full_path), 0, len(text), text)
+            offsets = cached.line_offsets
+            path_bonus = 1.0 if not regex and query_lower in path.lower() else 0.0
+
+            last_line = 0
+            found = 0
+            for match in matcher.finditer(cached.text):
+                line_number = bisect_right(offsets, match.start())
+                if line_number == last_line:
+                    continue
+                last_line = line_number
+                line = cached.text[offsets[line_number - 1] : offsets[line_number]].strip()
+
+                score = 1.0 + path_bonus
+                if word is not None:
+                    if query in line:
+                        score += 1.0
+                    if word.search(line):
+                        score += 1.0
+                if line.startswith(("def ", "async def ", "class ")):
+                    score += 2.0
+                results.append((score, path, line_number, line))
+
+                found += 1
+                if found >= per_file:
+                    break
+
+        results.sort(key=lambda r: (-r[0], r[1], r[2]))
+        return results[:limit], len(candidate_paths)
+
+
+# Maximum characters of a step's output substituted into downstream queries
+MAX_STEP_OUTPUT_CHARS = 4000
+
+# Timeout for a single workflow step handed to an agent
+WORKFLOW_STEP_TIMEOUT = 300.0
+
+# Workflow names and run ids, which name checkpoint files
+_RUN_ID_PATTERN = re.compile(r"[\w.-]+")
+
+StepRunner = Callable[[str, str, Dict[str, Any]], Awaitable[str]]
+
+
+class WorkflowStep:
+    """A step of a declarative workflow, handled by one agent.
+
+    The query is a string.Template; $name placeholders are filled from the workflow
+    inputs and from the outputs of completed steps, referenced by step id.
+    """
+
+    def __init__(
+        self,
+        step_id: str,
+        agent_id: str,
+        query: str,
+        depends_on: Optional[List[str]] = None,
+        description: str = "",
+    ):
+        self.step_id = step_id
+        self.agent_id = agent_id
+        self.query = query
+        self.depends_on = list(depends_on or [])
+        self.description = description
+
+    def render_query(self, values: Dict[str, str]) -> str:
+        return Template(self.query).safe_substitute(values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "step_id": self.step_id,
+            "agent_id": self.agent_id,
+            "query": self.query,
+            "depends_on": self.depends_on,
+            "description": self.description,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowStep":
+        return cls(
+            step_id=data["step_id"],
+            agent_id=data["agent_id"],
+            query=data["query"],
+            depends_on=data.get("depends_on"),
+            description=data.get("description", ""),
+        )
+
+
+# Log detection -> coding analysis -> lint and tests in parallel -> GitHub PR
+FIX_PIPELINE = [
+    WorkflowStep(
+        "detect",
+        "logging-monitor",
+        "Check the logs for errors. Report the most recent error with its message, "
+        "file path and line number.\nReported problem: $error",
+        description="Detect errors in the logs",
+    ),
+    WorkflowStep(
+        "analyze",
+        "coding",
+        "Analyze this error, find its root cause and apply a fix. "
+        "List the files you changed.\n\n$detect",
+        depends_on=["detect"],
+        description="Analyze and fix the error",
+    ),
+    WorkflowStep(
+        "lint",
+        "linting",
+        "Lint and auto-fix the files changed by this fix:\n\n$analyze",
+        depends_on=["analyze"],
+        description="Check code quality of the fix",
+    ),
+    WorkflowStep(
+        "test",
+        "testing",
+        "Run the tests for the code changed by this fix:\n\n$analyze",
+        depends_on=["analyze"],
+        description="Test the fix",
+    ),
+    WorkflowStep(
+        "pull_request",
+        "github",
+        "Create a branch and a pull request for this fix.\n\nFix:\n$analyze"
+        "\n\nLint results:\n$lint\n\nTest results:\n$test",
+        depends_on=["lint", "test"],
+        description="Open a pull request",
+    ),
+]
+
+
+class WorkflowRun:
+    """State of one workflow execution, checkpointed after every step."""
+
+    def __init__(
+        self,
+        name: str,
+        steps: List[WorkflowStep],
+        inputs: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None,
+    ):
+        self.run_id = (
+            run_id or f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        )
+        self.name = name
+        self.steps = steps
+        self.inputs = inputs or {}
+        self.status = "pending"
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.states: Dict[str, Dict[str, Any]] = {
+            step.step_id: {"status": "pending", "output": None, "error": None, "attempts": 0}
+            for step in steps
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "status": self.status,
+            "inputs": self.inputs,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "steps": [step.to_dict() for step in self.steps],
+            "states": self.states,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowRun":
+        run = cls(
+            data["name"],
+            [WorkflowStep.from_dict(step) for step in data["steps"]],
+            data.get("inputs"),
+            data["run_id"],
+        )
+        run.status = data["status"]
+        run.created_at = datetime.fromisoformat(data["created_at"])
+        run.updated_at = datetime.fromisoformat(data["updated_at"])
+        run.states.update(data["states"])
+        return run
+
+
+class WorkflowEngine:
+    """Runs workflows as DAGs of agent steps.
+
+    Steps whose dependencies are complete run concurrently. The run is checkpointed
+    to ./data/workflows after every step, and resuming a run only executes the
+    steps that have not completed.
+    """
+
+    def __init__(self, checkpoint_dir: Path, runner: StepRunner):
+        self.checkpoint_dir = checkpoint_dir
+        self.runner = runner
+        self.runs: Dict[str, WorkflowRun] = {}
+
+    @staticmethod
+    def validate(steps: List[WorkflowStep]) -> None:
+        """Raise ValueError for duplicate ids, unknown dependencies or cycles."""
+        ids = [step.step_id for step in steps]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Workflow step ids must be unique")
+        known = set(ids)
+        for step in steps:
+            missing = [dep for dep in step.depends_on if dep not in known]
+            if missing:
+                raise ValueError(f"Step '{step.step_id}' depends on unknown steps: {missing}")
+
+        # Kahn's algorithm: every step must become ready eventually
+        remaining = {step.step_id: set(step.depends_on) for step in steps}
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        while ready:
+            done = ready.pop()
+            del remaining[done]
+            for step_id, deps in remaining.items():
+                if done in deps:
+                    deps.discard(done)
+                    if not deps:
+                        ready.append(step_id)
+        if remaining:
+            raise ValueError(f"Workflow has a dependency cycle among: {sorted(remaining)}")
+
+    def _checkpoint_path(self, run_id: str) -> Path:
+        """Checkpoint file of a run; raises ValueError for an id that would leave checkpoint_dir."""
+        if not _RUN_ID_PATTERN.fullmatch(run_id):
+            raise ValueError(f"Invalid workflow run id '{run_id}'")
+        path = (self.checkpoint_dir / f"{run_id}.json").resolve()
+        if path.parent != self.checkpoint_dir.resolve():
+            raise ValueError(f"Invalid workflow run id '{run_id}'")
+        return path
+
+    def checkpoint(self, run: WorkflowRun) -> None:
+        """Atomically persist the run state."""
+        run.updated_at = datetime.now()
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        path = self._checkpoint_path(run.run_id)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(run.to_dict(), indent=2, default=str))
+        os.replace(tmp_path, path)
+
+    def load(self, run_id: str) -> Optional[WorkflowRun]:
+        """Get a run from memory or from its checkpoint."""
+        if run_id in self.runs:
+            return self.runs[run_id]
+        path = self._checkpoint_path(run_id)
+        if not path.exists():
+            return None
+        run = WorkflowRun.from_dict(json.loads(path.read_text()))
+        self.runs[run_id] = run
+        return run
+
+    def list_runs(self) -> List[str]:
+        """List known run ids, most recently created first."""
+        created = {run_id: run.created_at.isoformat() for run_id, run in self.runs.items()}
+        if self.checkpoint_dir.exists():
+            for path in self.checkpoint_dir.glob("*.json"):
+                if path.stem in created:
+                    continue
+                try:
+                    created[path.stem] = json.loads(path.read_text())["created_at"]
+                except (OSError, ValueError, KeyError):
+                    created[path.stem] = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+        return sorted(created, key=created.__getitem__, reverse=True)
+
+    async def run(
+        self, name: str, steps: List[WorkflowStep], inputs: Optional[Dict[str, Any]] = None
+    ) -> WorkflowRun:
+        """Start a new workflow run and execute it to completion or failure."""
+        if not _RUN_ID_PATTERN.fullmatch(name):
+            raise ValueError(
+                f"Invalid workflow name '{name}': use only letters, digits, '.', '_' and '-'"
+            )
+        self.validate(steps)
+        run = WorkflowRun(name, steps, inputs)
+        self.runs[run.run_id] = run
+        return await self._execute(run)
+
+    async def resume(self, run_id: str) -> WorkflowRun:
+        """Re-run the failed and unfinished steps of a checkpointed run."""
+        run = self.load(run_id)
+        if run is None:
+            raise ValueError(f"Workflow run '{run_id}' not found")
+        for state in run.states.values():
+            if state["status"] != "completed":
+                state["status"] = "pending"
+                state["error"] = None
+        return await self._execute(run)
+
+    def _values(self, run: WorkflowRun) -> Dict[str, str]:
+        values = {key: str(value) for key, value in run.inputs.items()}
+        for step_id, state in run.states.items():
+            if state["status"] == "completed":
+                values[step_id] = str(state["output"])[:MAX_STEP_OUTPUT_CHARS]
+        return values
+
+    async def _run_step(self, run: WorkflowRun, step: WorkflowStep) -> str:
+        query = step.render_query(self._values(run))
+        context = {"workflow": run.name, "run_id": run.run_id, "step": step.step_id}
+        return await self.runner(step.agent_id, query, context)
+
+    async def _execute(self, run: WorkflowRun) -> WorkflowRun:
+        run.status = "running"
+        self.checkpoint(run)
+
+        running: Dict[asyncio.Task, str] = {}
+        failed = False
+        while True:
+            if not failed:
+                for step in run.steps:
+                    state = run.states[step.step_id]
+                    if state["status"] != "pending":
+                        continue
+                    if all(run.states[dep]["status"] == "completed" for dep in step.depends_on):
+                        state["status"] = "running"
+                        state["attempts"] += 1
+                        state["started_at"] = datetime.now().isoformat()
+                        task = asyncio.create_task(self._run_step(run, step))
+                        running[task] = step.step_id
+                if running:
+                    self.checkpoint(run)
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                state = run.states[running.pop(task)]
+                state["finished_at"] = datetime.now().isoformat()
+                try:
+                    state["output"] = task.result()
+                    state["status"] = "completed"
+                except Exception as e:
+                    # Let in-flight steps finish, but start nothing new
+                    state["status"] = "failed"
+                    state["error"] = str(e)
+                    failed = True
+            self.checkpoint(run)
+
+        if all(state["status"] == "completed" for state in run.states.values()):
+            run.status = "completed"
+        else:
+            run.status = "failed"
+        self.checkpoint(run)
+        return run
 
 
 class SupervisorManager:
@@ -31,6 +550,11 @@ class SupervisorManager:
         self.project_root = Path(".")
         self.user_settings_path = self.project_root / "config" / "user_settings.yaml"
         self.user_settings_path.parent.mkdir(parents=True, exist_ok=True)
+        self.settings_store = UserSettingsStore(self.user_settings_path)
+        self._search_index: Optional[ProjectSearchIndex] = None
+        self.workflow_engine = WorkflowEngine(
+            self.project_root / "data" / "workflows", self._run_agent_step
+        )
 
         # Load configuration to get agent ports dynamically
         config = load_config()
@@ -59,18 +583,7 @@ class SupervisorManager:
         try:
             if pattern == "*":
                 # Get common project files
-                files = []
-                for ext in [".py", ".yaml", ".yml", ".json", ".md", ".txt", ".sh"]:
-                    files.extend(
-                        [
-                            str(p.relative_to(self.project_root))
-                            for p in self.project_root.rglob(f"*{ext}")
-                            if not any(part.startswith(".") for part in p.parts)
-                            and "logs" not in p.parts
-                            and "__pycache__" not in str(p)
-                        ]
-                    )
-                files = sorted(set(files))[:limit]
+                files = list_project_files(self.project_root)[:limit]
             else:
                 files = [
                     str(p.relative_to(self.project_root)) for p in self.project_root.glob(pattern)
@@ -92,8 +605,16 @@ class SupervisorManager:
         except Exception as e:
             return f"❌ Error getting project files: {str(e)}"
 
-    async def read_file(self, file_path: str) -> str:
-        """Read contents of a project file."""
+    async def read_file(
+        self,
+        file_path: str,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        byte_offset: Optional[int] = None,
+        byte_length: Optional[int] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> str:
+        """Read contents of a project file, optionally limited to a line or byte range."""
         try:
             full_path = self.project_root / file_path
             if not full_path.exists() or not full_path.is_file():
@@ -103,17 +624,44 @@ class SupervisorManager:
             if not str(full_path.resolve()).startswith(str(self.project_root.resolve())):
                 return f"❌ Access denied: File '{file_path}' is outside project directory."
 
-            with open(full_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            file_slice = file_cache.read_slice(
+                full_path,
+                start_line=start_line,
+                end_line=end_line,
+                byte_offset=byte_offset,
+                byte_length=byte_length,
+                max_bytes=max_bytes,
+            )
+
+            if file_slice.is_binary:
+                return f"""## File Contents: {file_path}
+
+**Size:** {file_slice.size} bytes
+
+⚠️ Binary file, contents not shown."""
 
-            return f"""## File Contents: {file_path}
+            status = f"""## File Contents: {file_path}
 
-**Size:** {len(content)} characters
+**Size:** {file_slice.size} bytes"""
+
+            if file_slice.start_line is not None:
+                status += f"\n**Lines:** {file_slice.start_line}-{file_slice.end_line}"
+            elif byte_offset is not None or byte_length is not None:
+                status += f"\n**Bytes:** {file_slice.start_byte}-{file_slice.end_byte}"
+            elif file_slice.truncated:
+                status += (
+                    f"\n⚠️ File exceeds {max_bytes} bytes, showing head and tail only. "
+                    "Use start_line/end_line or byte_offset/byte_length to read a specific part."
+                )
+
+            status += f"""
 
 ```{self._get_file_extension(file_path)}
-{content}
+{file_slice.text}
 ```"""
 
+            return status
+
         except Exception as e:
             return f"❌ Error reading file '{file_path}': {str(e)}"
 
@@ -133,14 +681,156 @@ class SupervisorManager:
         else:
             return "text"
 
+    @property
+    def search_index(self) -> ProjectSearchIndex:
+        """Get the project search index, rebuilding it if the project root changed."""
+        if self._search_index is None or self._search_index.project_root != self.project_root:
+            self._search_index = ProjectSearchIndex(self.project_root)
+        return self._search_index
+
+    async def search_project(
+        self, query: str, regex: bool = False, case_sensitive: bool = False, limit: int = 50
+    ) -> str:
+        """Search project text files for a substring or regex."""
+        try:
+            if not query:
+                return "❌ Please provide a search query."
+            if regex:
+                try:
+                    re.compile(query)
+                except re.error as e:
+                    return f"❌ Invalid regular expression: {str(e)}"
+
+            start = time.perf_counter()
+            index = self.search_index
+            changes = await asyncio.to_thread(index.refresh)
+            results, candidate_count = index.search(query, regex, case_sensitive, limit)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            status = f"""## Project Search Results
+
+**Query:** "{query}"
+**Mode:** {"regex" if regex else "substring"}{" (case sensitive)" if case_sensitive else ""}
+**Files Indexed:** {len(index.files)}
+**Candidate Files:** {candidate_count}
+**Matches Shown:** {len(results)}
+**Search Time:** {elapsed_ms:.1f} ms"""
+
+            if any(changes.values()):
+                status += (
+                    f"\n**Index Updated:** {changes['added']} added, "
+                    f"{changes['updated']} updated, {changes['removed']} removed"
+                )
+
+            if results:
+                status += "\n\n**Results:**"
+                for _score, path, line_number, line in results:
+                    status += f"\n- `{path}:{line_number}`: {line[:200]}"
+            else:
+                status += "\n\n❌ No matches found."
+
+            return status
+
+        except Exception as e:
+            return f"❌ Error searching project: {str(e)}"
+
+    async def _run_agent_step(self, agent_id: str, query: str, context: Dict[str, Any]) -> str:
+        """Send a workflow step to an agent and return its response."""
+        endpoint = self.agent_endpoints.get(agent_id)
+        if not endpoint:
+            raise ValueError(f"No endpoint configured for agent '{agent_id}'")
+
+        async with httpx.AsyncClient(timeout=WORKFLOW_STEP_TIMEOUT) as client:
+            response = await client.post(
+                f"{endpoint}/query", json={"query": query, "context": context}
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        if data.get("status") != "success":
+            raise RuntimeError(f"{agent_id} agent failed: {data.get('response')}")
+        return str(data.get("response", ""))
+
+    def _format_workflow_run(self, run: WorkflowRun) -> str:
+        """Format a workflow run as markdown."""
+        icons = {"completed": "✅", "failed": "❌", "running": "⏳", "pending": "⏸️"}
+        status = f"""## Workflow Run: {run.run_id}
+
+**Workflow:** {run.name}
+**Status:** {icons.get(run.status, "")} {run.status}
+**Updated:** {run.updated_at.strftime("%Y-%m-%d %H:%M:%S")}
+
+**Steps:**"""
+
+        for step in run.steps:
+            state = run.states[step.step_id]
+            depends = f" (after {', '.join(step.depends_on)})" if step.depends_on else ""
+            status += (
+                f"\n- {icons.get(state['status'], '')} **{step.step_id}** "
+                f"[{step.agent_id}]{depends}: {state['status']}"
+            )
+            if state.get("error"):
+                status += f"\n  Error: {state['error']}"
+            elif state["status"] == "completed" and state.get("output"):
+                status += f"\n  Output: {str(state['output'])[:200]}"
+
+        if run.status == "failed":
+            status += f"\n\nResume with `resume_workflow` and run id `{run.run_id}`."
+
+        return status
+
+    async def run_fix_workflow(self, error_description: str = "") -> str:
+        """Run the fix pipeline: detect, analyze, lint and test in parallel, open a PR."""
+        try:
+            run = await self.workflow_engine.run(
+                "fix", FIX_PIPELINE, {"error": error_description or "Not specified"}
+            )
+            return self._format_workflow_run(run)
+        except Exception as e:
+            return f"❌ Error running fix workflow: {str(e)}"
+
+    async def run_workflow(self, name: str, steps: List[Dict[str, Any]]) -> str:
+        """Run a custom workflow given as a list of step definitions."""
+        try:
+            workflow_steps = [WorkflowStep.from_dict(step) for step in steps]
+            run = await self.workflow_engine.run(name, workflow_steps)
+            return self._format_workflow_run(run)
+        except Exception as e:
+            return f"❌ Error running workflow: {str(e)}"
+
+    async def resume_workflow(self, run_id: str) -> str:
+        """Resume a failed workflow run without redoing completed steps."""
+        try:
+            run = await self.workflow_engine.resume(run_id)
+            return self._format_workflow_run(run)
+        except Exception as e:
+            return f"❌ Error resuming workflow: {str(e)}"
+
+    def get_workflow_status(self, run_id: Optional[str] = None) -> str:
+        """Get the status of a workflow run, or list recent runs."""
+        if run_id:
+            try:
+                run = self.workflow_engine.load(run_id)
+            except ValueError as e:
+                return f"❌ {e}"
+            if run is None:
+                return f"❌ Workflow run '{run_id}' not found."
+            return self._format_workflow_run(run)
+
+        run_ids = self.workflow_engine.list_runs()
+        status = f"""## Workflow Runs
+
+**Total Runs:** {len(run_ids)}"""
+        for recent_id in run_ids[:10]:
+            run = self.workflow_engine.load(recent_id)
+            if run:
+                status += f"\n- **{run.run_id}** ({run.name}): {run.status}"
+        return status
+
     async def get_user_settings(self) -> str:
         """Get user settings from config file."""
         try:
-            if self.user_settings_path.exists():
-                with open(self.user_settings_path, "r") as f:
-                    settings = yaml.safe_load(f) or {}
-            else:
-                settings = {}
+            settings = self.settings_store.get()
 
             # Add some defaults
             defaults = {
@@ -170,19 +860,8 @@ class SupervisorManager:
     async def update_user_settings(self, updates: Dict[str, Any]) -> str:
         """Update user settings."""
         try:
-            # Load current settings
-            if self.user_settings_path.exists():
-                with open(self.user_settings_path, "r") as f:
-                    settings = yaml.safe_load(f) or {}
-            else:
-                settings = {}
-
-            # Apply updates
-            settings.update(updates)
-
-            # Save settings
-            with open(self.user_settings_path, "w") as f:
-                yaml.dump(settings, f, default_flow_style=False)
+            # Concurrent updates are merged into one atomic write
+            await self.settings_store.update(updates)
 
             status = """## Settings Updated
 
@@ -275,17 +954,7 @@ class SupervisorManager:
         """Get a comprehensive project summary."""
         try:
             # Get project files
-            files = []
-            for ext in [".py", ".yaml", ".yml", ".json", ".md", ".txt", ".sh"]:
-                files.extend(
-                    [
-                        str(p.relative_to(self.project_root))
-                        for p in self.project_root.rglob(f"*{ext}")
-                        if not any(part.startswith(".") for part in p.parts)
-                        and "logs" not in p.parts
-                        and "__pycache__" not in str(p)
-                    ]
-                )
+            files = list_project_files(self.project_root)
 
             # Count files by type
             file_counts = {}
@@ -294,10 +963,7 @@ class SupervisorManager:
                 file_counts[ext] = file_counts.get(ext, 0) + 1
 
             # Get settings
-            settings = {}
-            if self.user_settings_path.exists():
-                with open(self.user_settings_path, "r") as f:
-                    settings = yaml.safe_load(f) or {}
+            settings = self.settings_store.get()
 
             status = f"""## Project Summary
 
@@ -332,6 +998,8 @@ class SupervisorManager:
 
 **Available Operations:**
 - Get project files and file contents
+- Search project code
+- Run and resume multi-agent workflows
 - Manage user settings
 - Check agent health and status
 - Generate project summaries
@@ -355,9 +1023,67 @@ async def get_project_files(pattern: str = "*", limit: int = 100) -> str:
 
 
 @tool
-async def read_file(file_path: str) -> str:
-    """Read contents of a project file."""
-    return await supervisor_manager.read_file(file_path)
+async def read_file(
+    file_path: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    byte_offset: Optional[int] = None,
+    byte_length: Optional[int] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> str:
+    """Read contents of a project file.
+
+    Use start_line/end_line (1-based, inclusive) or byte_offset/byte_length to read only
+    part of a large file. Files larger than max_bytes are returned as a head/tail preview.
+    """
+    return await supervisor_manager.read_file(
+        file_path, start_line, end_line, byte_offset, byte_length, max_bytes
+    )
+
+
+@tool
+async def search_project(
+    query: str, regex: bool = False, case_sensitive: bool = False, limit: int = 50
+) -> str:
+    """Search all project text files for a substring or regular expression.
+
+    Returns ranked file:line results from a trigram index. Prefer this over reading
+    whole files when looking for where something is defined or used.
+    """
+    return await supervisor_manager.search_project(query, regex, case_sensitive, limit)
+
+
+@tool
+async def run_fix_workflow(error_description: str = "") -> str:
+    """Run the fix pipeline: log detection, coding fix, lint and tests in parallel, GitHub PR.
+
+    Progress is checkpointed so a failed run can be resumed with resume_workflow.
+    """
+    return await supervisor_manager.run_fix_workflow(error_description)
+
+
+@tool
+async def run_workflow(name: str, steps: str) -> str:
+    """Run a custom workflow. Provide steps as a JSON list of objects with step_id,
+    agent_id, query and optional depends_on; $step_id in a query is replaced with
+    that step's output."""
+    try:
+        steps_list = json.loads(steps)
+    except json.JSONDecodeError:
+        return "❌ Invalid JSON format. Please provide steps as a valid JSON list."
+    return await supervisor_manager.run_workflow(name, steps_list)
+
+
+@tool
+async def resume_workflow(run_id: str) -> str:
+    """Resume a failed workflow run, skipping the steps that already completed."""
+    return await supervisor_manager.resume_workflow(run_id)
+
+
+@tool
+async def get_workflow_status(run_id: Optional[str] = None) -> str:
+    """Get the status of a workflow run, or list recent runs when no run id is given."""
+    return supervisor_manager.get_workflow_status(run_id)
 
 
 @tool
@@ -369,8 +1095,6 @@ async def get_user_settings() -> str:
 @tool
 async def update_user_settings(updates: str) -> str:
     """Update user settings. Provide updates as a JSON string."""
-    import json
-
     try:
         updates_dict = json.loads(updates)
         return await supervisor_manager.update_user_settings(updates_dict)
@@ -420,7 +1144,12 @@ When users want to check agent health, verify all agents are running properly.
 
 You can use the following tools to perform project coordination operations:
 - get_project_files: Get list of project files matching a pattern
-- read_file: Read contents of a project file
+- read_file: Read contents of a project file (supports line and byte ranges for large files)
+- search_project: Search project files for a substring or regex, returning matching lines
+- run_fix_workflow: Run the fix pipeline (log detection, coding fix, lint and tests, GitHub PR)
+- run_workflow: Run a custom multi-agent workflow described as a DAG of steps
+- resume_workflow: Resume a failed workflow run without redoing completed steps
+- get_workflow_status: Get the status of workflow runs
 - get_user_settings: Get user settings from config file
 - update_user_settings: Update user settings
 - check_agent_health: Check health of all agents
@@ -439,6 +1168,11 @@ Format your responses in markdown for better readability.""",
     tools=[
         get_project_files,
         read_file,
+        search_project,
+        run_fix_workflow,
+        run_workflow,
+        resume_workflow,
+        get_workflow_status,
         get_user_settings,
         update_user_settings,
         check_agent_health,
@@ -560,10 +1294,16 @@ async def status():
         "agent": "Supervisor Agent",
         "status": "active",
         "project_root": str(supervisor_manager.project_root),
+        "file_cache": file_cache.stats(),
         "sdk_version": "openai-agents",
         "tools": [
             "get_project_files",
             "read_file",
+            "search_project",
+            "run_fix_workflow",
+            "run_workflow",
+            "resume_workflow",
+            "get_workflow_status",
             "get_user_settings",
             "update_user_settings",
             "check_agent_health",
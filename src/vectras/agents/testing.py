@@ -19,6 +19,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from ..utils.file_cache import file_cache
 from .base_agent import determine_response_type_with_llm
 
 
@@ -148,7 +149,7 @@ if __name__ == "__main__":
                     del self.test_tools[existing_tool.id]
 
                 try:
-                    code = file_path.read_text()
+                    code = file_cache.read_text(file_path)
                     tool = TestingTool(
                         name=tool_name,
                         language="python",
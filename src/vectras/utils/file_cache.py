@@ -0,0 +1,392 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Shared in-process cache of project files used by the Vectras agents.
+
+Entries are keyed by (path, mtime, size), so a file is only re-read from disk
+after it changes. Each entry keeps the decoded text, lazily computed line
+offsets and, for Python files, a lazily parsed AST. Slices are cut from the raw
+bytes, which are only held separately for non-ASCII files, so byte offsets and
+caps match reads from disk. The cache is bounded by an
+estimated memory budget and evicts the least recently used entries first.
+"""
+
+import ast
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .files import (
+    BINARY_SNIFF_BYTES,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_PREVIEW_LINES,
+    FileSlice,
+    decode_text,
+    looks_binary,
+    read_file_slice,
+    slice_lines,
+)
+
+# Default memory budget for all cached files
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Files larger than this are never cached and are read through mmap instead
+DEFAULT_MAX_FILE_BYTES = 4 * 1024 * 1024
+
+# Maximum number of directory listings kept for file discovery
+DEFAULT_MAX_DIRECTORIES = 10000
+
+# Rough multiplier of source size used to account for a parsed AST
+AST_SIZE_FACTOR = 8
+
+
+class CachedFile:
+    """Decoded contents of a file at a given (mtime, size)."""
+
+    def __init__(
+        self, path: str, mtime_ns: int, size: int, text: str, data: Optional[bytes] = None
+    ):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.text = text
+        # ASCII text encodes back to the same bytes, so only other files keep them
+        self._data = None if data is None or text.isascii() else data
+        self._line_offsets: Optional[array] = None
+        self._byte_line_offsets: Optional[array] = None
+        self._ast: Optional[ast.AST] = None
+        self._ast_error: Optional[SyntaxError] = None
+
+    @staticmethod
+    def _offsets(parts: List[Any]) -> array:
+        offsets = array("q", [0])
+        offsets.extend(accumulate(len(part) + 1 for part in parts))
+        # The last part has no trailing newline; drop it entirely if it is empty
+        offsets[-1] -= 1
+        if len(offsets) > 1 and offsets[-1] == offsets[-2]:
+            offsets.pop()
+        return offsets
+
+    @property
+    def data(self) -> bytes:
+        """Raw contents of the file."""
+        return self._data if self._data is not None else self.text.encode("utf-8")
+
+    @property
+    def line_offsets(self) -> array:
+        """Character offset of the start of each line, plus a final end offset."""
+        if self._line_offsets is None:
+            self._line_offsets = self._offsets(self.text.split("\n"))
+        return self._line_offsets
+
+    @property
+    def byte_line_offsets(self) -> array:
+        """Byte offset of the start of each line, plus a final end offset."""
+        if self._data is None:
+            return self.line_offsets
+        if self._byte_line_offsets is None:
+            self._byte_line_offsets = self._offsets(self._data.split(b"\n"))
+        return self._byte_line_offsets
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets) - 1
+
+    def get_ast(self) -> ast.AST:
+        """Parse the text as Python once; raises the cached SyntaxError on invalid code."""
+        if self._ast is None and self._ast_error is None:
+            try:
+                self._ast = ast.parse(self.text, filename=self.path)
+            except SyntaxError as e:
+                self._ast_error = e
+        if self._ast_error is not None:
+            raise self._ast_error
+        return self._ast
+
+    @property
+    def memory_size(self) -> int:
+        """Estimated memory held by this entry."""
+        total = sys.getsizeof(self.text)
+        if self._data is not None:
+            total += sys.getsizeof(self._data)
+        for offsets in (self._line_offsets, self._byte_line_offsets):
+            if offsets is not None:
+                total += offsets.itemsize * len(offsets)
+        if self._ast is not None:
+            total += self.size * AST_SIZE_FACTOR
+        return total
+
+    def slice(
+        self,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        preview_lines: int = DEFAULT_PREVIEW_LINES,
+    ) -> FileSlice:
+        """Return a line range or head/tail preview using the cached line offsets.
+
+        Offsets and caps are counted in bytes, as read_file_slice() counts them.
+        """
+        data = self.data
+        if start_line is None and end_line is None:
+            return slice_lines(
+                Path(self.path), data, len(data), None, None, max_bytes, preview_lines
+            )
+
+        offsets = self.byte_line_offsets
+        line_count = len(offsets) - 1
+        requested = max(start_line or 1, 1)
+        first = min(requested, line_count + 1)
+        last = min(end_line if end_line is not None else line_count, line_count)
+        last = max(last, first - 1)
+        start, end = offsets[first - 1], offsets[last]
+        truncated = False
+        if max_bytes is not None and end - start > max_bytes:
+            # Keep the whole lines that fit within the cap
+            while last >= first and offsets[last] - start > max_bytes:
+                last -= 1
+            end = offsets[last] if last >= first else start + max_bytes
+            truncated = True
+        return FileSlice(
+            self.path,
+            decode_text(data[start:end]),
+            self.size,
+            start,
+            end,
+            start_line=requested,
+            end_line=max(last, requested),
+            truncated=truncated or start > 0 or end < len(data),
+        )
+
+
+class FileCache:
+    """LRU cache of decoded files and directory listings, bounded by memory."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        max_directories: int = DEFAULT_MAX_DIRECTORIES,
+    ):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.max_directories = max_directories
+        self._entries: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._directories: "OrderedDict[str, Tuple[int, List[str], List[str]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.directory_hits = 0
+        self.directory_misses = 0
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        return os.path.abspath(path)
+
+    def get(self, path: Union[str, Path]) -> Optional[CachedFile]:
+        """Return the cached file, re-reading it if its mtime or size changed.
+
+        Returns None for files that are binary, too large to cache, or unreadable.
+        """
+        key = self._key(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.invalidate(key)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        if st.st_size > self.max_file_bytes:
+            self.invalidate(key)
+            return None
+
+        try:
+            with open(key, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.invalidate(key)
+            return None
+
+        if looks_binary(data[:BINARY_SNIFF_BYTES]):
+            self.invalidate(key)
+            return None
+
+        entry = CachedFile(
+            key, st.st_mtime_ns, len(data), data.decode("utf-8", errors="replace"), data
+        )
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key: str, entry: CachedFile) -> None:
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = entry
+            self._account(key, entry)
+
+    def _account(self, key: str, entry: CachedFile) -> None:
+        """Refresh the memory accounting for an entry and evict down to the budget."""
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return
+            size = entry.memory_size
+            self.current_bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    break
+                self._discard(oldest)
+                self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.current_bytes -= self._sizes.pop(key, 0)
+
+    def invalidate(self, path: Union[str, Path]) -> None:
+        """Drop a file from the cache."""
+        with self._lock:
+            self._discard(self._key(path))
+
+    def clear(self) -> None:
+        """Drop all cached files and directory listings."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._directories.clear()
+            self.current_bytes = 0
+
+    def read_text(self, path: Union[str, Path]) -> str:
+        """Read a text file through the cache, falling back to a direct read."""
+        entry = self.get(path)
+        if entry is not None:
+            return entry.text
+        return Path(path).read_text(encoding="utf-8", errors="replace")
+
+    def get_ast(self, path: Union[str, Path]) -> Optional[ast.AST]:
+        """Return the parsed AST of a Python file; raises SyntaxError on invalid code."""
+        entry = self.get(path)
+        if entry is None:
+            return None
+        had_ast = entry._ast is not None
+        tree = entry.get_ast()
+        if not had_ast:
+            self._account(entry.path, entry)
+        return tree
+
+    def read_slice(
+        self,
+        path: Union[str, Path],
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        byte_offset: Optional[int] = None,
+        byte_length: Optional[int] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        preview_lines: int = DEFAULT_PREVIEW_LINES,
+    ) -> FileSlice:
+        """Read part of a file, serving line ranges of cacheable files from memory.
+
+        Byte ranges and files too large to cache go straight to disk.
+        """
+        if byte_offset is None and byte_length is None:
+            entry = self.get(path)
+            if entry is not None:
+                had_offsets = (
+                    entry._line_offsets is not None or entry._byte_line_offsets is not None
+                )
+                file_slice = entry.slice(start_line, end_line, max_bytes, preview_lines)
+                if not had_offsets:
+                    self._account(entry.path, entry)
+                return file_slice
+        return read_file_slice(
+            path, start_line, end_line, byte_offset, byte_length, max_bytes, preview_lines
+        )
+
+    def list_files(
+        self, directory: Union[str, Path], prune: Optional[Callable[[str], bool]] = None
+    ) -> List[Path]:
+        """List all files under a directory recursively.
+
+        Each directory listing is cached against the directory's mtime, so a repeat
+        walk costs one stat per directory instead of one per file. Subdirectories
+        whose name satisfies prune are not descended into.
+        """
+        root = Path(directory)
+        files: List[Path] = []
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            key = self._key(current)
+            try:
+                mtime_ns = os.stat(key).st_mtime_ns
+            except OSError:
+                continue
+
+            with self._lock:
+                listing = self._directories.get(key)
+                if listing is not None and listing[0] == mtime_ns:
+                    self._directories.move_to_end(key)
+                    self.directory_hits += 1
+                else:
+                    listing = None
+                    self.directory_misses += 1
+
+            if listing is None:
+                names: List[str] = []
+                subdirs: List[str] = []
+                try:
+                    with os.scandir(key) as it:
+                        for item in it:
+                            if item.is_dir(follow_symlinks=False):
+                                subdirs.append(item.name)
+                            elif item.is_file():
+                                names.append(item.name)
+                except OSError:
+                    continue
+                listing = (mtime_ns, sorted(names), sorted(subdirs))
+                with self._lock:
+                    self._directories[key] = listing
+                    while len(self._directories) > self.max_directories:
+                        self._directories.popitem(last=False)
+
+            files.extend(current / name for name in listing[1])
+            stack.extend(
+                current / name for name in reversed(listing[2]) if prune is None or not prune(name)
+            )
+
+        return files
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit statistics and memory usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "directories": len(self._directories),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "directory_hits": self.directory_hits,
+                "directory_misses": self.directory_misses,
+            }
+
+
+# Global file cache shared by all agents running in this process
+file_cache = FileCache()
@@ -0,0 +1,258 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Bounded, ranged file reads shared by the Vectras agents."""
+
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Default cap on the number of bytes returned by a single read
+DEFAULT_MAX_BYTES = 64 * 1024
+
+# Number of lines shown at each end of a truncated file preview
+DEFAULT_PREVIEW_LINES = 40
+
+# Files at or above this size are accessed through mmap instead of read()
+MMAP_THRESHOLD = 1024 * 1024
+
+# Number of leading bytes inspected by binary detection
+BINARY_SNIFF_BYTES = 8192
+
+
+class FileSlice:
+    """Represents the part of a file returned by a bounded read."""
+
+    def __init__(
+        self,
+        path: str,
+        text: str,
+        size: int,
+        start_byte: int = 0,
+        end_byte: int = 0,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        truncated: bool = False,
+        is_binary: bool = False,
+    ):
+        self.path = path
+        self.text = text
+        self.size = size
+        self.start_byte = start_byte
+        self.end_byte = end_byte
+        self.start_line = start_line
+        self.end_line = end_line
+        self.truncated = truncated
+        self.is_binary = is_binary
+
+    @property
+    def is_complete(self) -> bool:
+        """Check if the slice covers the whole file."""
+        return not self.truncated and self.start_byte == 0 and self.end_byte == self.size
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "path": self.path,
+            "size": self.size,
+            "start_byte": self.start_byte,
+            "end_byte": self.end_byte,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+            "truncated": self.truncated,
+            "is_binary": self.is_binary,
+        }
+
+
+def looks_binary(sample: bytes) -> bool:
+    """Check if a byte sample looks like binary rather than text."""
+    if not sample:
+        return False
+    if b"\x00" in sample:
+        return True
+    try:
+        sample.decode("utf-8")
+        return False
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the sample is still text
+        if e.start >= len(sample) - 3:
+            return False
+    # Fall back to the ratio of control characters outside common whitespace
+    control = sum(1 for b in sample if b < 32 and b not in (9, 10, 12, 13, 27))
+    return control / len(sample) > 0.1
+
+
+def is_binary_file(path: Union[str, Path]) -> bool:
+    """Check if a file looks binary by inspecting its first bytes."""
+    with open(path, "rb") as f:
+        return looks_binary(f.read(BINARY_SNIFF_BYTES))
+
+
+def _line_span(buf, start_line: int, end_line: Optional[int]) -> Tuple[int, int, int]:
+    """Find the byte span of 1-based inclusive lines in a bytes-like buffer.
+
+    Returns (start_byte, end_byte, last_line_found).
+    """
+    size = len(buf)
+    pos = 0
+    line = 1
+    while line < start_line and pos < size:
+        nl = buf.find(b"\n", pos)
+        if nl == -1:
+            # The last line has no trailing newline
+            pos = size
+            line += 1
+            break
+        pos = nl + 1
+        line += 1
+
+    start = pos
+    if end_line is None:
+        return start, size, line
+
+    while line <= end_line and pos < size:
+        nl = buf.find(b"\n", pos)
+        if nl == -1:
+            # The last line has no trailing newline
+            pos = size
+            line += 1
+            break
+        pos = nl + 1
+        line += 1
+    return start, pos, line - 1
+
+
+def _head_span(buf, lines: int) -> int:
+    """Find the byte offset just after the first N lines."""
+    return _line_span(buf, 1, lines)[1]
+
+
+def _tail_span(buf, lines: int, floor: int) -> int:
+    """Find the byte offset where the last N lines start, never before floor."""
+    pos = len(buf)
+    if pos and buf[pos - 1 : pos] == b"\n":
+        pos -= 1
+    for _ in range(lines):
+        nl = buf.rfind(b"\n", floor, pos)
+        if nl == -1:
+            return floor
+        pos = nl
+    return pos + 1
+
+
+def decode_text(data: bytes) -> str:
+    """Decode file bytes as UTF-8, replacing invalid sequences."""
+    return data.decode("utf-8", errors="replace")
+
+
+def read_file_slice(
+    path: Union[str, Path],
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    byte_offset: Optional[int] = None,
+    byte_length: Optional[int] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    preview_lines: int = DEFAULT_PREVIEW_LINES,
+) -> FileSlice:
+    """Read part of a file without loading more than needed.
+
+    Line ranges are 1-based and inclusive. Byte ranges take precedence over line
+    ranges. When no range is given and the file exceeds max_bytes, a head/tail
+    preview is returned instead of the full contents. Pass max_bytes=None to
+    disable the cap.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+
+    if size == 0:
+        return FileSlice(str(path), "", 0, start_line=1 if start_line else None)
+
+    with open(path, "rb") as f:
+        if looks_binary(f.read(BINARY_SNIFF_BYTES)):
+            return FileSlice(str(path), "", size, truncated=True, is_binary=True)
+
+        # Byte ranges only need a seek, whatever the file size
+        if byte_offset is not None or byte_length is not None:
+            start = min(max(byte_offset or 0, 0), size)
+            length = size - start if byte_length is None else max(byte_length, 0)
+            if max_bytes is not None:
+                length = min(length, max_bytes)
+            f.seek(start)
+            data = f.read(length)
+            end = start + len(data)
+            return FileSlice(
+                str(path), decode_text(data), size, start, end, truncated=end < size or start > 0
+            )
+
+        if size >= MMAP_THRESHOLD:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            f.seek(0)
+            buf = f.read()
+
+        try:
+            return slice_lines(path, buf, size, start_line, end_line, max_bytes, preview_lines)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+
+def slice_lines(
+    path: Path,
+    buf,
+    size: int,
+    start_line: Optional[int],
+    end_line: Optional[int],
+    max_bytes: Optional[int],
+    preview_lines: int,
+) -> FileSlice:
+    """Build a FileSlice for a line range or a head/tail preview of buf, the bytes of path.
+
+    Used by read_file_slice() and by cached files, which hold the bytes already.
+    """
+    if start_line is not None or end_line is not None:
+        first = max(start_line or 1, 1)
+        start, end, last = _line_span(buf, first, end_line)
+        truncated = False
+        if max_bytes is not None and end - start > max_bytes:
+            # Cut at the last full line that fits
+            cut = buf.rfind(b"\n", start, start + max_bytes)
+            end = cut + 1 if cut != -1 else start + max_bytes
+            last = first + buf[start:end].count(b"\n") - 1 if cut != -1 else first
+            truncated = True
+        elif end_line is None:
+            # Read to the end of the file
+            last = (
+                first
+                - 1
+                + buf[start:end].count(b"\n")
+                + (end > start and buf[end - 1] != ord("\n"))
+            )
+        return FileSlice(
+            str(path),
+            decode_text(buf[start:end]),
+            size,
+            start,
+            end,
+            start_line=first,
+            end_line=max(last, first),
+            truncated=truncated or start > 0 or end < size,
+        )
+
+    if max_bytes is None or size <= max_bytes:
+        return FileSlice(str(path), decode_text(buf[:size]), size, 0, size)
+
+    # Too large: show the first and last lines, each bounded by half the budget
+    budget = max_bytes // 2
+    head_end = _head_span(buf, preview_lines)
+    if head_end > budget:
+        head_end = buf.rfind(b"\n", 0, budget) + 1 or budget
+    tail_start = _tail_span(buf, preview_lines, head_end)
+    if size - tail_start > budget:
+        nl = buf.find(b"\n", size - budget)
+        tail_start = nl + 1 if nl != -1 else size - budget
+    head = decode_text(buf[:head_end])
+    tail = decode_text(buf[tail_start:size])
+    omitted = tail_start - head_end
+    text = f"{head.rstrip(chr(10))}\n\n... [{omitted} bytes omitted] ...\n\n{tail}"
+    return FileSlice(str(path), text, size, 0, size, truncated=True)
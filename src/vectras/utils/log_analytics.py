@@ -0,0 +1,310 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Aggregate statistics over the timestamps, files and flags of log lines.
+
+analyze() turns the columns of a set of lines into:
+
+- a histogram of lines, errors and warnings per time bucket (a minute by default)
+- lines, errors and the error rate of each service
+- percentiles of the time between consecutive errors
+- a co-occurrence matrix: for each pair of services, the buckets in which both
+  logged errors
+
+The columns are typed arrays, so with NumPy installed they are viewed as
+ndarrays without copying and every statistic is computed with whole-array
+operations (bincount, sort, diff, a matrix product). Without NumPy the same
+results are computed in pure Python.
+"""
+
+import math
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+    HAS_NUMPY = False
+
+from .log_anomaly import service_name
+from .log_store import (
+    FLAG_CONTINUATION,
+    FLAG_ERROR,
+    FLAG_RETIRED,
+    FLAG_WARNING,
+    LogStore,
+    from_micros,
+    to_micros,
+)
+
+# Default width of a histogram bucket
+BUCKET_SECONDS = 60
+
+# Most buckets in a histogram; longer ranges get wider buckets
+MAX_BUCKETS = 1440
+
+# Percentiles of the time between errors
+GAP_PERCENTILES = (50, 90, 99)
+
+_MICROS = 1_000_000
+
+
+class LogColumns:
+    """Timestamp, file id and flags of log lines, one array entry per line."""
+
+    def __init__(
+        self,
+        timestamps: array,
+        file_ids: array,
+        flags: array,
+        paths: Dict[int, str],
+    ):
+        self.timestamps = timestamps
+        self.file_ids = file_ids
+        self.flags = flags
+        self.paths = paths
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_store(cls, store: LogStore) -> "LogColumns":
+        """Copy the columns of the rows held by an in-memory store."""
+        with store.lock:
+            return cls(
+                array("q", store.timestamps),
+                array(store.file_ids.typecode, store.file_ids),
+                array("B", store.flags),
+                dict(enumerate(store.files)),
+            )
+
+
+def _bucket_seconds(span_micros: int, bucket_seconds: int) -> int:
+    """Widen buckets to whole minutes when the span would need more than MAX_BUCKETS."""
+    needed = math.ceil(span_micros / _MICROS / MAX_BUCKETS)
+    if needed <= bucket_seconds:
+        return bucket_seconds
+    return math.ceil(needed / 60) * 60
+
+
+def _percentile(sorted_values: Sequence[float], percentile: float) -> float:
+    """Linear interpolation between closest ranks, as numpy.percentile does by default."""
+    position = (len(sorted_values) - 1) * percentile / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def analyze(
+    columns: LogColumns,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket_seconds: int = BUCKET_SECONDS,
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Compute histograms, service error rates, error gaps and co-occurrence.
+
+    Lines with start <= timestamp < end are counted; continuation lines, such as
+    traceback frames, are left out. use_numpy defaults to whether NumPy is
+    installed.
+    """
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY
+    if use_numpy and not HAS_NUMPY:
+        raise RuntimeError("numpy is not installed")
+    start_micros = to_micros(start) if start is not None else None
+    end_micros = to_micros(end) if end is not None else None
+
+    # Services in order of first file id, and the service of each file id
+    services: List[str] = []
+    service_codes: Dict[int, int] = {}
+    for file_id, path in sorted(columns.paths.items()):
+        name = service_name(path)
+        if name not in services:
+            services.append(name)
+        service_codes[file_id] = services.index(name)
+
+    kernel = _analyze_numpy if use_numpy else _analyze_python
+    result = kernel(columns, start_micros, end_micros, service_codes, len(services), bucket_seconds)
+    first_bucket, width = result.pop("first_bucket"), result["bucket_seconds"]
+    result["buckets"] = [
+        {
+            "start": from_micros((first_bucket + i) * width * _MICROS).isoformat(),
+            "lines": lines,
+            "errors": errors,
+            "warnings": warnings,
+        }
+        for i, (lines, errors, warnings) in enumerate(
+            zip(result.pop("lines"), result.pop("errors"), result.pop("warnings"), strict=True)
+        )
+    ]
+    result["services"] = [
+        {
+            "service": name,
+            "lines": lines,
+            "errors": errors,
+            "error_rate": round(errors / lines, 6) if lines else 0.0,
+        }
+        for name, lines, errors in zip(
+            services, result.pop("service_lines"), result.pop("service_errors"), strict=True
+        )
+    ]
+    result["co_occurrence"] = {"services": services, "matrix": result.pop("matrix")}
+    result["backend"] = "numpy" if use_numpy else "python"
+    result["start"] = from_micros(start_micros).isoformat() if start_micros is not None else None
+    result["end"] = from_micros(end_micros).isoformat() if end_micros is not None else None
+    return result
+
+
+def _gap_summary(count: int, percentiles: Sequence[float], largest: float) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"count": count}
+    for percentile, value in zip(GAP_PERCENTILES, percentiles, strict=True):
+        summary[f"p{percentile}"] = round(float(value), 3)
+    summary["max"] = round(float(largest), 3)
+    return summary
+
+
+def _analyze_numpy(
+    columns: LogColumns,
+    start_micros: Optional[int],
+    end_micros: Optional[int],
+    service_codes: Dict[int, int],
+    service_count: int,
+    bucket_seconds: int,
+) -> Dict[str, Any]:
+    timestamps = np.frombuffer(columns.timestamps, dtype=columns.timestamps.typecode)
+    file_ids = np.frombuffer(columns.file_ids, dtype=columns.file_ids.typecode)
+    flags = np.frombuffer(columns.flags, dtype=np.uint8)
+
+    keep = (flags & (FLAG_RETIRED | FLAG_CONTINUATION)) == 0
+    if start_micros is not None:
+        keep &= timestamps >= start_micros
+    if end_micros is not None:
+        keep &= timestamps < end_micros
+    timestamps, file_ids, flags = timestamps[keep], file_ids[keep], flags[keep]
+
+    lookup = np.zeros(max(service_codes, default=0) + 1, dtype=np.intp)
+    if service_codes:
+        lookup[np.fromiter(service_codes.keys(), dtype=np.intp)] = np.fromiter(
+            service_codes.values(), dtype=np.intp
+        )
+    services = lookup[file_ids]
+    is_error = (flags & FLAG_ERROR) != 0
+    is_warning = (flags & FLAG_WARNING) != 0
+
+    if len(timestamps):
+        first = int(timestamps.min())
+        span = int(timestamps.max()) - first
+    else:
+        first = span = 0
+    width = _bucket_seconds(span, bucket_seconds)
+    width_micros = width * _MICROS
+    first_bucket = first // width_micros
+    buckets = timestamps // width_micros - first_bucket
+    bucket_count = int(buckets.max()) + 1 if len(buckets) else 0
+
+    error_times = np.sort(timestamps[is_error])
+    gaps = np.diff(error_times) / _MICROS
+    if len(gaps):
+        gap_summary = _gap_summary(len(gaps), np.percentile(gaps, GAP_PERCENTILES), gaps.max())
+    else:
+        gap_summary = _gap_summary(0, [0.0] * len(GAP_PERCENTILES), 0.0)
+
+    # Services with errors in each bucket; the product counts buckets shared by two services
+    presence = np.zeros((service_count, bucket_count), dtype=np.int64)
+    presence[services[is_error], buckets[is_error]] = 1
+    matrix = presence @ presence.T
+
+    return {
+        "bucket_seconds": width,
+        "first_bucket": first_bucket,
+        "total_lines": int(len(timestamps)),
+        "total_errors": int(is_error.sum()),
+        "total_warnings": int(is_warning.sum()),
+        "lines": np.bincount(buckets, minlength=bucket_count).tolist(),
+        "errors": np.bincount(buckets[is_error], minlength=bucket_count).tolist(),
+        "warnings": np.bincount(buckets[is_warning], minlength=bucket_count).tolist(),
+        "service_lines": np.bincount(services, minlength=service_count).tolist(),
+        "service_errors": np.bincount(services[is_error], minlength=service_count).tolist(),
+        "error_gaps": gap_summary,
+        "matrix": matrix.tolist(),
+    }
+
+
+def _analyze_python(
+    columns: LogColumns,
+    start_micros: Optional[int],
+    end_micros: Optional[int],
+    service_codes: Dict[int, int],
+    service_count: int,
+    bucket_seconds: int,
+) -> Dict[str, Any]:
+    low = start_micros if start_micros is not None else -(2**63)
+    high = end_micros if end_micros is not None else 2**63
+    rows = [
+        (timestamp, service_codes.get(file_id, 0), flag)
+        for timestamp, file_id, flag in zip(
+            columns.timestamps, columns.file_ids, columns.flags, strict=True
+        )
+        if not flag & (FLAG_RETIRED | FLAG_CONTINUATION) and low <= timestamp < high
+    ]
+
+    if rows:
+        first = min(row[0] for row in rows)
+        span = max(row[0] for row in rows) - first
+    else:
+        first = span = 0
+    width = _bucket_seconds(span, bucket_seconds)
+    width_micros = width * _MICROS
+    first_bucket = first // width_micros
+    bucket_count = max((row[0] // width_micros - first_bucket for row in rows), default=-1) + 1
+
+    lines = [0] * bucket_count
+    errors = [0] * bucket_count
+    warnings = [0] * bucket_count
+    service_lines = [0] * service_count
+    service_errors = [0] * service_count
+    error_buckets: List[set] = [set() for _ in range(service_count)]
+    error_times = []
+    for timestamp, service, flag in rows:
+        bucket = timestamp // width_micros - first_bucket
+        lines[bucket] += 1
+        service_lines[service] += 1
+        if flag & FLAG_ERROR:
+            errors[bucket] += 1
+            service_errors[service] += 1
+            error_buckets[service].add(bucket)
+            error_times.append(timestamp)
+        if flag & FLAG_WARNING:
+            warnings[bucket] += 1
+
+    error_times.sort()
+    gaps = sorted((b - a) / _MICROS for a, b in zip(error_times, error_times[1:], strict=False))
+    if gaps:
+        gap_summary = _gap_summary(
+            len(gaps), [_percentile(gaps, p) for p in GAP_PERCENTILES], gaps[-1]
+        )
+    else:
+        gap_summary = _gap_summary(0, [0.0] * len(GAP_PERCENTILES), 0.0)
+
+    matrix = [[len(a & b) for b in error_buckets] for a in error_buckets]
+
+    return {
+        "bucket_seconds": width,
+        "first_bucket": first_bucket,
+        "total_lines": len(rows),
+        "total_errors": sum(errors),
+        "total_warnings": sum(warnings),
+        "lines": lines,
+        "errors": errors,
+        "warnings": warnings,
+        "service_lines": service_lines,
+        "service_errors": service_errors,
+        "error_gaps": gap_summary,
+        "matrix": matrix,
+    }
@@ -0,0 +1,248 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Streaming error-rate anomaly detection.
+
+Errors are counted per (service, error type) in fixed time buckets. When a
+bucket closes, its count is compared with an exponentially weighted moving
+average and variance of the previous buckets of the same key; a z-score above
+the threshold is an anomaly. Keys start from a zero baseline, so an error type
+that suddenly appears in volume is reported as well. A debouncer then groups
+anomalies raised close together into a single batch and keeps a cooldown per
+key, so one burst leads to one notification.
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .log_rotation import parse_segment_name
+
+# Width of a rate bucket
+BUCKET_SECONDS = 60
+
+# Weight of the newest bucket in the moving average and variance
+EWMA_ALPHA = 0.1
+
+# Z-score above which a bucket is anomalous
+Z_THRESHOLD = 4.0
+
+# Buckets with fewer errors than this are never anomalous
+MIN_ANOMALY_COUNT = 5
+
+# Closed buckets observed before anomalies are reported
+WARMUP_BUCKETS = 3
+
+# Lower bound of the standard deviation, so sparse keys need a real burst
+MIN_STDDEV = 1.0
+
+# Longest run of empty buckets replayed after a pause; longer gaps restart the buckets
+MAX_GAP_BUCKETS = 60
+
+Key = Tuple[str, str]
+
+
+def service_name(path: str) -> str:
+    """Name of the service writing a log file: its base name without extensions."""
+    name = Path(path).name
+    parsed = parse_segment_name(name)
+    if parsed is not None:
+        name = parsed[0]
+    return name.rsplit(".", 1)[0] or name
+
+
+class Anomaly:
+    """A bucket whose error count is far above the usual rate of its key."""
+
+    def __init__(
+        self,
+        service: str,
+        error_type: str,
+        count: int,
+        expected: float,
+        z_score: float,
+        bucket_start: datetime,
+    ):
+        self.service = service
+        self.error_type = error_type
+        self.count = count
+        self.expected = expected
+        self.z_score = z_score
+        self.bucket_start = bucket_start
+
+    @property
+    def key(self) -> Key:
+        return (self.service, self.error_type)
+
+    def describe(self, bucket_seconds: int = BUCKET_SECONDS) -> str:
+        return (
+            f"{self.service} {self.error_type}: {self.count} errors in {bucket_seconds}s "
+            f"(expected {self.expected:.1f}, z={self.z_score:.1f})"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "service": self.service,
+            "error_type": self.error_type,
+            "count": self.count,
+            "expected": round(self.expected, 3),
+            "z_score": round(self.z_score, 2),
+            "bucket_start": self.bucket_start.isoformat(),
+        }
+
+
+class _Rate:
+    __slots__ = ("mean", "variance")
+
+    def __init__(self):
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def update(self, count: int, alpha: float) -> float:
+        """Fold a bucket count into the average; returns its z-score against the old average."""
+        z_score = (count - self.mean) / max(math.sqrt(self.variance), MIN_STDDEV)
+        diff = count - self.mean
+        increment = alpha * diff
+        self.mean += increment
+        self.variance = (1 - alpha) * (self.variance + diff * increment)
+        return z_score
+
+
+class RateAnomalyDetector:
+    """EWMA z-score detection over per-key error counts in time buckets."""
+
+    def __init__(
+        self,
+        bucket_seconds: int = BUCKET_SECONDS,
+        alpha: float = EWMA_ALPHA,
+        threshold: float = Z_THRESHOLD,
+        min_count: int = MIN_ANOMALY_COUNT,
+        warmup_buckets: int = WARMUP_BUCKETS,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_count = min_count
+        self.warmup_buckets = warmup_buckets
+        self.rates: Dict[Key, _Rate] = {}
+        self.buckets_closed = 0
+        self.anomalies_found = 0
+        self._bucket: Optional[int] = None
+        self._counts: Dict[Key, int] = {}
+        self._found: List[Anomaly] = []
+        self._lock = threading.Lock()
+
+    def observe(
+        self, service: str, error_type: str, now: Optional[float] = None, count: int = 1
+    ) -> None:
+        """Count errors of a key in the bucket containing now."""
+        bucket = int((time.time() if now is None else now) // self.bucket_seconds)
+        key = (service, error_type)
+        with self._lock:
+            if self._bucket is None:
+                self._bucket = bucket
+            elif bucket > self._bucket:
+                self._found += self._close_until(bucket)
+            self._counts[key] = self._counts.get(key, 0) + count
+
+    def tick(self, now: Optional[float] = None) -> List[Anomaly]:
+        """Close every bucket that ended before now; returns the anomalies found."""
+        bucket = int((time.time() if now is None else now) // self.bucket_seconds)
+        with self._lock:
+            found, self._found = self._found, []
+            if self._bucket is None:
+                self._bucket = bucket
+            elif bucket > self._bucket:
+                found += self._close_until(bucket)
+            return found
+
+    def _close_until(self, bucket: int) -> List[Anomaly]:
+        found: List[Anomaly] = []
+        gap = bucket - self._bucket
+        for index in range(min(gap, MAX_GAP_BUCKETS)):
+            counts = self._counts if index == 0 else {}
+            found += self._close(self._bucket + index, counts)
+        self._counts = {}
+        self._bucket = bucket
+        return found
+
+    def _close(self, bucket: int, counts: Dict[Key, int]) -> List[Anomaly]:
+        for key in counts:
+            self.rates.setdefault(key, _Rate())
+        warm = self.buckets_closed >= self.warmup_buckets
+        self.buckets_closed += 1
+        found = []
+        for key, rate in self.rates.items():
+            count = counts.get(key, 0)
+            expected = rate.mean
+            z_score = rate.update(count, self.alpha)
+            if warm and count >= self.min_count and z_score >= self.threshold:
+                found.append(
+                    Anomaly(
+                        key[0],
+                        key[1],
+                        count,
+                        expected,
+                        z_score,
+                        datetime.fromtimestamp(bucket * self.bucket_seconds),
+                    )
+                )
+        self.anomalies_found += len(found)
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self.rates),
+                "buckets_closed": self.buckets_closed,
+                "bucket_seconds": self.bucket_seconds,
+                "threshold": self.threshold,
+                "anomalies_found": self.anomalies_found,
+            }
+
+
+class HandoffDebouncer:
+    """Batches anomalies and limits how often the same key is reported."""
+
+    def __init__(self, debounce_seconds: float = 30.0, cooldown_seconds: float = 600.0):
+        self.debounce_seconds = debounce_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.pending: Dict[Key, Anomaly] = {}
+        self.batches = 0
+        self._first_pending: Optional[float] = None
+        self._cooldown_until: Dict[Key, float] = {}
+
+    def add(self, anomalies: List[Anomaly], now: Optional[float] = None) -> None:
+        """Queue anomalies, skipping keys reported within the cooldown."""
+        now = time.time() if now is None else now
+        for anomaly in anomalies:
+            if self._cooldown_until.get(anomaly.key, 0) > now:
+                continue
+            current = self.pending.get(anomaly.key)
+            if current is None or anomaly.z_score > current.z_score:
+                self.pending[anomaly.key] = anomaly
+            if self._first_pending is None:
+                self._first_pending = now
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """Check if the oldest queued anomaly has waited out the debounce delay."""
+        now = time.time() if now is None else now
+        return (
+            self._first_pending is not None and now - self._first_pending >= self.debounce_seconds
+        )
+
+    def take(self, now: Optional[float] = None) -> List[Anomaly]:
+        """Return the queued batch and start the cooldown of its keys."""
+        now = time.time() if now is None else now
+        batch = sorted(self.pending.values(), key=lambda a: a.z_score, reverse=True)
+        for anomaly in batch:
+            self._cooldown_until[anomaly.key] = now + self.cooldown_seconds
+        self.pending = {}
+        self._first_pending = None
+        if batch:
+            self.batches += 1
+        return batch
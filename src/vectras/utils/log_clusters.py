@@ -0,0 +1,286 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Incremental clustering of near-duplicate error messages into templates.
+
+A message is normalized (numbers, ids, paths and quoted values masked) and
+split into tokens. Messages that normalize to the same text join the same
+cluster directly. Otherwise the token set gets a MinHash signature, and
+locality-sensitive hashing over bands of the signature finds the clusters
+with a similar signature; the most similar one above SIMILARITY_THRESHOLD
+takes the message, else it starts a new cluster.
+
+Each cluster keeps a template: its first message, with the tokens that differ
+in later messages of the same length replaced by <*>. The number of clusters
+is bounded; the least recently seen one is dropped when it is exceeded.
+"""
+
+import random
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .log_incidents import normalize_message
+
+# Clusters kept
+MAX_CLUSTERS = 500
+
+# LSH bands and signature rows per band; the signature has BANDS * ROWS values
+BANDS = 20
+ROWS = 3
+
+# Estimated Jaccard similarity above which a message joins a cluster
+SIMILARITY_THRESHOLD = 0.5
+
+# Normalized messages remembered with their cluster, to skip hashing repeats
+MAX_CACHED_MESSAGES = 10_000
+
+# Tokens of a template, and characters of its example
+MAX_TEMPLATE_TOKENS = 64
+MAX_EXAMPLE_LENGTH = 500
+
+WILDCARD = "<*>"
+
+_PRIME = (1 << 61) - 1
+
+_rng = random.Random(20240101)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(BANDS * ROWS)
+]
+
+# Masked on top of normalize_message(): paths, URLs and words mixing letters and digits
+_EXTRA_MASKS = [
+    (re.compile(r"\b[a-z][a-z0-9+.-]*://\S+", re.I), "<url>"),
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.@-]+){2,}[\\/]?"), "<path>"),
+    (re.compile(r"\b(?=[\w-]*\d)(?=[\w-]*[A-Za-z])[\w-]{6,}\b"), "<id>"),
+]
+
+
+def tokenize(message: str) -> List[str]:
+    """Normalize a message and split it into template tokens."""
+    for pattern, placeholder in _EXTRA_MASKS:
+        message = pattern.sub(placeholder, message)
+    return normalize_message(message).split()[:MAX_TEMPLATE_TOKENS]
+
+
+def minhash(tokens: Iterable[str]) -> Tuple[int, ...]:
+    """MinHash signature of a set of tokens."""
+    hashes = {zlib.crc32(token.encode("utf-8")) for token in tokens} or {0}
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the token sets behind two signatures."""
+    return sum(a == b for a, b in zip(first, second, strict=True)) / len(first)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [(band, signature[band * ROWS : (band + 1) * ROWS]) for band in range(BANDS)]
+
+
+class LogCluster:
+    """Near-duplicate messages sharing a template."""
+
+    def __init__(
+        self,
+        cluster_id: int,
+        tokens: List[str],
+        signature: Tuple[int, ...],
+        timestamp: datetime,
+    ):
+        self.cluster_id = cluster_id
+        self.tokens = tokens
+        self.signature = signature
+        self.count = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.error_type: Optional[str] = None
+        self.example = ""
+        self.services: Dict[str, int] = {}
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def merge_template(self, tokens: List[str]) -> None:
+        """Replace the tokens that differ from a message of the same length by wildcards."""
+        if len(tokens) == len(self.tokens):
+            self.tokens = [
+                mine if mine == theirs else WILDCARD
+                for mine, theirs in zip(self.tokens, tokens, strict=True)
+            ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "cluster_id": self.cluster_id,
+            "template": self.template,
+            "count": self.count,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "error_type": self.error_type,
+            "example": self.example,
+            "services": self.services,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogCluster":
+        tokens = data["template"].split()
+        cluster = cls(
+            data["cluster_id"],
+            tokens,
+            minhash(tokens),
+            datetime.fromisoformat(data["first_seen"]),
+        )
+        cluster.count = data.get("count", 0)
+        cluster.last_seen = datetime.fromisoformat(data["last_seen"])
+        cluster.error_type = data.get("error_type")
+        cluster.example = data.get("example", "")
+        cluster.services = dict(data.get("services", {}))
+        return cluster
+
+
+class LogClusterer:
+    """Groups a stream of error messages into a bounded set of template clusters."""
+
+    def __init__(
+        self,
+        max_clusters: int = MAX_CLUSTERS,
+        threshold: float = SIMILARITY_THRESHOLD,
+    ):
+        self.max_clusters = max_clusters
+        self.threshold = threshold
+        self.clusters: "OrderedDict[int, LogCluster]" = OrderedDict()
+        self.total = 0
+        self.updated = False
+        self._next_id = 1
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        message: str,
+        timestamp: datetime,
+        error_type: Optional[str] = None,
+        service: Optional[str] = None,
+    ) -> LogCluster:
+        """Assign a message to a cluster and count it; returns the cluster."""
+        tokens = tokenize(message)
+        key = " ".join(tokens)
+        with self._lock:
+            cluster_id = self._cache.get(key)
+            cluster = self.clusters.get(cluster_id) if cluster_id is not None else None
+            if cluster is None:
+                cluster = self._assign(tokens, timestamp)
+                self._cache[key] = cluster.cluster_id
+                if len(self._cache) > MAX_CACHED_MESSAGES:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(key)
+
+            self.clusters.move_to_end(cluster.cluster_id)
+            cluster.count += 1
+            cluster.first_seen = min(cluster.first_seen, timestamp)
+            cluster.last_seen = max(cluster.last_seen, timestamp)
+            cluster.error_type = error_type or cluster.error_type
+            cluster.example = message[:MAX_EXAMPLE_LENGTH]
+            if service is not None:
+                cluster.services[service] = cluster.services.get(service, 0) + 1
+            self.total += 1
+            self.updated = True
+            return cluster
+
+    def _assign(self, tokens: List[str], timestamp: datetime) -> LogCluster:
+        """Find the most similar cluster through the LSH bands, or create one."""
+        signature = minhash(tokens)
+        candidates: Set[int] = set()
+        for band in _bands(signature):
+            candidates |= self._buckets.get(band, set())
+
+        best, best_similarity = None, self.threshold
+        for cluster_id in candidates:
+            cluster = self.clusters[cluster_id]
+            score = similarity(signature, cluster.signature)
+            if score >= best_similarity:
+                best, best_similarity = cluster, score
+        if best is not None:
+            best.merge_template(tokens)
+            return best
+
+        cluster = LogCluster(self._next_id, tokens, signature, timestamp)
+        self._next_id += 1
+        self._insert(cluster)
+        return cluster
+
+    def _insert(self, cluster: LogCluster) -> None:
+        self.clusters[cluster.cluster_id] = cluster
+        for band in _bands(cluster.signature):
+            self._buckets.setdefault(band, set()).add(cluster.cluster_id)
+        while len(self.clusters) > self.max_clusters:
+            _, evicted = self.clusters.popitem(last=False)
+            for band in _bands(evicted.signature):
+                members = self._buckets.get(band)
+                if members is not None:
+                    members.discard(evicted.cluster_id)
+                    if not members:
+                        del self._buckets[band]
+
+    def top(self, limit: int = 10) -> List[LogCluster]:
+        """Return the clusters with the most messages."""
+        with self._lock:
+            return sorted(self.clusters.values(), key=lambda c: (-c.count, c.first_seen))[:limit]
+
+    def matching(self, keys: Iterable[Tuple[str, str]], limit: int = 10) -> List[LogCluster]:
+        """Most frequent clusters with messages from one of the (service, error type) keys."""
+        keys = set(keys)
+        return [
+            cluster
+            for cluster in self.top(len(self.clusters))
+            if any(
+                (service, cluster.error_type or "unknown") in keys for service in cluster.services
+            )
+        ][:limit]
+
+    @property
+    def memory_size(self) -> int:
+        """Approximate bytes held by the clusters, the LSH buckets and the message cache."""
+        with self._lock:
+            clusters = sum(
+                len(c.example) + len(c.template) + 8 * len(c.signature) + 400
+                for c in self.clusters.values()
+            )
+            cache = sum(len(key) + 100 for key in self._cache)
+            return clusters + cache + 150 * len(self._buckets)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary; signatures are recomputed from the templates on restore."""
+        with self._lock:
+            return {
+                "total": self.total,
+                "next_id": self._next_id,
+                "clusters": [cluster.to_dict() for cluster in self.clusters.values()],
+            }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Replace the clusters with ones saved by to_dict()."""
+        with self._lock:
+            self.clusters = OrderedDict()
+            self._buckets = {}
+            self._cache = OrderedDict()
+            for item in data.get("clusters", []):
+                self._insert(LogCluster.from_dict(item))
+            self.total = data.get("total", 0)
+            self._next_id = max(data.get("next_id", 1), max(self.clusters, default=0) + 1)
+            self.updated = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clusters": len(self.clusters),
+                "messages": self.total,
+                "cached_messages": len(self._cache),
+            }
@@ -0,0 +1,359 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Streaming assembly of multi-line errors into deduplicated incidents.
+
+Lines are fed one at a time per file. A Python traceback, including chained
+exceptions and the error log line that introduces it, becomes a single
+incident. Every incident gets a stable fingerprint: the exception type and the
+(file name, function) of each frame for tracebacks, or the error line with
+numbers, ids and quoted values masked for single-line errors. Repeats of a
+fingerprint only update the count and the first/last seen times.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Maximum number of distinct incidents kept
+MAX_INCIDENTS = 1000
+
+# Maximum number of lines kept from a single incident
+MAX_INCIDENT_LINES = 200
+
+TRACEBACK_START = "Traceback (most recent call last):"
+
+CHAIN_MARKERS = (
+    "During handling of the above exception, another exception occurred:",
+    "The above exception was the direct cause of the following exception:",
+)
+
+_FRAME_RE = re.compile(r'File "([^"]+)", line \d+, in (\S+)')
+_EXCEPTION_LINE_RE = re.compile(
+    r"^((?:[A-Za-z_]\w*\.)*[A-Za-z_]\w*(?:Error|Exception|Exit|Interrupt|Iteration|Warning|Fault))"
+    r"(?::\s?(.*))?$"
+)
+
+# Variable parts of an error message, masked before fingerprinting
+_MASKS = [
+    (
+        re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I),
+        "<uuid>",
+    ),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<num>"),
+]
+
+
+def normalize_message(message: str) -> str:
+    """Mask ids, numbers and quoted values so repeats of an error compare equal."""
+    for pattern, placeholder in _MASKS:
+        message = pattern.sub(placeholder, message)
+    return message.strip()
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class Incident:
+    """A deduplicated error, with occurrence counts."""
+
+    def __init__(
+        self,
+        fingerprint: str,
+        kind: str,
+        error_type: Optional[str],
+        title: str,
+        sample: str,
+        timestamp: datetime,
+    ):
+        self.fingerprint = fingerprint
+        self.kind = kind
+        self.error_type = error_type
+        self.title = title
+        self.sample = sample
+        self.count = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.last_file = ""
+        self.last_line = 0
+        self.last_row_id = -1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "fingerprint": self.fingerprint,
+            "kind": self.kind,
+            "error_type": self.error_type,
+            "title": self.title,
+            "sample": self.sample,
+            "count": self.count,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat(),
+            "last_file": self.last_file,
+            "last_line": self.last_line,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Incident":
+        incident = cls(
+            data["fingerprint"],
+            data["kind"],
+            data.get("error_type"),
+            data["title"],
+            data["sample"],
+            datetime.fromisoformat(data["first_seen"]),
+        )
+        incident.count = data.get("count", 0)
+        incident.last_seen = datetime.fromisoformat(data["last_seen"])
+        incident.last_file = data.get("last_file", "")
+        incident.last_line = data.get("last_line", 0)
+        return incident
+
+
+class _OpenIncident:
+    """Lines of an incident that may still be continued."""
+
+    def __init__(
+        self,
+        file_path: str,
+        row_id: int,
+        line_number: int,
+        text: str,
+        timestamp: datetime,
+        error_type: Optional[str],
+        traceback: bool,
+    ):
+        self.file_path = file_path
+        self.row_id = row_id
+        self.line_number = line_number
+        self.lines = [text]
+        self.timestamp = timestamp
+        self.error_type = error_type
+        self.traceback = traceback
+        self.exception_line: Optional[str] = None
+
+    def add(self, text: str) -> None:
+        if len(self.lines) < MAX_INCIDENT_LINES:
+            self.lines.append(text)
+
+    @property
+    def complete(self) -> bool:
+        """Check if nothing more is expected for this incident."""
+        return not self.traceback or self.exception_line is not None
+
+    def fingerprint(self) -> str:
+        if self.traceback:
+            frames = [
+                f"{os.path.basename(path)}:{function}"
+                for path, function in _FRAME_RE.findall("\n".join(self.lines))
+            ]
+            exception_type = self._exception_type() or "Traceback"
+            return _digest("|".join([exception_type, *frames]))
+        return _digest(f"{self.error_type}|{normalize_message(self.lines[0])}")
+
+    def _exception_type(self) -> Optional[str]:
+        if self.exception_line is None:
+            return None
+        match = _EXCEPTION_LINE_RE.match(self.exception_line)
+        return match.group(1) if match else None
+
+    def title(self) -> str:
+        return (self.exception_line or self.lines[0])[:200]
+
+
+class IncidentTracker:
+    """Assembles incidents from per-file line streams and deduplicates them."""
+
+    def __init__(self, max_incidents: int = MAX_INCIDENTS):
+        self.max_incidents = max_incidents
+        self.incidents: "OrderedDict[str, Incident]" = OrderedDict()
+        self.total = 0
+        self._open: Dict[str, _OpenIncident] = {}
+        self._updated: Set[str] = set()
+        self._lock = threading.RLock()
+
+    def feed(
+        self,
+        file_path: str,
+        row_id: int,
+        line_number: int,
+        raw_line: str,
+        content: str,
+        timestamp: datetime,
+        is_error: bool,
+        error_type: Optional[str] = None,
+    ) -> bool:
+        """Process one line; returns False if it continues the previous incident.
+
+        raw_line is the line as written, used to recognise indented traceback
+        frames; content is the line without its timestamp.
+        """
+        with self._lock:
+            stripped = raw_line.strip()
+            current = self._open.get(file_path)
+            if current is not None:
+                if current.traceback:
+                    if self._continues_traceback(current, raw_line, stripped):
+                        current.add(stripped if raw_line[:1].isspace() else raw_line.rstrip())
+                        return False
+                elif content.startswith(TRACEBACK_START):
+                    # The error line that introduced the traceback becomes its header
+                    current.traceback = True
+                    current.add(stripped)
+                    return False
+                self._close(file_path)
+
+            if content.startswith(TRACEBACK_START):
+                self._open[file_path] = _OpenIncident(
+                    file_path, row_id, line_number, content, timestamp, error_type, True
+                )
+            elif is_error:
+                self._open[file_path] = _OpenIncident(
+                    file_path, row_id, line_number, content, timestamp, error_type, False
+                )
+            return True
+
+    def add_traceback(
+        self,
+        file_path: str,
+        row_id: int,
+        line_number: int,
+        header: str,
+        traceback: str,
+        timestamp: datetime,
+        error_type: Optional[str] = None,
+    ) -> Optional[Incident]:
+        """Record an incident whose traceback arrived in one piece.
+
+        Used for structured logs that carry the exception in a field of the
+        record; header is the rendered log line.
+        """
+        with self._lock:
+            self._close(file_path)
+            current = _OpenIncident(
+                file_path, row_id, line_number, header, timestamp, error_type, True
+            )
+            for line in traceback.splitlines():
+                stripped = line.strip()
+                if stripped:
+                    self._continues_traceback(current, line, stripped)
+                    current.add(stripped if line[:1].isspace() else line.rstrip())
+            self._open[file_path] = current
+            return self._close(file_path)
+
+    @staticmethod
+    def _continues_traceback(current: _OpenIncident, raw_line: str, stripped: str) -> bool:
+        if stripped in CHAIN_MARKERS or stripped.startswith(TRACEBACK_START):
+            current.exception_line = None
+            return True
+        if current.exception_line is None:
+            if raw_line[:1].isspace():
+                return True
+            if _EXCEPTION_LINE_RE.match(stripped):
+                current.exception_line = stripped
+                return True
+        return False
+
+    def _close(self, file_path: str) -> Optional[Incident]:
+        current = self._open.pop(file_path, None)
+        if current is None:
+            return None
+        fingerprint = current.fingerprint()
+        incident = self.incidents.get(fingerprint)
+        if incident is None:
+            incident = Incident(
+                fingerprint,
+                "traceback" if current.traceback else "error",
+                current.error_type,
+                current.title(),
+                "\n".join(current.lines),
+                current.timestamp,
+            )
+            self.incidents[fingerprint] = incident
+            while len(self.incidents) > self.max_incidents:
+                self.incidents.popitem(last=False)
+        else:
+            self.incidents.move_to_end(fingerprint)
+        incident.count += 1
+        incident.first_seen = min(incident.first_seen, current.timestamp)
+        incident.last_seen = max(incident.last_seen, current.timestamp)
+        incident.last_file = current.file_path
+        incident.last_line = current.line_number
+        incident.last_row_id = current.row_id
+        self.total += 1
+        self._updated.add(fingerprint)
+        return incident
+
+    def restore(self, incidents: Iterable[Incident]) -> None:
+        """Add incidents recorded earlier, e.g. loaded from a persistent index.
+
+        Incidents already tracked are kept as they are.
+        """
+        with self._lock:
+            # Restored incidents go before the tracked ones, oldest first
+            for incident in sorted(incidents, key=lambda i: i.last_seen, reverse=True):
+                if incident.fingerprint in self.incidents:
+                    continue
+                self.incidents[incident.fingerprint] = incident
+                self.incidents.move_to_end(incident.fingerprint, last=False)
+                self.total += incident.count
+            while len(self.incidents) > self.max_incidents:
+                self.incidents.popitem(last=False)
+
+    def take_updated(self) -> List[Incident]:
+        """Return the incidents updated since the previous call."""
+        with self._lock:
+            updated = [self.incidents[f] for f in self._updated if f in self.incidents]
+            self._updated = set()
+            return updated
+
+    def flush(self, force: bool = False) -> List[Incident]:
+        """Close open incidents that are complete, or all of them when force is set.
+
+        Returns the incidents that were updated.
+        """
+        with self._lock:
+            closed = []
+            for file_path, current in list(self._open.items()):
+                if force or current.complete:
+                    incident = self._close(file_path)
+                    if incident is not None:
+                        closed.append(incident)
+            return closed
+
+    def close_file(self, file_path: str) -> Optional[Incident]:
+        """Close the open incident of a file that will not receive more lines."""
+        with self._lock:
+            return self._close(file_path)
+
+    def discard_file(self, file_path: str) -> None:
+        """Forget a partially assembled incident, e.g. after the file was truncated."""
+        with self._lock:
+            self._open.pop(file_path, None)
+
+    def top(self, limit: int = 10) -> List[Incident]:
+        """Return the most frequent incidents."""
+        with self._lock:
+            return sorted(self.incidents.values(), key=lambda i: (-i.count, i.first_seen))[:limit]
+
+    @property
+    def memory_size(self) -> int:
+        """Approximate bytes held by the incidents and partially assembled ones."""
+        with self._lock:
+            size = sum(len(i.sample) + len(i.title) + 256 for i in self.incidents.values())
+            return size + sum(sum(map(len, o.lines)) + 256 for o in self._open.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "incidents": len(self.incidents),
+                "occurrences": self.total,
+                "open": len(self._open),
+            }
@@ -0,0 +1,576 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Persistent index of parsed log lines and incidents in SQLite.
+
+Lines are kept in a table with their file, line number, timestamp, severity
+and flags, and an FTS5 table using the trigram tokenizer indexes their text
+for case-insensitive substring search. The database runs in WAL mode, so
+queries are not blocked while the monitor writes, and lines are inserted in
+batched transactions. The database uses incremental auto-vacuum, so the
+pages of removed lines are returned to the file system when retention trims
+it down to its size limit.
+
+Every line belongs to a source: the inode key of a tailed file or the checksum
+of a compressed segment. reconcile() removes lines that the offset checkpoints
+do not account for, such as lines stored after the last checkpoint save before
+a crash, so reading again from the checkpoints does not store them twice.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .log_analytics import LogColumns
+from .log_incidents import MAX_INCIDENTS, Incident
+from .log_parser import SEVERITIES
+from .log_store import FLAG_ERROR, FLAG_WARNING, SEVERITY_CODES, LogRecord, from_micros, to_micros
+from .trigram import regex_literals
+
+# Lines inserted per transaction
+INDEX_BATCH_ROWS = 10_000
+
+# Size on disk above which the oldest lines are removed
+MAX_INDEX_BYTES = 1024 * 1024 * 1024
+
+# Fraction of the size limit the index is trimmed down to, so that it is not
+# trimmed again on every pass
+INDEX_TRIM_TARGET = 0.9
+
+# Shortest substring the trigram index can look up
+MIN_TRIGRAM_LENGTH = 3
+
+# (line number, timestamp in microseconds, severity code, error type, flags, content)
+IndexRow = Tuple[int, int, int, Optional[str], int, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    path TEXT NOT NULL,
+    UNIQUE (source, path)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    line_number INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    severity INTEGER NOT NULL,
+    error_type TEXT,
+    flags INTEGER NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_file_line ON entries (file_id, line_number);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_text USING fts5(
+    content, content='entries', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_text (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_text (entries_text, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TABLE IF NOT EXISTS incidents (
+    fingerprint TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    error_type TEXT,
+    title TEXT NOT NULL,
+    sample TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    last_file TEXT NOT NULL,
+    last_line INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+_RECORD_COLUMNS = (
+    "e.id, f.path, e.line_number, e.content, e.timestamp, e.severity, e.error_type "
+    "FROM entries e JOIN files f ON f.id = e.file_id"
+)
+
+_INCIDENT_COLUMNS = (
+    "fingerprint",
+    "kind",
+    "error_type",
+    "title",
+    "sample",
+    "count",
+    "first_seen",
+    "last_seen",
+    "last_file",
+    "last_line",
+)
+
+
+@lru_cache(maxsize=64)
+def _compile(pattern: str, flags: int) -> "re.Pattern[str]":
+    return re.compile(pattern, flags)
+
+
+def _regexp(pattern: str, text: Optional[str]) -> bool:
+    return text is not None and _compile(pattern, 0).search(text) is not None
+
+
+def _iregexp(pattern: str, text: Optional[str]) -> bool:
+    return text is not None and _compile(pattern, re.IGNORECASE).search(text) is not None
+
+
+def _phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase, which the trigram tokenizer matches as a substring."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _record(row: Sequence[Any]) -> LogRecord:
+    row_id, path, line_number, content, micros, severity, error_type = row
+    return LogRecord(
+        row_id, path, line_number, content, from_micros(micros), SEVERITIES[severity], error_type
+    )
+
+
+class LogIndex:
+    """SQLite database of log lines and incidents that outlives the process."""
+
+    def __init__(self, path: Union[str, Path], batch_rows: int = INDEX_BATCH_ROWS):
+        self.path = Path(path)
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._files: Dict[Tuple[str, str], int] = {}
+        self._pending: List[Tuple[Any, ...]] = []
+        self._lock = threading.RLock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        try:
+            # Only takes effect before the first table is created
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            if self._conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # A database created without it is rebuilt once to switch
+                self._conn.execute("VACUUM")
+        except sqlite3.Error:
+            # e.g. an SQLite build without FTS5 or the trigram tokenizer
+            self._conn.close()
+            raise
+        self._conn.create_function("regexp", 2, _regexp, deterministic=True)
+        self._conn.create_function("iregexp", 2, _iregexp, deterministic=True)
+
+    def close(self) -> None:
+        """Commit pending lines and close the database."""
+        with self._lock:
+            self.commit()
+            self._conn.close()
+
+    def file_id(self, source: str, path: str) -> int:
+        """Return the id of a file path read from a source, assigning one if needed."""
+        key = (source, path)
+        file_id = self._files.get(key)
+        if file_id is None:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO files (source, path) VALUES (?, ?)", (source, path)
+                )
+                file_id = self._conn.execute(
+                    "SELECT id FROM files WHERE source = ? AND path = ?", (source, path)
+                ).fetchone()[0]
+                self._files[key] = file_id
+        return file_id
+
+    def add(self, file_id: int, rows: Iterable[IndexRow]) -> None:
+        """Queue lines of a file, committing whenever a batch is complete."""
+        with self._lock:
+            self._pending.extend((file_id, *row) for row in rows)
+            if len(self._pending) >= self.batch_rows:
+                self.commit()
+
+    def _write_pending(self) -> None:
+        if self._pending:
+            self._conn.executemany(
+                "INSERT INTO entries (file_id, line_number, timestamp, severity, error_type, "
+                "flags, content) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+            self.rows_written += len(self._pending)
+            self._pending = []
+
+    def commit(self) -> None:
+        """Write queued lines and commit the current transaction."""
+        with self._lock:
+            self._write_pending()
+            self._conn.commit()
+
+    def _delete_files(self, where: str, params: Sequence[Any] = ()) -> int:
+        file_ids = [
+            row[0] for row in self._conn.execute(f"SELECT id FROM files WHERE {where}", params)
+        ]
+        removed = 0
+        for file_id in file_ids:
+            removed += self._conn.execute(
+                "DELETE FROM entries WHERE file_id = ?", (file_id,)
+            ).rowcount
+            self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        if file_ids:
+            self._files = {key: i for key, i in self._files.items() if i not in file_ids}
+        return removed
+
+    def retire_source(self, source: str) -> int:
+        """Remove every line of a source, e.g. after its file was truncated.
+
+        Returns the number of lines removed.
+        """
+        with self._lock:
+            self._write_pending()
+            return self._delete_files("source = ?", (source,))
+
+    def move_source(self, source: str, new_source: str) -> None:
+        """Attribute the lines of a source to another, e.g. a compressed copy of its file."""
+        with self._lock:
+            self._write_pending()
+            self._conn.execute("UPDATE files SET source = ? WHERE source = ?", (new_source, source))
+            self._files = {}
+
+    def reconcile(self, lines: Dict[str, Optional[int]]) -> int:
+        """Remove lines the offset checkpoints do not account for.
+
+        lines maps each known source to the last line number read from it, or to
+        None when every line of the source is kept. Lines of other sources and
+        lines past that number are removed. Returns the number of lines removed.
+        """
+        with self._lock:
+            self._write_pending()
+            removed = 0
+            for file_id, source in self._conn.execute("SELECT id, source FROM files").fetchall():
+                if source not in lines:
+                    removed += self._delete_files("id = ?", (file_id,))
+                elif lines[source] is not None:
+                    removed += self._conn.execute(
+                        "DELETE FROM entries WHERE file_id = ? AND line_number > ?",
+                        (file_id, lines[source]),
+                    ).rowcount
+            self._conn.commit()
+            return removed
+
+    def enforce_retention(
+        self,
+        max_rows: Optional[int] = None,
+        max_age: Optional[timedelta] = None,
+        now: Optional[datetime] = None,
+        max_bytes: Optional[int] = None,
+    ) -> int:
+        """Remove the oldest lines beyond max_rows, lines older than max_age and,
+        when the database is larger than max_bytes, the oldest lines to shrink it.
+
+        Returns the number of lines removed.
+        """
+        with self._lock:
+            self._write_pending()
+            removed = 0
+            first_id, last_id = self._conn.execute(
+                "SELECT MIN(id), MAX(id) FROM entries"
+            ).fetchone()
+            # Ids only grow, so there are at most as many lines as the span of their ids
+            if max_rows is not None and first_id is not None and last_id - first_id >= max_rows:
+                row = self._conn.execute(
+                    "SELECT id FROM entries ORDER BY id DESC LIMIT 1 OFFSET ?", (max_rows,)
+                ).fetchone()
+                if row is not None:
+                    removed += self._conn.execute(
+                        "DELETE FROM entries WHERE id <= ?", (row[0],)
+                    ).rowcount
+            if max_age is not None:
+                cutoff = to_micros((now or datetime.now()) - max_age)
+                removed += self._conn.execute(
+                    "DELETE FROM entries WHERE timestamp < ?", (cutoff,)
+                ).rowcount
+            if max_bytes is not None and self.size_bytes(used=True) > max_bytes:
+                removed += self._trim(max_bytes)
+            self._conn.commit()
+            if removed:
+                # Run as a script: a single step of the pragma frees a single page
+                self._conn.executescript("PRAGMA incremental_vacuum;")
+            return removed
+
+    def _trim(self, max_bytes: int) -> int:
+        """Remove the oldest lines to bring the pages in use below max_bytes.
+
+        Deleted lines stay in the text index until its segments are merged,
+        which rewrites the whole text index, so the lines to keep are estimated
+        from the current size and merged once. Whatever the estimate misses is
+        removed by the next retention check.
+        """
+        first_id, last_id = self._conn.execute("SELECT MIN(id), MAX(id) FROM entries").fetchone()
+        if first_id is None:
+            return 0
+        # Assumes lines take about the same space each
+        keep = int(
+            (last_id - first_id + 1) * max_bytes * INDEX_TRIM_TARGET / self.size_bytes(used=True)
+        )
+        removed = self._conn.execute(
+            "DELETE FROM entries WHERE id <= ?", (last_id - keep,)
+        ).rowcount
+        self._conn.execute("INSERT INTO entries_text (entries_text) VALUES ('optimize')")
+        return removed
+
+    def size_bytes(self, used: bool = False) -> int:
+        """Size of the database, or of its pages in use, excluding the write-ahead log."""
+        with self._lock:
+            pages = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            if used:
+                pages -= self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return pages * self._conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def save_incidents(
+        self, incidents: Iterable[Incident], max_incidents: int = MAX_INCIDENTS
+    ) -> None:
+        """Insert or update incidents, keeping the max_incidents seen most recently."""
+        rows = [
+            tuple(incident.to_dict()[column] for column in _INCIDENT_COLUMNS)
+            for incident in incidents
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO incidents ({', '.join(_INCIDENT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_INCIDENT_COLUMNS))})",
+                rows,
+            )
+            self._conn.execute(
+                "DELETE FROM incidents WHERE fingerprint NOT IN "
+                "(SELECT fingerprint FROM incidents ORDER BY last_seen DESC LIMIT ?)",
+                (max_incidents,),
+            )
+
+    def load_incidents(self) -> List[Incident]:
+        """Return every stored incident."""
+        return self.top_incidents(None)
+
+    def top_incidents(self, limit: Optional[int] = 10) -> List[Incident]:
+        """Return the most frequent incidents."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_INCIDENT_COLUMNS)} FROM incidents "
+                "ORDER BY count DESC, first_seen LIMIT ?",
+                (-1 if limit is None else limit,),
+            ).fetchall()
+        return [Incident.from_dict(dict(zip(_INCIDENT_COLUMNS, row, strict=True))) for row in rows]
+
+    def error_summary(self) -> Tuple[int, int, List[Tuple[str, int, str]]]:
+        """Return (occurrences, unique incidents, [(error type, count, latest title)])."""
+        with self._lock:
+            total, unique = self._conn.execute(
+                "SELECT COALESCE(SUM(count), 0), COUNT(*) FROM incidents"
+            ).fetchone()
+            # SQLite takes the bare title column from the row with the latest last_seen
+            by_type = self._conn.execute(
+                "SELECT COALESCE(error_type, 'unknown'), SUM(count), title, MAX(last_seen) "
+                "FROM incidents GROUP BY 1 ORDER BY 2 DESC"
+            ).fetchall()
+        return total, unique, [(name, count, title) for name, count, title, _ in by_type]
+
+    def save_summary(self, name: str, state: Dict[str, Any]) -> None:
+        """Store the state of a named summary, such as error message counts."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (name, state) VALUES (?, ?)",
+                (name, json.dumps(state)),
+            )
+
+    def load_summary(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the state stored by save_summary(), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM summaries WHERE name = ?", (name,)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    @staticmethod
+    def _where(
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        errors_only: bool = False,
+        warnings_only: bool = False,
+        min_severity: Optional[str] = None,
+        severities: Optional[Iterable[str]] = None,
+        error_types: Optional[Iterable[str]] = None,
+        paths: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        """SQL conditions and parameters for the line filters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if start is not None:
+            clauses.append("e.timestamp >= ?")
+            params.append(to_micros(start))
+        if end is not None:
+            clauses.append("e.timestamp < ?")
+            params.append(to_micros(end))
+        if errors_only:
+            clauses.append(f"e.flags & {FLAG_ERROR}")
+        elif warnings_only:
+            clauses.append(f"e.flags & {FLAG_WARNING}")
+        if min_severity is not None:
+            clauses.append("e.severity >= ?")
+            params.append(SEVERITY_CODES[min_severity])
+        if severities is not None:
+            codes = [SEVERITY_CODES[severity] for severity in severities]
+            clauses.append(f"e.severity IN ({', '.join('?' * len(codes))})")
+            params.extend(codes)
+        if error_types is not None:
+            error_types = list(error_types)
+            clauses.append(f"e.error_type IN ({', '.join('?' * len(error_types))})")
+            params.extend(error_types)
+        if paths is not None:
+            paths = list(paths)
+            clauses.append(
+                f"e.file_id IN (SELECT id FROM files WHERE path IN ({', '.join('?' * len(paths))}))"
+            )
+            params.extend(paths)
+        return clauses, params
+
+    def _query(
+        self, clauses: List[str], params: List[Any], order: str, offset: int, limit: int
+    ) -> Tuple[int, List[LogRecord]]:
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM entries e{where}", params).fetchone()[
+                0
+            ]
+            rows = self._conn.execute(
+                f"SELECT {_RECORD_COLUMNS}{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return total, [_record(row) for row in rows]
+
+    def count(self, **filters: Any) -> int:
+        """Count lines that pass the filters.
+
+        Filters: start, end, errors_only, warnings_only, min_severity,
+        severities, error_types and paths.
+        """
+        clauses, params = self._where(**filters)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM entries e{where}", params).fetchone()[
+                0
+            ]
+
+    def time_range(self, limit: int = 20, offset: int = 0, **filters: Any) -> List[LogRecord]:
+        """Return lines that pass the filters, latest timestamp first."""
+        clauses, params = self._where(**filters)
+        return self._query(clauses, params, "e.timestamp DESC, e.id DESC", offset, limit)[1]
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        offset: int = 0,
+        limit: int = 20,
+        **filters: Any,
+    ) -> Tuple[int, List[LogRecord]]:
+        """Find lines containing a substring or matching a regex, newest first.
+
+        Accepts the same filters as count(). Returns (total matches, records of
+        the requested page). Raises re.error for an invalid regex.
+        """
+        return self.query(
+            terms=[] if regex else [query],
+            regexes=[query] if regex else [],
+            case_sensitive=case_sensitive,
+            offset=offset,
+            limit=limit,
+            **filters,
+        )
+
+    def query(
+        self,
+        terms: Sequence[str] = (),
+        regexes: Sequence[str] = (),
+        case_sensitive: bool = False,
+        offset: int = 0,
+        limit: int = 20,
+        **filters: Any,
+    ) -> Tuple[int, List[LogRecord]]:
+        """Find lines containing every term and matching every regex, newest first.
+
+        The filters become conditions on indexed columns, and the trigram index
+        narrows the candidates to lines containing the terms, or the literals
+        every regex match requires, so text is only compared on those lines.
+        Returns (total matches, records of the requested page). Raises re.error
+        for an invalid regex.
+        """
+        clauses, params = self._where(**filters)
+        literals: List[str] = []
+        for term in terms:
+            if len(term) >= MIN_TRIGRAM_LENGTH:
+                literals.append(term)
+            if case_sensitive:
+                clauses.append("instr(e.content, ?) > 0")
+                params.append(term)
+            elif len(term) < MIN_TRIGRAM_LENGTH:
+                clauses.append("iregexp(?, e.content)")
+                params.append(re.escape(term))
+        for regex in regexes:
+            _compile(regex, 0 if case_sensitive else re.IGNORECASE)
+            literals += [lit for lit in regex_literals(regex) if len(lit) >= MIN_TRIGRAM_LENGTH]
+            clauses.append(f"{'regexp' if case_sensitive else 'iregexp'}(?, e.content)")
+            params.append(regex)
+
+        if literals:
+            clauses.insert(0, "e.id IN (SELECT rowid FROM entries_text WHERE entries_text MATCH ?)")
+            params.insert(0, " AND ".join(_phrase(literal) for literal in literals))
+        return self._query(clauses, params, "e.id DESC", offset, limit)
+
+    def columns(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> LogColumns:
+        """Return the timestamp, file and flags columns of the lines in [start, end)."""
+        clauses, params = self._where(start=start, end=end)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self._write_pending()
+            rows = self._conn.execute(
+                f"SELECT e.timestamp, e.file_id, e.flags FROM entries e{where}", params
+            ).fetchall()
+            paths = dict(self._conn.execute("SELECT id, path FROM files").fetchall())
+        timestamps, file_ids, flags = zip(*rows, strict=True) if rows else ((), (), ())
+        return LogColumns(array("q", timestamps), array("q", file_ids), array("B", flags), paths)
+
+    def paths(self) -> List[str]:
+        """Return the paths of every indexed file."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT path FROM files")]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return line, file and incident counts and the size on disk."""
+        with self._lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            files = self._conn.execute("SELECT COUNT(DISTINCT path) FROM files").fetchone()[0]
+            incidents = self._conn.execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+        disk_bytes = sum(
+            p.stat().st_size
+            for p in (self.path, Path(f"{self.path}-wal"), Path(f"{self.path}-shm"))
+            if p.exists()
+        )
+        return {
+            "path": str(self.path),
+            "rows": rows,
+            "files": files,
+            "incidents": incidents,
+            "rows_written": self.rows_written,
+            "size_bytes": self.size_bytes(),
+            "disk_bytes": disk_bytes,
+        }
@@ -0,0 +1,191 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Structured JSON-lines logs.
+
+A file is treated as JSON lines when the first non-blank lines of its head are
+JSON objects. Level, timestamp, logger, message and exception are then read from
+the usual field names of structlog, python-json-logger, pino, bunyan, logstash
+and similar formatters instead of being guessed from substrings. Records are
+decoded with orjson when it is installed.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+    HAS_ORJSON = False
+
+from .log_rotation import open_segment
+
+TEXT_FORMAT = "text"
+JSON_FORMAT = "json"
+
+# Bytes of a file's head examined by sniff_format
+SNIFF_BYTES = 8192
+
+# Non-blank lines that must all be JSON objects for a file to be JSON lines
+SNIFF_LINES = 5
+
+LEVEL_FIELDS = ("level", "levelname", "severity", "lvl", "log.level", "loglevel")
+TIMESTAMP_FIELDS = ("timestamp", "time", "ts", "@timestamp", "asctime", "datetime", "date")
+MESSAGE_FIELDS = ("message", "msg", "event", "log", "text")
+LOGGER_FIELDS = ("logger", "name", "logger_name", "log.logger", "module", "component")
+EXCEPTION_FIELDS = ("exc_info", "exception", "exc", "stack_trace", "stack", "error", "err")
+
+_LEVEL_NAMES = {
+    "trace": "debug",
+    "debug": "debug",
+    "info": "info",
+    "information": "info",
+    "notice": "info",
+    "warn": "warning",
+    "warning": "warning",
+    "err": "error",
+    "error": "error",
+    "crit": "critical",
+    "critical": "critical",
+    "fatal": "critical",
+    "alert": "critical",
+    "emerg": "critical",
+    "emergency": "critical",
+    "panic": "critical",
+}
+
+# Numeric levels as used by pino and bunyan
+_NUMERIC_LEVELS = [(60, "critical"), (50, "error"), (40, "warning"), (30, "info"), (0, "debug")]
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON with orjson when available."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def sniff_format(path: Union[str, Path]) -> str:
+    """Return JSON_FORMAT if the head of a log file is JSON lines, else TEXT_FORMAT."""
+    try:
+        with open_segment(path) as stream:
+            head = stream.read(SNIFF_BYTES)
+    except (OSError, EOFError):
+        return TEXT_FORMAT
+
+    lines = [line for line in head.split(b"\n") if line.strip()]
+    if len(head) == SNIFF_BYTES and len(lines) > 1:
+        lines = lines[:-1]  # The last line may be cut off
+    if not lines:
+        return TEXT_FORMAT
+    for line in lines[:SNIFF_LINES]:
+        if not line.lstrip().startswith(b"{"):
+            return TEXT_FORMAT
+        try:
+            if not isinstance(loads(line), dict):
+                return TEXT_FORMAT
+        except ValueError:
+            return TEXT_FORMAT
+    return JSON_FORMAT
+
+
+def _field(record: Dict[str, Any], names: Tuple[str, ...]) -> Any:
+    for name in names:
+        value = record.get(name)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _severity(level: Any) -> Optional[str]:
+    if isinstance(level, bool):
+        return None
+    if isinstance(level, (int, float)):
+        for threshold, severity in _NUMERIC_LEVELS:
+            if level >= threshold:
+                return severity
+        return "debug"
+    if isinstance(level, str):
+        return _LEVEL_NAMES.get(level.strip().lower())
+    return None
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            # Epoch seconds, or milliseconds as written by pino
+            return datetime.fromtimestamp(value / 1000 if value > 1e11 else value)
+        if isinstance(value, str):
+            timestamp = datetime.fromisoformat(value.strip())
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            return timestamp
+    except (ValueError, OverflowError, OSError):
+        pass
+    return None
+
+
+def _exception_text(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        # e.g. {"type": "ValueError", "message": "...", "stack": "..."}
+        stack = value.get("stack") or value.get("stack_trace") or value.get("traceback")
+        if isinstance(stack, str):
+            return stack
+        kind = value.get("type") or value.get("name") or value.get("class")
+        message = value.get("message") or value.get("msg")
+        if kind or message:
+            return f"{kind}: {message}" if kind and message else str(kind or message)
+    if isinstance(value, list) and all(isinstance(line, str) for line in value):
+        return "".join(value)
+    return None
+
+
+def parse_record(
+    line: str,
+) -> Optional[Tuple[Optional[datetime], Optional[str], str, Optional[str]]]:
+    """Parse a JSON log line into (timestamp, severity, content, exception).
+
+    severity is None when the record has no recognised level. content is a
+    single-line "LEVEL [logger] message" rendering, ending with the last line of
+    the exception if there is one. Returns None when the line is not a JSON
+    object, so the caller can fall back to the text path.
+    """
+    try:
+        record = loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+
+    level = _field(record, LEVEL_FIELDS)
+    severity = _severity(level)
+    timestamp = _timestamp(_field(record, TIMESTAMP_FIELDS))
+    logger = _field(record, LOGGER_FIELDS)
+    message = _field(record, MESSAGE_FIELDS)
+    exception = _exception_text(_field(record, EXCEPTION_FIELDS))
+    if exception is not None:
+        exception = exception.strip() or None
+
+    if message is None:
+        # Nothing to render; keep the record itself searchable
+        content = line.strip()
+    else:
+        parts = []
+        if isinstance(level, str):
+            parts.append(f"{level.upper()}:")
+        elif severity is not None:
+            parts.append(f"{severity.upper()}:")
+        if isinstance(logger, str):
+            parts.append(f"[{logger}]")
+        parts.append(" ".join(str(message).split()))
+        content = " ".join(parts)
+    if exception is not None:
+        content += f" | {exception.splitlines()[-1].strip()}"
+    return timestamp, severity, content, exception
@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Bulk scanning of large log files for the lines that may be errors or warnings.
+
+The file is memory-mapped and searched for the classifier's literals: the
+warning and error level keywords and the literals every error type rule
+requires. Blocks of whole lines are lowercased as bytes and each literal is
+located with bytes.find, which runs far faster than a case-insensitive regex
+alternation. Only the lines containing a literal, with the indented lines that
+follow them (traceback frames), are decoded and parsed; every other line is
+only counted. The result is a superset of the lines that full parsing would
+classify as warnings or errors, at the cost of not storing the others.
+"""
+
+import mmap
+from typing import List, Optional, Tuple
+
+from .log_parser import LogClassifier
+
+# Pending bytes of a file read for the first time above which it is scanned in bulk
+BULK_SCAN_MIN_BYTES = 256 * 1024 * 1024
+
+# Bytes of whole lines lowercased and searched at a time
+SCAN_BLOCK_BYTES = 8 * 1024 * 1024
+
+# Bytes that start a line continuing the one above it
+_CONTINUATION_BYTES = (ord(" "), ord("\t"))
+
+
+def candidate_literals(classifier: LogClassifier) -> Optional[List[bytes]]:
+    """Lowercase byte literals, one of which every warning or error line contains.
+
+    None when the classifier has a rule without a required literal, or a
+    non-ASCII literal, which bytes.lower() would not match.
+    """
+    literals = classifier.candidate_literals()
+    if literals is None or not all(literal.isascii() for literal in literals):
+        return None
+    # A line containing a longer literal also contains the shorter one inside it
+    return [
+        literal.encode("ascii")
+        for literal in literals
+        if not any(other != literal and other in literal for other in literals)
+    ]
+
+
+def _block_end(data: mmap.mmap, start: int, end: int) -> int:
+    """End of a block of whole lines from start, not splitting continuation lines off."""
+    if start + SCAN_BLOCK_BYTES >= end:
+        return end
+    cut = data.rfind(b"\n", start, start + SCAN_BLOCK_BYTES)
+    if cut < 0:
+        cut = data.find(b"\n", start + SCAN_BLOCK_BYTES, end)
+    while 0 <= cut < end - 1 and data[cut + 1] in _CONTINUATION_BYTES:
+        cut = data.find(b"\n", cut + 1, end)
+    return cut + 1 if cut >= 0 else end
+
+
+def _line_starts(lowered: bytes, literals: List[bytes]) -> List[int]:
+    """Offsets of the lines of a block containing any of the literals."""
+    starts = set()
+    for literal in literals:
+        position = lowered.find(literal)
+        while position >= 0:
+            starts.add(lowered.rfind(b"\n", 0, position) + 1)
+            line_end = lowered.find(b"\n", position)
+            if line_end < 0:
+                break
+            position = lowered.find(literal, line_end)
+    return sorted(starts)
+
+
+def scan_candidates(
+    path: str, start: int, end: int, literals: List[bytes]
+) -> List[Tuple[int, List[str]]]:
+    """Find candidate lines in the byte range [start, end), which starts on a line boundary.
+
+    Returns (index of the first line within the range, lines) groups, each a
+    line containing a literal followed by its indented continuation lines.
+    """
+    groups: List[Tuple[int, List[str]]] = []
+    if end <= start:
+        return groups
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        end = min(end, len(data))
+        line_index = 0
+        block_start = start
+        while block_start < end:
+            block_end = _block_end(data, block_start, end)
+            block = data[block_start:block_end]
+            counted = 0
+            for line_start in _line_starts(block.lower(), literals):
+                if line_start < counted:
+                    # Already part of the previous group
+                    continue
+                line_index += block.count(b"\n", counted, line_start)
+                line_end = block.find(b"\n", line_start)
+                while 0 <= line_end < len(block) - 1 and block[line_end + 1] in _CONTINUATION_BYTES:
+                    line_end = block.find(b"\n", line_end + 1)
+                if line_end < 0:
+                    # The range ends with a partial line the tailer chose to consume
+                    line_end = len(block)
+                lines = block[line_start:line_end].decode("utf-8", errors="ignore").split("\n")
+                groups.append((line_index, lines))
+                line_index += len(lines)
+                counted = line_end + 1
+            line_index += block.count(b"\n", counted)
+            block_start = block_end
+    return groups
@@ -0,0 +1,181 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Parsing of log byte ranges across a process pool.
+
+Large pending ranges are split into chunks that start and end on line
+boundaries, so each worker can read and parse its chunk independently. Results
+come back in submission order and carry the number of lines in the chunk, which
+lets the caller assign line numbers while merging. Small amounts of data are
+parsed in the calling process, where the pool's overhead would dominate.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .log_json import parse_record
+from .log_parser import LogClassifier, parse_timestamp
+
+# Pending bytes in one ingestion pass below which parsing stays in-process
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# Target size of the byte range handed to one worker task
+CHUNK_BYTES = 4 * 1024 * 1024
+
+# Bytes read at a time while looking for the next line boundary
+_BOUNDARY_PROBE = 4096
+
+# (index of the line within its chunk, raw line, timestamp, content, severity,
+# error_type, exception text of a structured record)
+ParsedLine = Tuple[int, str, Optional[datetime], str, str, Optional[str], Optional[str]]
+
+_worker_classifier: Optional[LogClassifier] = None
+
+
+def split_ranges(
+    path: str, start: int, end: int, chunk_bytes: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """Split [start, end) into ranges of about chunk_bytes that end after a newline."""
+    chunk_bytes = chunk_bytes or CHUNK_BYTES
+    if end - start <= chunk_bytes:
+        return [(start, end)] if end > start else []
+
+    ranges = []
+    with open(path, "rb") as f:
+        position = start
+        while end - position > chunk_bytes:
+            f.seek(position + chunk_bytes - 1)
+            boundary = -1
+            while boundary < 0:
+                probe_start = f.tell()
+                probe = f.read(_BOUNDARY_PROBE)
+                if not probe:
+                    break
+                cut = probe.find(b"\n")
+                if cut >= 0:
+                    boundary = probe_start + cut + 1
+            if boundary < 0 or boundary >= end:
+                break
+            ranges.append((position, boundary))
+            position = boundary
+    ranges.append((position, end))
+    return ranges
+
+
+def split_lines(data: bytes) -> List[str]:
+    """Decode a range of complete lines the way the tailer does."""
+    if not data:
+        return []
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    return data.decode("utf-8", errors="ignore").split("\n")
+
+
+def parse_lines(
+    lines: Iterable[str],
+    classifier: LogClassifier,
+    today: Optional[date] = None,
+    json_lines: bool = False,
+) -> List[ParsedLine]:
+    """Parse timestamps and classify lines, skipping blank ones.
+
+    With json_lines, lines that are JSON objects take their level, timestamp and
+    exception from the record's fields; other lines use the text path.
+    """
+    classify = classifier.classify
+    parsed = []
+    for index, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        if not line:
+            continue
+        record = parse_record(line) if json_lines and line[0] == "{" else None
+        if record is not None:
+            timestamp, level, content, exception = record
+            severity, error_type = classify(content)
+            if level is not None:
+                severity = level
+                if level not in ("error", "critical") and exception is None:
+                    # The record's level wins over error words in its message
+                    error_type = None
+            if exception is not None and error_type is None:
+                error_type = "exception"
+        else:
+            timestamp, content = parse_timestamp(line, today)
+            severity, error_type = classify(content)
+            exception = None
+        parsed.append((index, raw_line, timestamp, content, severity, error_type, exception))
+    return parsed
+
+
+def _init_worker(error_patterns: Sequence[str]) -> None:
+    global _worker_classifier
+    _worker_classifier = LogClassifier(error_patterns)
+
+
+def parse_range(
+    path: str, start: int, end: int, today: date, json_lines: bool = False
+) -> Tuple[int, List[ParsedLine]]:
+    """Read and parse one byte range; returns (line count, parsed lines).
+
+    Runs in pool workers, which build their classifier once at start-up.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = split_lines(data)
+    return len(lines), parse_lines(lines, _worker_classifier or LogClassifier(), today, json_lines)
+
+
+class LogParserPool:
+    """A lazily started process pool that parses log byte ranges."""
+
+    def __init__(
+        self, error_patterns: Optional[Sequence[str]] = None, max_workers: Optional[int] = None
+    ):
+        self.error_patterns = list(error_patterns or [])
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tasks = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Check if more than one worker is available."""
+        return self.max_workers > 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers do not inherit the monitor's threads or locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.error_patterns,),
+            )
+        return self._executor
+
+    def parse(
+        self, jobs: Sequence[Tuple[str, int, int, bool]], today: Optional[date] = None
+    ) -> Iterator[Tuple[int, List[ParsedLine]]]:
+        """Parse (path, start, end, json_lines) ranges in parallel, yielding results in job order."""
+        executor = self._get_executor()
+        today = today or date.today()
+        futures = [
+            executor.submit(parse_range, path, start, end, today, json_lines)
+            for path, start, end, json_lines in jobs
+        ]
+        self.tasks += len(futures)
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,196 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Precompiled classification and fast timestamp parsing of log lines.
+
+The classifier keeps the rules of the original per-line checks: severity is the
+most severe level keyword found anywhere in the line (case-insensitive), and the
+error type is the first matching type in priority order. All rules, including
+the configured error patterns, are compiled once into a table of required
+literals. A line is lowercased once and probed with substring checks; a rule's
+regex only runs when one of its literals is present, so ordinary lines never
+reach the regex engine.
+"""
+
+import re
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .trigram import alternative_literals
+
+# Level keywords, most severe first
+SEVERITY_KEYWORDS = [
+    ("critical", ("critical", "fatal")),
+    ("error", ("error",)),
+    ("warning", ("warn",)),
+    ("info", ("info",)),
+]
+
+# Error type rules in priority order
+ERROR_TYPE_PATTERNS = [
+    ("exception", r"Exception|Error:|Traceback"),
+    ("http_error", r"HTTP.*[45]\d\d|status.*[45]\d\d"),
+    ("connection_error", r"connection.*failed|timeout|refused"),
+    ("import_error", r"ImportError|ModuleNotFoundError"),
+    ("syntax_error", r"SyntaxError|IndentationError"),
+    ("permission_error", r"PermissionError|Access.*denied"),
+    ("file_error", r"FileNotFoundError|No such file"),
+]
+
+# Error type reported for lines matched only by a configured error pattern
+CUSTOM_ERROR_TYPE = "custom_pattern"
+
+SEVERITIES = ["debug", "info", "warning", "error", "critical"]
+
+# Number of parsed timestamp prefixes remembered by parse_timestamp
+TIMESTAMP_CACHE_SIZE = 4096
+
+_timestamp_cache: Dict[str, datetime] = {}
+
+
+def _pattern_source(pattern: str) -> str:
+    """Return a configured pattern as regex source, escaping invalid regexes."""
+    try:
+        re.compile(pattern)
+        return pattern
+    except re.error:
+        return re.escape(pattern)
+
+
+class LogClassifier:
+    """Precompiled severity and error type detection for log lines."""
+
+    def __init__(self, error_patterns: Optional[Iterable[str]] = None):
+        self.error_patterns: List[str] = list(error_patterns or [])
+
+        rules = list(ERROR_TYPE_PATTERNS)
+        if self.error_patterns:
+            custom = "|".join(f"(?:{_pattern_source(p)})" for p in self.error_patterns)
+            rules.append((CUSTOM_ERROR_TYPE, custom))
+        self._names = [name for name, _pattern in rules]
+        self._regexes = [re.compile(pattern, re.IGNORECASE) for _name, pattern in rules]
+
+        # (literal, rule index) in priority order; a None literal means the rule
+        # has no required literal and its regex must always run
+        self._literals: List[Tuple[Optional[str], int]] = []
+        for index, (_name, pattern) in enumerate(rules):
+            literals = alternative_literals(pattern)
+            if literals is None:
+                self._literals.append((None, index))
+            else:
+                for literal in dict.fromkeys(lit.lower() for lit in literals):
+                    self._literals.append((literal, index))
+
+    def candidate_literals(self) -> Optional[List[str]]:
+        """Lowercase literals, one of which every warning or error line contains.
+
+        Covers the warning and error level keywords and the literals of every
+        error type rule. Returns None when a rule has no required literal, so
+        any line may be an error.
+        """
+        if any(literal is None for literal, _index in self._literals):
+            return None
+        keywords = [
+            keyword
+            for level, level_keywords in SEVERITY_KEYWORDS
+            if level in ("critical", "error", "warning")
+            for keyword in level_keywords
+        ]
+        return list(dict.fromkeys(keywords + [literal for literal, _index in self._literals]))
+
+    @staticmethod
+    def _severity(lowered: str) -> str:
+        for level, keywords in SEVERITY_KEYWORDS:
+            for keyword in keywords:
+                if keyword in lowered:
+                    return level
+        return "debug"
+
+    def _error_type(self, content: str, lowered: str) -> Optional[str]:
+        tried = -1
+        for literal, index in self._literals:
+            if index == tried or (literal is not None and literal not in lowered):
+                continue
+            tried = index
+            if self._regexes[index].search(content):
+                return self._names[index]
+        return None
+
+    def severity(self, content: str) -> str:
+        """Return the most severe level keyword in the line, or "debug"."""
+        return self._severity(content.lower())
+
+    def error_type(self, content: str) -> Optional[str]:
+        """Return the highest-priority error type matching the line."""
+        return self._error_type(content, content.lower())
+
+    def classify(self, content: str) -> Tuple[str, Optional[str]]:
+        """Return (severity, error_type) for a line."""
+        lowered = content.lower()
+        return self._severity(lowered), self._error_type(content, lowered)
+
+
+def _digits(text: str) -> bool:
+    return text.isascii() and text.isdigit()
+
+
+def parse_timestamp(line: str, today: Optional[date] = None) -> Tuple[Optional[datetime], str]:
+    """Parse a leading timestamp using fixed-position checks instead of regexes.
+
+    Supports "YYYY-MM-DD HH:MM:SS" (also with a "T" separator), "MM/DD/YYYY
+    HH:MM:SS" and a bare "HH:MM:SS" which is combined with today's date. Optional
+    fractional seconds are consumed. Returns (timestamp, rest of the line); the
+    timestamp is None when the line does not start with one.
+    """
+    try:
+        if len(line) >= 19 and line[13] == ":" and line[16] == ":":
+            # Consecutive lines usually share the same second
+            prefix = line[:19]
+            timestamp = _timestamp_cache.get(prefix)
+            if timestamp is not None:
+                return _fraction(timestamp, line, 19)
+            if line[4] == "-" and line[7] == "-" and line[10] in " T":
+                year, month, day = line[0:4], line[5:7], line[8:10]
+            elif line[2] == "/" and line[5] == "/" and line[10] == " ":
+                month, day, year = line[0:2], line[3:5], line[6:10]
+            else:
+                year = None
+            if year is not None:
+                hour, minute, second = line[11:13], line[14:16], line[17:19]
+                if _digits(year + month + day + hour + minute + second):
+                    timestamp = datetime(
+                        int(year), int(month), int(day), int(hour), int(minute), int(second)
+                    )
+                    if len(_timestamp_cache) >= TIMESTAMP_CACHE_SIZE:
+                        _timestamp_cache.clear()
+                    _timestamp_cache[prefix] = timestamp
+                    return _fraction(timestamp, line, 19)
+
+        if len(line) >= 8 and line[2] == ":" and line[5] == ":":
+            hour, minute, second = line[0:2], line[3:5], line[6:8]
+            if _digits(hour + minute + second):
+                day = today or date.today()
+                timestamp = datetime(
+                    day.year, day.month, day.day, int(hour), int(minute), int(second)
+                )
+                return _fraction(timestamp, line, 8)
+    except ValueError:
+        pass
+    return None, line
+
+
+def _fraction(timestamp: datetime, line: str, end: int) -> Tuple[datetime, str]:
+    """Consume optional fractional seconds after a timestamp."""
+    if end < len(line) and line[end] in ".," and line[end + 1 : end + 2].isdigit():
+        digits_end = end + 1
+        while digits_end < len(line) and line[digits_end].isdigit():
+            digits_end += 1
+        fraction = line[end + 1 : digits_end][:6].ljust(6, "0")
+        if fraction.isascii():
+            timestamp = timestamp.replace(microsecond=int(fraction))
+        end = digits_end
+    return timestamp, line[end:].strip()
+
+
+# Classifier with the built-in rules only
+DEFAULT_CLASSIFIER = LogClassifier()
@@ -0,0 +1,210 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""A small query language for log lines.
+
+A query is a list of space-separated conditions, all of which must hold:
+
+    level>=error service:coding since:15m "ZeroDivisionError"
+
+- level:NAME, level=NAME, level>=NAME, level>NAME, level<=NAME, level<NAME
+- service:NAME: files written by a service, i.e. whose base name is NAME
+- file:PATTERN: files whose path contains PATTERN or matches it as a glob
+- type:NAME: lines of an error type, such as connection_error
+- is:error, is:warning: error or warning lines, without their continuations
+- since:WHEN, until:WHEN: a duration ago (30s, 15m, 2h, 7d, 1w) or an ISO time
+- "quoted phrase" or a bare word: lines containing it, ignoring case
+- /regex/: lines matching a regular expression, ignoring case
+
+Repeating service, file or type, or giving comma-separated values, matches any
+of them. parse_query() turns the text into a LogQuery whose fields map onto
+index lookups: the time range, file, severity and error type filters are
+applied before any line text is compared.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .log_parser import SEVERITIES
+
+_TOKEN_RE = re.compile(
+    r'"(?P<phrase>(?:[^"\\]|\\.)*)"'
+    r"|/(?P<regex>(?:[^/\\]|\\.)+)/(?=\s|$)"
+    r'|(?P<field>[a-z_]+)(?P<op>>=|<=|:|=|>|<)(?P<value>"(?:[^"\\]|\\.)*"|\S+)'
+    r"|(?P<word>\S+)"
+)
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)([smhdw])")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_LEVEL_ALIASES = {"warn": "warning", "err": "error", "fatal": "critical", "crit": "critical"}
+
+FIELDS = ("level", "service", "file", "type", "is", "since", "until")
+
+
+class QueryError(ValueError):
+    """Raised for a query that cannot be parsed."""
+
+
+class LogQuery:
+    """Conditions of a parsed query."""
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.terms: List[str] = []
+        self.regexes: List[str] = []
+        self.severities: Optional[List[str]] = None
+        self.services: List[str] = []
+        self.files: List[str] = []
+        self.error_types: List[str] = []
+        self.errors_only = False
+        self.warnings_only = False
+        self.start: Optional[datetime] = None
+        self.end: Optional[datetime] = None
+
+    @property
+    def has_file_filter(self) -> bool:
+        return bool(self.services or self.files)
+
+    def matches(self, content: str) -> bool:
+        """Check the text conditions against a line."""
+        lowered = content.lower()
+        return all(term.lower() in lowered for term in self.terms) and all(
+            re.search(regex, content, re.IGNORECASE) for regex in self.regexes
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "query": self.text,
+            "terms": self.terms,
+            "regexes": self.regexes,
+            "severities": self.severities,
+            "services": self.services,
+            "files": self.files,
+            "error_types": self.error_types,
+            "errors_only": self.errors_only,
+            "warnings_only": self.warnings_only,
+            "start": self.start.isoformat() if self.start else None,
+            "end": self.end.isoformat() if self.end else None,
+        }
+
+    def describe(self) -> List[str]:
+        """Describe the conditions in the order they are applied."""
+        steps = []
+        if self.start or self.end:
+            start = self.start.strftime("%Y-%m-%d %H:%M:%S") if self.start else "the beginning"
+            end = self.end.strftime("%Y-%m-%d %H:%M:%S") if self.end else "now"
+            steps.append(f"time range {start} to {end}")
+        if self.services:
+            steps.append(f"services {', '.join(self.services)}")
+        if self.files:
+            steps.append(f"files matching {', '.join(self.files)}")
+        if self.severities is not None:
+            steps.append(f"levels {', '.join(self.severities) or 'none'}")
+        if self.errors_only or self.warnings_only:
+            steps.append("errors only" if self.errors_only else "warnings only")
+        if self.error_types:
+            steps.append(f"error types {', '.join(self.error_types)}")
+        for term in self.terms:
+            steps.append(f'text "{term}"')
+        for regex in self.regexes:
+            steps.append(f"regex /{regex}/")
+        return steps
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def _level(value: str) -> str:
+    level = value.lower()
+    level = _LEVEL_ALIASES.get(level, level)
+    if level not in SEVERITIES:
+        raise QueryError(f"Unknown level {value!r}; use one of {', '.join(SEVERITIES)}")
+    return level
+
+
+def _time(value: str, now: datetime) -> datetime:
+    duration = _DURATION_RE.fullmatch(value.lower())
+    if duration is not None:
+        number, unit = duration.groups()
+        return now - timedelta(seconds=float(number) * _DURATION_UNITS[unit])
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        raise QueryError(
+            f"Invalid time {value!r}; use a duration such as 15m or an ISO time"
+        ) from None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def _add_condition(query: LogQuery, field: str, op: str, value: str, now: datetime) -> None:
+    if field == "level":
+        position = SEVERITIES.index(_level(value))
+        allowed = {
+            ":": SEVERITIES[position : position + 1],
+            "=": SEVERITIES[position : position + 1],
+            ">=": SEVERITIES[position:],
+            ">": SEVERITIES[position + 1 :],
+            "<=": SEVERITIES[: position + 1],
+            "<": SEVERITIES[:position],
+        }[op]
+        current = query.severities if query.severities is not None else SEVERITIES
+        query.severities = [level for level in current if level in allowed]
+        return
+
+    if op not in (":", "="):
+        raise QueryError(f"{field} only supports ':'")
+    values = [v for v in value.split(",") if v] if field in ("service", "file", "type") else [value]
+    if not values:
+        raise QueryError(f"Missing value for {field}")
+    if field == "service":
+        query.services.extend(values)
+    elif field == "file":
+        query.files.extend(values)
+    elif field == "type":
+        query.error_types.extend(v.lower() for v in values)
+    elif field == "is":
+        if value.lower() in ("error", "errors"):
+            query.errors_only = True
+        elif value.lower() in ("warning", "warnings", "warn"):
+            query.warnings_only = True
+        else:
+            raise QueryError(f"Unknown condition is:{value}; use is:error or is:warning")
+    elif field == "since":
+        query.start = _time(value, now)
+    elif field == "until":
+        query.end = _time(value, now)
+
+
+def parse_query(text: str, now: Optional[datetime] = None) -> LogQuery:
+    """Parse query text into a LogQuery. Raises QueryError for invalid queries."""
+    now = now or datetime.now()
+    query = LogQuery(text.strip())
+    for match in _TOKEN_RE.finditer(text):
+        if match.group("phrase") is not None:
+            phrase = _unquote(match.group(0))
+            if phrase:
+                query.terms.append(phrase)
+        elif match.group("regex") is not None:
+            regex = match.group("regex").replace("\\/", "/")
+            try:
+                re.compile(regex)
+            except re.error as e:
+                raise QueryError(f"Invalid regular expression /{regex}/: {e}") from e
+            query.regexes.append(regex)
+        elif match.group("field") is not None and match.group("field") in FIELDS:
+            value = _unquote(match.group("value"))
+            _add_condition(query, match.group("field"), match.group("op"), value, now)
+        else:
+            # Unknown fields, such as in a URL, are plain text
+            query.terms.append(match.group(0))
+    if query.errors_only and query.warnings_only:
+        raise QueryError("is:error and is:warning cannot be combined")
+    return query
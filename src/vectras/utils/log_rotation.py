@@ -0,0 +1,149 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Discovery and streaming reads of rotated and compressed log segments.
+
+A rotation chain is a live file such as app.log plus its rotated segments
+app.log.1, app.log.2.gz, app.log.3.zst and so on, where a higher index is
+older. Compressed segments are decompressed as a stream in fixed-size blocks,
+so a segment is never held in memory as a whole. Zstandard segments are only
+recognised when the zstandard package is installed.
+"""
+
+import gzip
+import hashlib
+import re
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:  # pragma: no cover - zstandard is an optional dependency
+    zstandard = None
+    HAS_ZSTD = False
+
+# File extensions of live log files
+LOG_EXTENSIONS = ("log", "txt", "out", "err")
+
+COMPRESSED_SUFFIXES = (".gz", ".zst") if HAS_ZSTD else (".gz",)
+
+# Size of each read from a segment stream
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+_SEGMENT_RE = re.compile(
+    r"^(?P<base>.+\.(?:" + "|".join(LOG_EXTENSIONS) + r"))"
+    r"(?:\.(?P<index>\d+))?"
+    r"(?P<codec>\.gz|\.zst)?$"
+)
+
+
+def parse_segment_name(name: str) -> Optional[Tuple[str, int, Optional[str]]]:
+    """Return (base name, rotation index, codec suffix) for a log file name.
+
+    The live file has index 0 and no codec. Returns None for other files,
+    including .zst segments when zstandard is unavailable.
+    """
+    match = _SEGMENT_RE.match(name)
+    if match is None:
+        return None
+    codec = match.group("codec")
+    if codec is not None and codec not in COMPRESSED_SUFFIXES:
+        return None
+    index = match.group("index")
+    if index is None and codec is not None:
+        # app.log.gz: a compressed segment without a number is the newest one
+        return match.group("base"), 1, codec
+    return match.group("base"), int(index or 0), codec
+
+
+def is_compressed(path: Union[str, Path]) -> bool:
+    """Check if a path names a compressed log segment."""
+    return str(path).endswith(COMPRESSED_SUFFIXES)
+
+
+def order_rotation_chains(paths: Iterable[Path]) -> List[Path]:
+    """Filter paths to log files and order each rotation chain oldest first.
+
+    Chains are sorted by the directory and base name of their live file;
+    within a chain, segments with a higher index come first and the live file
+    comes last.
+    """
+    keyed = []
+    for path in set(paths):
+        parsed = parse_segment_name(path.name)
+        if parsed is None:
+            continue
+        base, index, codec = parsed
+        # For equal indexes, read the plain segment before a compressed copy
+        keyed.append(((str(path.parent), base, -index, codec is not None), path))
+    return [path for _key, path in sorted(keyed)]
+
+
+def open_segment(path: Union[str, Path]) -> IO[bytes]:
+    """Open a log segment for streaming binary reads, decompressing as needed."""
+    path = str(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if not HAS_ZSTD:
+            raise OSError(f"zstandard is not installed; cannot read {path}")
+        raw = open(path, "rb")
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, "rb")
+
+
+def read_prefix(path: Union[str, Path], length: int) -> bytes:
+    """Return the first length decompressed bytes of a segment."""
+    with open_segment(path) as stream:
+        prefix = b""
+        while len(prefix) < length:
+            block = stream.read(length - len(prefix))
+            if not block:
+                break
+            prefix += block
+        return prefix
+
+
+def iter_segment_lines(
+    path: Union[str, Path], skip_bytes: int = 0, block_size: int = STREAM_BLOCK_SIZE
+) -> Iterator[List[str]]:
+    """Yield the lines of a segment in batches, after skipping skip_bytes.
+
+    Each batch holds the complete lines of one block; an unterminated last line
+    is yielded at the end since rotated segments are no longer written.
+    """
+    with open_segment(path) as stream:
+        while skip_bytes > 0:
+            skipped = stream.read(min(block_size, skip_bytes))
+            if not skipped:
+                return
+            skip_bytes -= len(skipped)
+
+        pending = b""
+        while True:
+            block = stream.read(block_size)
+            if not block:
+                break
+            block = pending + block
+            cut = block.rfind(b"\n")
+            if cut < 0:
+                pending = block
+                continue
+            pending = block[cut + 1 :]
+            yield block[:cut].decode("utf-8", errors="ignore").split("\n")
+        if pending:
+            yield [pending.decode("utf-8", errors="ignore")]
+
+
+def file_checksum(path: Union[str, Path], block_size: int = STREAM_BLOCK_SIZE) -> str:
+    """Return a blake2b checksum of a file's bytes, read in blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,302 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Bounded-memory counts of the most frequent error messages.
+
+Error lines are normalized (ids, numbers and quoted values masked) and counted
+with the Space-Saving algorithm: a sketch monitors at most capacity messages,
+and a message that is not monitored replaces the least frequent one, taking
+over its count as the error bound. Any message occurring more than
+total / capacity times is guaranteed to be monitored, and its count is
+overestimated by at most its error bound.
+
+Counts are kept per time window of the log timestamps, plus one sketch over
+everything, so memory stays constant however many lines are read. Sketches of
+several windows merge into the top messages of a longer period.
+"""
+
+import heapq
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .log_incidents import normalize_message
+
+# Messages monitored per window
+WINDOW_CAPACITY = 64
+
+# Messages monitored over the whole history
+TOTAL_CAPACITY = 256
+
+# Width of a window
+WINDOW_SECONDS = 300
+
+# Windows kept, newest first
+MAX_WINDOWS = 12
+
+# Longest normalized message and example kept per counter
+MAX_MESSAGE_LENGTH = 200
+MAX_EXAMPLE_LENGTH = 500
+
+
+class HeavyHitter:
+    """Estimated count of a normalized message."""
+
+    __slots__ = ("message", "count", "error", "error_type", "example", "last_seen")
+
+    def __init__(
+        self,
+        message: str,
+        count: int = 0,
+        error: int = 0,
+        error_type: Optional[str] = None,
+        example: str = "",
+        last_seen: Optional[datetime] = None,
+    ):
+        self.message = message
+        self.count = count
+        self.error = error
+        self.error_type = error_type
+        self.example = example
+        self.last_seen = last_seen
+
+    @property
+    def guaranteed(self) -> int:
+        """Occurrences certainly seen: the count minus its overestimation bound."""
+        return self.count - self.error
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "message": self.message,
+            "count": self.count,
+            "error": self.error,
+            "error_type": self.error_type,
+            "example": self.example,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HeavyHitter":
+        last_seen = data.get("last_seen")
+        return cls(
+            data["message"],
+            data.get("count", 0),
+            data.get("error", 0),
+            data.get("error_type"),
+            data.get("example", ""),
+            datetime.fromisoformat(last_seen) if last_seen else None,
+        )
+
+
+class SpaceSaving:
+    """Space-Saving sketch of the most frequent keys in a stream."""
+
+    def __init__(self, capacity: int = WINDOW_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self.counters: Dict[str, HeavyHitter] = {}
+        # (count, message) of every counter; entries whose count is stale are skipped
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(
+        self,
+        message: str,
+        count: int = 1,
+        error_type: Optional[str] = None,
+        example: str = "",
+        timestamp: Optional[datetime] = None,
+    ) -> HeavyHitter:
+        """Count occurrences of a message; returns its counter."""
+        self.total += count
+        counter = self.counters.get(message)
+        if counter is None:
+            error = 0
+            if len(self.counters) >= self.capacity:
+                # The newcomer may have been among the evicted occurrences
+                error = self._evict().count
+            counter = HeavyHitter(message, error, error)
+            self.counters[message] = counter
+        counter.count += count
+        counter.error_type = error_type or counter.error_type
+        counter.example = example or counter.example
+        if timestamp is not None and (counter.last_seen is None or timestamp > counter.last_seen):
+            counter.last_seen = timestamp
+        heapq.heappush(self._heap, (counter.count, message))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+        return counter
+
+    def _evict(self) -> HeavyHitter:
+        """Remove and return the counter with the lowest count."""
+        while True:
+            count, message = heapq.heappop(self._heap)
+            counter = self.counters.get(message)
+            if counter is not None and counter.count == count:
+                del self.counters[message]
+                return counter
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(counter.count, message) for message, counter in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    @property
+    def min_count(self) -> int:
+        """Bound on the count of any message that is not monitored."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(counter.count for counter in self.counters.values())
+
+    def top(self, limit: int = 10) -> List[HeavyHitter]:
+        """Return the counters with the highest counts."""
+        return heapq.nlargest(
+            limit, self.counters.values(), key=lambda c: (c.count, -c.error, c.message)
+        )
+
+    @classmethod
+    def merge(cls, sketches: Iterable["SpaceSaving"], capacity: int) -> "SpaceSaving":
+        """Combine sketches of disjoint parts of a stream into one of the given capacity."""
+        sketches = list(sketches)
+        merged = cls(capacity)
+        floors = [sketch.min_count for sketch in sketches]
+        messages = {message for sketch in sketches for message in sketch.counters}
+        counters = []
+        for message in messages:
+            combined = HeavyHitter(message)
+            for sketch, floor in zip(sketches, floors, strict=True):
+                counter = sketch.counters.get(message)
+                if counter is None:
+                    # Unmonitored there, so it occurred at most floor times
+                    combined.count += floor
+                    combined.error += floor
+                    continue
+                combined.count += counter.count
+                combined.error += counter.error
+                if combined.last_seen is None or (
+                    counter.last_seen is not None and counter.last_seen >= combined.last_seen
+                ):
+                    combined.error_type = counter.error_type
+                    combined.example = counter.example
+                    combined.last_seen = counter.last_seen
+            counters.append(combined)
+        counters.sort(key=lambda c: c.count, reverse=True)
+        merged.counters = {counter.message: counter for counter in counters[:capacity]}
+        merged.total = sum(sketch.total for sketch in sketches)
+        merged._rebuild_heap()
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "counters": [counter.to_dict() for counter in self.counters.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpaceSaving":
+        sketch = cls(data.get("capacity", WINDOW_CAPACITY))
+        sketch.total = data.get("total", 0)
+        counters = [HeavyHitter.from_dict(item) for item in data.get("counters", [])]
+        sketch.counters = {counter.message: counter for counter in counters}
+        sketch._rebuild_heap()
+        return sketch
+
+
+class HeavyHitterWindows:
+    """Space-Saving sketches of normalized error messages per time window."""
+
+    def __init__(
+        self,
+        window_seconds: int = WINDOW_SECONDS,
+        max_windows: int = MAX_WINDOWS,
+        capacity: int = WINDOW_CAPACITY,
+        total_capacity: int = TOTAL_CAPACITY,
+    ):
+        self.window_seconds = window_seconds
+        self.max_windows = max_windows
+        self.capacity = capacity
+        self.overall = SpaceSaving(total_capacity)
+        # Window number (start time // window_seconds) to its sketch
+        self.windows: Dict[int, SpaceSaving] = {}
+        self.updated = False
+        self._lock = threading.Lock()
+
+    def add(self, content: str, timestamp: datetime, error_type: Optional[str] = None) -> None:
+        """Count an error line under its normalized message."""
+        message = normalize_message(content)[:MAX_MESSAGE_LENGTH]
+        example = content[:MAX_EXAMPLE_LENGTH]
+        window = int(timestamp.timestamp() // self.window_seconds)
+        with self._lock:
+            self.overall.add(message, 1, error_type, example, timestamp)
+            sketch = self.windows.get(window)
+            if sketch is None:
+                if len(self.windows) >= self.max_windows and window < min(self.windows):
+                    # Older than every window kept; only counted overall
+                    self.updated = True
+                    return
+                sketch = self.windows[window] = SpaceSaving(self.capacity)
+                while len(self.windows) > self.max_windows:
+                    del self.windows[min(self.windows)]
+            sketch.add(message, 1, error_type, example, timestamp)
+            self.updated = True
+
+    def window_start(self, window: int) -> datetime:
+        return datetime.fromtimestamp(window * self.window_seconds)
+
+    def top(self, limit: int = 10, windows: Optional[int] = None) -> List[HeavyHitter]:
+        """Most frequent messages overall, or over the newest windows when given."""
+        with self._lock:
+            if windows is None:
+                return self.overall.top(limit)
+            newest = sorted(self.windows, reverse=True)[:windows]
+            merged = SpaceSaving.merge(
+                (self.windows[window] for window in newest), self.overall.capacity
+            )
+            return merged.top(limit)
+
+    def by_window(self, limit: int = 3) -> List[Tuple[datetime, int, List[HeavyHitter]]]:
+        """(window start, errors, top messages) of every window, newest first."""
+        with self._lock:
+            return [
+                (
+                    self.window_start(window),
+                    self.windows[window].total,
+                    self.windows[window].top(limit),
+                )
+                for window in sorted(self.windows, reverse=True)
+            ]
+
+    @property
+    def memory_size(self) -> int:
+        """Approximate bytes held by the counters."""
+        with self._lock:
+            counters = len(self.overall.counters) + sum(
+                len(sketch.counters) for sketch in self.windows.values()
+            )
+        return counters * (MAX_MESSAGE_LENGTH + MAX_EXAMPLE_LENGTH + 200)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        with self._lock:
+            return {
+                "window_seconds": self.window_seconds,
+                "overall": self.overall.to_dict(),
+                "windows": {
+                    str(window): sketch.to_dict() for window, sketch in self.windows.items()
+                },
+            }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Replace the counts with ones saved by to_dict()."""
+        with self._lock:
+            self.overall = SpaceSaving.from_dict(data["overall"])
+            windows = {}
+            if data.get("window_seconds") == self.window_seconds:
+                windows = {
+                    int(window): SpaceSaving.from_dict(sketch)
+                    for window, sketch in data.get("windows", {}).items()
+                }
+            newest = sorted(windows, reverse=True)[: self.max_windows]
+            self.windows = {window: windows[window] for window in newest}
+            self.updated = False
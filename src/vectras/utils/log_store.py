@@ -0,0 +1,687 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Compact columnar storage for parsed log lines.
+
+Each column is a typed array indexed by row, and rows are identified by an
+increasing row id. Timestamps are int64 microseconds, file paths are interned
+to small ids, severity and error type are one-byte codes and the line text is
+kept UTF-8 encoded in a single newline-separated arena. The store is bounded
+by a memory budget and evicts its oldest rows first. A per-minute time index
+answers time window queries without scanning, and a trigram index over blocks
+of rows narrows text searches to the blocks that can contain a match.
+
+Filters work on whole columns: code columns are mapped to 0/1 masks with
+bytes.translate and combined as integers, and matching rows are selected with
+itertools.compress, so no per-row Python code runs while filtering.
+"""
+
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from itertools import compress
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .log_parser import CUSTOM_ERROR_TYPE, ERROR_TYPE_PATTERNS, SEVERITIES
+from .trigram import TrigramIndex, regex_literals
+
+# Default memory budget of a store
+DEFAULT_STORE_BYTES = 64 * 1024 * 1024
+
+# Fixed bytes per row: timestamp, line number, text offset, per-file row id,
+# file id and three codes
+ROW_BYTES = 8 + 8 + 8 + 8 + 4 + 3
+
+# Fraction of the memory budget kept after an eviction
+EVICTION_TARGET = 0.9
+
+SEVERITY_CODES = {name: code for code, name in enumerate(SEVERITIES)}
+
+# Error type code 0 means no error type
+ERROR_TYPES: List[Optional[str]] = (
+    [None] + [n for n, _ in ERROR_TYPE_PATTERNS] + [CUSTOM_ERROR_TYPE]
+)
+ERROR_TYPE_CODES = {name: code for code, name in enumerate(ERROR_TYPES)}
+
+# Row flags
+FLAG_ERROR = 1
+FLAG_WARNING = 2
+FLAG_RETIRED = 4
+# Line continuing a multi-line event, such as a traceback frame
+FLAG_CONTINUATION = 8
+
+MINUTE_MICROS = 60 * 1_000_000
+
+# Rows per text index block; the trigram index points at blocks, not rows
+BLOCK_ROWS = 64
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(timestamp: datetime) -> int:
+    """Convert a naive timestamp to int64 microseconds."""
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    """Convert int64 microseconds back to a naive timestamp."""
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _table(predicate) -> bytes:
+    """Translation table mapping each byte value to 1 if it satisfies predicate."""
+    return bytes(1 if predicate(value) else 0 for value in range(256))
+
+
+def _and_masks(a: bytes, b: bytes) -> bytes:
+    """Bytewise AND of two 0/1 masks of equal length."""
+    if not a:
+        return a
+    return (int.from_bytes(a, "little") & int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+_LIVE = _table(lambda flags: not flags & FLAG_RETIRED)
+_LIVE_ERRORS = _table(lambda flags: flags & FLAG_ERROR and not flags & FLAG_RETIRED)
+_LIVE_WARNINGS = _table(lambda flags: flags & FLAG_WARNING and not flags & FLAG_RETIRED)
+
+
+class LogRecord:
+    """A single stored log line."""
+
+    __slots__ = (
+        "row_id",
+        "file_path",
+        "line_number",
+        "content",
+        "timestamp",
+        "severity",
+        "error_type",
+    )
+
+    def __init__(
+        self,
+        row_id: int,
+        file_path: str,
+        line_number: int,
+        content: str,
+        timestamp: datetime,
+        severity: str,
+        error_type: Optional[str],
+    ):
+        self.row_id = row_id
+        self.file_path = file_path
+        self.line_number = line_number
+        self.content = content
+        self.timestamp = timestamp
+        self.severity = severity
+        self.error_type = error_type
+
+    @property
+    def is_error(self) -> bool:
+        """Check if this log line represents an error."""
+        return self.severity in ["error", "critical"] or self.error_type is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "file_path": self.file_path,
+            "line_number": self.line_number,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "severity": self.severity,
+            "error_type": self.error_type,
+            "is_error": self.is_error,
+        }
+
+
+class TimeIndex:
+    """Per-minute buckets of row ids over the whole store.
+
+    Bucket keys are kept in a sorted list, so a time window is located with two
+    bisections and only the rows of the first and last bucket are checked
+    against the exact bounds.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, array] = {}
+        self.minutes: List[int] = []
+        self.entry_count = 0
+
+    def add(self, row_id: int, micros: int) -> None:
+        minute = micros // MINUTE_MICROS
+        bucket = self.buckets.get(minute)
+        if bucket is None:
+            bucket = self.buckets[minute] = array("q")
+            if not self.minutes or minute > self.minutes[-1]:
+                self.minutes.append(minute)
+            else:
+                insort(self.minutes, minute)
+        bucket.append(row_id)
+        self.entry_count += 1
+
+    def discard_before(self, row_id: int) -> None:
+        """Drop row ids lower than row_id from every bucket."""
+        for minute in list(self.minutes):
+            bucket = self.buckets[minute]
+            cut = bisect_left(bucket, row_id)
+            self.entry_count -= cut
+            if cut == len(bucket):
+                del self.buckets[minute]
+            elif cut:
+                del bucket[:cut]
+        if len(self.buckets) != len(self.minutes):
+            self.minutes = [minute for minute in self.minutes if minute in self.buckets]
+
+    @property
+    def memory_size(self) -> int:
+        """Approximate bytes held by the buckets."""
+        return self.entry_count * 8 + len(self.buckets) * 120
+
+    def candidates(self, start_micros: int, end_micros: int) -> Tuple[List[int], List[array]]:
+        """Return (minutes, buckets) overlapping [start_micros, end_micros)."""
+        lo = bisect_left(self.minutes, start_micros // MINUTE_MICROS)
+        hi = bisect_left(self.minutes, -(-end_micros // MINUTE_MICROS))
+        minutes = self.minutes[lo:hi]
+        return minutes, [self.buckets[minute] for minute in minutes]
+
+
+class LogStore:
+    """Append-only columnar store of log lines, bounded by memory."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_STORE_BYTES,
+        max_rows: Optional[int] = None,
+        max_age: Optional[timedelta] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.timestamps = array("q")
+        self.line_numbers = array("q")
+        self.offsets = array("q")
+        self.file_ids = array("l")
+        self.severities = array("B")
+        self.error_types = array("B")
+        self.flags = array("B")
+        self.arena = bytearray()
+        self.arena_base = 0
+        self.first_id = 0
+        self.files: List[str] = []
+        self.file_index: Dict[str, int] = {}
+        self.file_rows: Dict[int, array] = {}
+        self.time_index = TimeIndex()
+        self.text_index = TrigramIndex(words_only=True)
+        self.indexed_until = 0
+        self.evicted_rows = 0
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def next_id(self) -> int:
+        """Row id that the next appended line will get."""
+        return self.first_id + len(self.timestamps)
+
+    @property
+    def memory_size(self) -> int:
+        """Bytes held by the columns, the text arena and the indexes."""
+        return (
+            len(self.timestamps) * ROW_BYTES
+            + len(self.arena)
+            + self.text_index.memory_size
+            + self.time_index.memory_size
+        )
+
+    def intern_file(self, path: str) -> int:
+        """Return the id of a file path, assigning one if needed."""
+        file_id = self.file_index.get(path)
+        if file_id is None:
+            file_id = self.file_index[path] = len(self.files)
+            self.files.append(path)
+            self.file_rows[file_id] = array("q")
+        return file_id
+
+    def retire_file(self, path: str) -> int:
+        """Hide all stored lines of a file, e.g. after it was truncated.
+
+        Later lines of the same path get a new file id. Returns the number of
+        rows hidden.
+        """
+        with self.lock:
+            file_id = self.file_index.pop(path, None)
+            if file_id is None:
+                return 0
+            rows = self.file_rows.pop(file_id, array("q"))
+            first_id = self.first_id
+            flags = self.flags
+            for row_id in rows:
+                flags[row_id - first_id] |= FLAG_RETIRED
+            return len(rows)
+
+    def append(
+        self,
+        file_id: int,
+        line_number: int,
+        timestamp: datetime,
+        severity: str,
+        error_type: Optional[str],
+        content: str,
+        continuation: bool = False,
+    ) -> int:
+        """Store a log line and return its row id.
+
+        Continuation lines are never flagged as errors or warnings, so a
+        multi-line event counts once.
+        """
+        with self.lock:
+            row_id = self.next_id
+            severity_code = SEVERITY_CODES[severity]
+            error_code = ERROR_TYPE_CODES[error_type]
+            if continuation:
+                flags = FLAG_CONTINUATION
+            elif severity_code >= SEVERITY_CODES["error"] or error_code:
+                flags = FLAG_ERROR
+            elif severity_code == SEVERITY_CODES["warning"]:
+                flags = FLAG_WARNING
+            else:
+                flags = 0
+            micros = to_micros(timestamp)
+            self.timestamps.append(micros)
+            self.line_numbers.append(line_number)
+            self.offsets.append(self.arena_base + len(self.arena))
+            self.file_ids.append(file_id)
+            self.severities.append(severity_code)
+            self.error_types.append(error_code)
+            self.flags.append(flags)
+            self.arena += content.encode("utf-8")
+            self.arena += b"\n"
+            self.file_rows[file_id].append(row_id)
+            self.time_index.add(row_id, micros)
+            if self.memory_size > self.max_bytes:
+                self._evict()
+            return row_id
+
+    def _evict(self) -> None:
+        """Drop the oldest rows until the store is back under its target size."""
+        target = self.max_bytes * EVICTION_TARGET
+        excess = self.memory_size - target
+        count = 0
+        size = len(self.timestamps)
+        while count < size - 1 and excess > 0:
+            excess -= ROW_BYTES + self._text_end(count) - self._text_start(count)
+            count += 1
+        if count:
+            self.discard_before(self.first_id + count)
+
+    def enforce_retention(self, now: Optional[datetime] = None) -> int:
+        """Drop the oldest rows beyond max_rows or older than max_age.
+
+        Rows are dropped from the oldest end only, so a row is kept while any
+        row stored before it is kept. Returns the number of rows dropped.
+        """
+        with self.lock:
+            cut = self.first_id
+            if self.max_rows is not None:
+                cut = max(cut, self.next_id - self.max_rows)
+            if self.max_age is not None:
+                cutoff = to_micros((now or datetime.now()) - self.max_age)
+                timestamps = self.timestamps
+                index = cut - self.first_id
+                while index < len(timestamps) and timestamps[index] < cutoff:
+                    index += 1
+                cut = self.first_id + index
+            return self.discard_before(cut)
+
+    def discard_before(self, row_id: int) -> int:
+        """Drop every row with an id lower than row_id; returns the number dropped."""
+        with self.lock:
+            count = min(max(row_id - self.first_id, 0), len(self.timestamps))
+            if not count:
+                return 0
+            cut = self._text_end(count - 1) + 1 - self.arena_base
+            del self.arena[:cut]
+            self.arena_base += cut
+            for column in (
+                self.timestamps,
+                self.line_numbers,
+                self.offsets,
+                self.file_ids,
+                self.severities,
+                self.error_types,
+                self.flags,
+            ):
+                del column[:count]
+            self.first_id += count
+            for rows in self.file_rows.values():
+                drop = bisect_left(rows, self.first_id)
+                if drop:
+                    del rows[:drop]
+            self.time_index.discard_before(self.first_id)
+            self.text_index.discard_before(self.first_id // BLOCK_ROWS)
+            self.indexed_until = max(self.indexed_until, self.first_id // BLOCK_ROWS * BLOCK_ROWS)
+            self.evicted_rows += count
+            return count
+
+    def _text_start(self, index: int) -> int:
+        return self.offsets[index]
+
+    def _text_end(self, index: int) -> int:
+        # Each line is followed by a newline in the arena
+        if index + 1 < len(self.offsets):
+            return self.offsets[index + 1] - 1
+        return self.arena_base + len(self.arena) - 1
+
+    def content(self, row_id: int) -> str:
+        index = row_id - self.first_id
+        start = self._text_start(index) - self.arena_base
+        end = self._text_end(index) - self.arena_base
+        return self.arena[start:end].decode("utf-8", errors="replace")
+
+    def record(self, row_id: int) -> LogRecord:
+        """Materialize a stored row."""
+        with self.lock:
+            index = row_id - self.first_id
+            if not 0 <= index < len(self.timestamps):
+                raise IndexError(f"Row {row_id} is not in the store")
+            return LogRecord(
+                row_id,
+                self.files[self.file_ids[index]],
+                self.line_numbers[index],
+                self.content(row_id),
+                from_micros(self.timestamps[index]),
+                SEVERITIES[self.severities[index]],
+                ERROR_TYPES[self.error_types[index]],
+            )
+
+    def records(self, row_ids: Iterable[int]) -> List[LogRecord]:
+        with self.lock:
+            return [self.record(row_id) for row_id in row_ids]
+
+    def _tables(
+        self,
+        errors_only: bool = False,
+        warnings_only: bool = False,
+        min_severity: Optional[str] = None,
+        severities: Optional[Iterable[str]] = None,
+        error_types: Optional[Iterable[Optional[str]]] = None,
+    ) -> List[Tuple[array, bytes]]:
+        """Return (column, translation table) pairs implementing the code filters."""
+        if errors_only:
+            tables = [(self.flags, _LIVE_ERRORS)]
+        elif warnings_only:
+            tables = [(self.flags, _LIVE_WARNINGS)]
+        else:
+            tables = [(self.flags, _LIVE)]
+
+        if min_severity is not None or severities is not None:
+            allowed: Set[int] = set(range(256))
+            if min_severity is not None:
+                allowed &= set(range(SEVERITY_CODES[min_severity], len(SEVERITIES)))
+            if severities is not None:
+                allowed &= {SEVERITY_CODES[s] for s in severities}
+            tables.append((self.severities, _table(allowed.__contains__)))
+
+        if error_types is not None:
+            codes = {ERROR_TYPE_CODES[t] for t in error_types if t in ERROR_TYPE_CODES}
+            tables.append((self.error_types, _table(codes.__contains__)))
+        return tables
+
+    def _mask(
+        self,
+        start_id: Optional[int] = None,
+        end_id: Optional[int] = None,
+        file_ids: Optional[Iterable[int]] = None,
+        **filters: Any,
+    ) -> Tuple[int, int, bytes]:
+        """Return (lo, hi, mask) where mask flags the matching rows in [lo, hi)."""
+        with self.lock:
+            lo = max(start_id if start_id is not None else self.first_id, self.first_id)
+            hi = min(end_id if end_id is not None else self.next_id, self.next_id)
+            if lo >= hi:
+                return lo, lo, b""
+            a, b = lo - self.first_id, hi - self.first_id
+
+            mask = None
+            for column, table in self._tables(**filters):
+                column_mask = column[a:b].tobytes().translate(table)
+                mask = column_mask if mask is None else _and_masks(mask, column_mask)
+
+            if file_ids is not None:
+                file_mask = bytearray(b - a)
+                for file_id in file_ids:
+                    rows = self.file_rows.get(file_id)
+                    if not rows:
+                        continue
+                    for row_id in rows[bisect_left(rows, lo) : bisect_left(rows, hi)]:
+                        file_mask[row_id - lo] = 1
+                mask = _and_masks(mask, bytes(file_mask))
+
+            return lo, hi, mask
+
+    def select(
+        self, row_ids: Iterable[int], file_ids: Optional[Iterable[int]] = None, **filters: Any
+    ) -> List[int]:
+        """Return the given live row ids that pass the filters, checking row by row.
+
+        Cheaper than rows() when the candidates are few compared to the store.
+        """
+        with self.lock:
+            first_id = self.first_id
+            size = len(self.timestamps)
+            tables = self._tables(**filters)
+            wanted = set(file_ids) if file_ids is not None else None
+            result = []
+            for row_id in row_ids:
+                index = row_id - first_id
+                if not 0 <= index < size:
+                    continue
+                if wanted is not None and self.file_ids[index] not in wanted:
+                    continue
+                if all(table[column[index]] for column, table in tables):
+                    result.append(row_id)
+            return result
+
+    def rows(self, reverse: bool = False, **filters: Any) -> Iterator[int]:
+        """Yield live row ids in [start_id, end_id) that pass every filter.
+
+        Filters: errors_only, warnings_only, min_severity, severities,
+        error_types and file_ids.
+        """
+        lo, hi, mask = self._mask(**filters)
+        ids = range(lo, hi)
+        if reverse:
+            return compress(reversed(ids), mask[::-1])
+        return compress(ids, mask)
+
+    def time_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        reverse: bool = False,
+        **filters: Any,
+    ) -> List[int]:
+        """Return ids of matching rows with start <= timestamp < end.
+
+        Rows are ordered by minute, then by row id. Uses the per-minute index, so
+        the cost is O(log n + k) in the number of rows k inside the window.
+        """
+        with self.lock:
+            start_micros = to_micros(start) if start is not None else -(2**62)
+            end_micros = to_micros(end) if end is not None else 2**62
+            minutes, buckets = self.time_index.candidates(start_micros, end_micros)
+            first_id = self.first_id
+            timestamps = self.timestamps
+            row_ids: List[int] = []
+            last = len(minutes) - 1
+            for position, bucket in enumerate(buckets):
+                minute_start = minutes[position] * MINUTE_MICROS
+                if (position == 0 and minute_start < start_micros) or (
+                    position == last and minute_start + MINUTE_MICROS > end_micros
+                ):
+                    # Boundary bucket: check each row against the exact bounds
+                    row_ids.extend(
+                        row_id
+                        for row_id in bucket
+                        if start_micros <= timestamps[row_id - first_id] < end_micros
+                    )
+                else:
+                    row_ids.extend(bucket)
+
+            row_ids = self.select(row_ids, **filters)
+            if reverse:
+                row_ids.reverse()
+            return row_ids
+
+    def index_pending(self) -> int:
+        """Add every complete block of rows not yet in the text index.
+
+        Returns the number of blocks indexed. Rows of the last, incomplete block
+        are left to be scanned directly by search().
+        """
+        with self.lock:
+            end = self.next_id // BLOCK_ROWS * BLOCK_ROWS
+            start = max(self.indexed_until, self.first_id)
+            blocks = 0
+            while start < end:
+                block_end = start - start % BLOCK_ROWS + BLOCK_ROWS
+                a, b = self._arena_span(start, block_end)
+                self.text_index.add(
+                    start // BLOCK_ROWS, self.arena[a:b].decode("utf-8", errors="replace")
+                )
+                start = block_end
+                blocks += 1
+            self.indexed_until = max(self.indexed_until, end)
+            return blocks
+
+    def _arena_span(self, lo: int, hi: int) -> Tuple[int, int]:
+        """Arena positions covering the text of rows [lo, hi)."""
+        return (
+            self._text_start(lo - self.first_id) - self.arena_base,
+            self._text_end(hi - 1 - self.first_id) - self.arena_base,
+        )
+
+    def _scan_bytes(self, lo: int, hi: int, needle: bytes, case_sensitive: bool) -> List[int]:
+        """Ids of rows in [lo, hi) containing needle, found with bytes.find over the arena."""
+        if not needle:
+            return list(range(lo, hi))
+        a, b = self._arena_span(lo, hi)
+        haystack = bytes(self.arena[a:b])
+        if not case_sensitive:
+            haystack = haystack.lower()
+        offsets = self.offsets
+        base = self.arena_base + a
+        first_id = self.first_id
+        rows = []
+        pos = haystack.find(needle)
+        while pos >= 0:
+            index = bisect_right(offsets, base + pos, lo - first_id, hi - first_id) - 1
+            row_end = self._text_end(index) - base
+            if pos + len(needle) <= row_end:
+                rows.append(index + first_id)
+                pos = haystack.find(needle, row_end + 1)
+            else:
+                # The occurrence spans two lines
+                pos = haystack.find(needle, pos + 1)
+        return rows
+
+    def _scan_rows(self, lo: int, hi: int, matches: Callable[[str], bool]) -> List[int]:
+        """Ids of rows in [lo, hi) whose text satisfies matches."""
+        a, b = self._arena_span(lo, hi)
+        # A block without any match as a whole cannot have matching rows
+        if not matches(self.arena[a:b].decode("utf-8", errors="replace")):
+            return []
+        return [row_id for row_id in range(lo, hi) if matches(self.content(row_id))]
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        offset: int = 0,
+        limit: int = 20,
+        **filters: Any,
+    ) -> Tuple[int, List[LogRecord]]:
+        """Find stored lines containing a substring or matching a regex, newest first.
+
+        The trigram index selects candidate blocks, which are then scanned. Accepts
+        the same filters as rows(). Returns (total matches, records of the
+        requested page). Raises re.error for an invalid regex.
+        """
+        if regex:
+            compiled = re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+            literals = regex_literals(query)
+
+            def scan(lo: int, hi: int) -> List[int]:
+                return self._scan_rows(lo, hi, lambda text: compiled.search(text) is not None)
+
+        elif case_sensitive or query.isascii():
+            literals = [query]
+            needle = (query if case_sensitive else query.lower()).encode("utf-8")
+
+            def scan(lo: int, hi: int) -> List[int]:
+                return self._scan_bytes(lo, hi, needle, case_sensitive)
+
+        else:
+            # bytes.lower() only folds ASCII, so compare decoded text instead
+            literals = [query]
+            lowered = query.lower()
+
+            def scan(lo: int, hi: int) -> List[int]:
+                return self._scan_rows(lo, hi, lambda text: lowered in text.lower())
+
+        with self.lock:
+            self.index_pending()
+            first_id, next_id = self.first_id, self.next_id
+            blocks = self.text_index.candidates(literals)
+            if blocks is None:
+                ranges = [(first_id, next_id)]
+            else:
+                # The unindexed tail first, then candidate blocks, newest first
+                ranges = [(max(self.indexed_until, first_id), next_id)]
+                for block in reversed(blocks):
+                    start = block * BLOCK_ROWS
+                    ranges.append((max(start, first_id), min(start + BLOCK_ROWS, next_id)))
+
+            matched: List[int] = []
+            for lo, hi in ranges:
+                if lo < hi:
+                    matched.extend(reversed(scan(lo, hi)))
+            matched = self.select(matched, **filters)
+            return len(matched), self.records(matched[offset : offset + limit])
+
+    def latest(self, limit: int, **filters: Any) -> List[LogRecord]:
+        """Return up to limit of the most recently stored matching rows, newest first."""
+        with self.lock:
+            row_ids = []
+            for row_id in self.rows(reverse=True, **filters):
+                row_ids.append(row_id)
+                if len(row_ids) >= limit:
+                    break
+            return self.records(row_ids)
+
+    def count(self, **filters: Any) -> int:
+        """Count live rows that pass the filters."""
+        return self._mask(**filters)[2].count(1)
+
+    def file_id(self, path: str) -> Optional[int]:
+        return self.file_index.get(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return row counts and memory usage."""
+        with self.lock:
+            return {
+                "rows": len(self.timestamps),
+                "files": len(self.file_index),
+                "memory_bytes": self.memory_size,
+                "text_index_bytes": self.text_index.memory_size,
+                "time_index_bytes": self.time_index.memory_size,
+                "max_bytes": self.max_bytes,
+                "max_rows": self.max_rows,
+                "max_age_seconds": self.max_age.total_seconds() if self.max_age else None,
+                "evicted_rows": self.evicted_rows,
+            }
@@ -0,0 +1,196 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Fan-out of newly ingested log lines to live subscribers.
+
+Each subscriber has a filter (minimum level, file pattern, error type, regex)
+that is applied when lines are published, so only matching lines are buffered.
+Buffers are bounded. A batch larger than the buffer keeps only its newest
+lines, and the skipped ones are counted. A subscriber whose buffer is still
+full when the next lines arrive has not read what it had, so it cannot keep up
+with the stream: it is dropped instead of holding lines in memory or slowing
+down ingestion, and its stream ends with a notice.
+
+Lines are published from the ingestion thread; subscribers are read from the
+event loop they subscribed on.
+"""
+
+import asyncio
+import re
+import threading
+from collections import deque
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from .log_store import SEVERITY_CODES, LogRecord
+
+# Lines buffered per subscriber
+SUBSCRIBER_BUFFER = 1000
+
+# Largest buffer a subscriber may ask for
+MAX_SUBSCRIBER_BUFFER = 10_000
+
+
+class TailFilter:
+    """Conditions a line must meet to be streamed to a subscriber."""
+
+    def __init__(
+        self,
+        level: Optional[str] = None,
+        file_pattern: Optional[str] = None,
+        error_type: Optional[str] = None,
+        regex: Optional[str] = None,
+    ):
+        """Raises ValueError for an unknown level and re.error for an invalid regex."""
+        if level is not None and level.lower() not in SEVERITY_CODES:
+            raise ValueError(f"Unknown level '{level}'")
+        self.level = level.lower() if level else None
+        self.file_pattern = file_pattern
+        self.error_type = error_type
+        self.regex = re.compile(regex) if regex else None
+
+    def matches(self, record: LogRecord) -> bool:
+        if self.level and SEVERITY_CODES[record.severity] < SEVERITY_CODES[self.level]:
+            return False
+        if self.error_type is not None and record.error_type != self.error_type:
+            return False
+        if self.file_pattern and not (
+            self.file_pattern in record.file_path
+            or fnmatch(record.file_path, self.file_pattern)
+            or fnmatch(Path(record.file_path).name, self.file_pattern)
+        ):
+            return False
+        return self.regex is None or self.regex.search(record.content) is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "level": self.level,
+            "file": self.file_pattern,
+            "error_type": self.error_type,
+            "regex": self.regex.pattern if self.regex else None,
+        }
+
+
+class TailSubscriber:
+    """Bounded buffer of the lines matching one subscriber's filter."""
+
+    def __init__(
+        self,
+        tail_filter: TailFilter,
+        buffer_size: int = SUBSCRIBER_BUFFER,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.filter = tail_filter
+        self.buffer_size = min(max(buffer_size, 1), MAX_SUBSCRIBER_BUFFER)
+        self.dropped = False
+        self.closed = False
+        self.sent = 0
+        # Lines left out because a batch did not fit in the buffer
+        self.skipped = 0
+        self._buffer: Deque[LogRecord] = deque(maxlen=self.buffer_size)
+        self._lock = threading.Lock()
+        self._loop = loop or asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def offer(self, records: Iterable[LogRecord]) -> bool:
+        """Buffer the matching records; returns False once the subscriber is dropped."""
+        with self._lock:
+            if self.dropped or self.closed:
+                return False
+            matching = [record for record in records if self.filter.matches(record)]
+            if not matching:
+                return True
+            if len(self._buffer) == self.buffer_size:
+                # Still full since the last lines: too slow to keep up, so free
+                # its lines and end its stream
+                self.dropped = True
+                self._buffer.clear()
+            else:
+                # The buffer keeps the newest lines of a batch larger than it
+                self.skipped += max(len(self._buffer) + len(matching) - self.buffer_size, 0)
+                self._buffer.extend(matching)
+        self._wake()
+        return not self.dropped
+
+    def close(self) -> None:
+        """End the stream without marking the subscriber as dropped."""
+        with self._lock:
+            self.closed = True
+            self._buffer.clear()
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The event loop of the subscriber is closed
+            self.closed = True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[List[LogRecord]]:
+        """Wait for buffered lines and take them all.
+
+        Returns an empty list when timeout expires first, and None once the
+        subscriber was dropped or closed.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        with self._lock:
+            self._ready.clear()
+            if self.dropped or self.closed:
+                return None
+            records = list(self._buffer)
+            self._buffer.clear()
+        self.sent += len(records)
+        return records
+
+
+class LogBroadcaster:
+    """Publishes ingested lines to the current subscribers."""
+
+    def __init__(self):
+        self.subscribers: List[TailSubscriber] = []
+        self.published = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, tail_filter: TailFilter, buffer_size: int = SUBSCRIBER_BUFFER
+    ) -> TailSubscriber:
+        """Add a subscriber; must be called from the event loop that will read it."""
+        subscriber = TailSubscriber(tail_filter, buffer_size)
+        with self._lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: TailSubscriber) -> None:
+        subscriber.close()
+        with self._lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def publish(self, records: List[LogRecord]) -> None:
+        """Offer records to every subscriber, removing the ones that fell behind."""
+        with self._lock:
+            subscribers = list(self.subscribers)
+        if not subscribers or not records:
+            return
+        self.published += len(records)
+        behind = [subscriber for subscriber in subscribers if not subscriber.offer(records)]
+        if behind:
+            with self._lock:
+                for subscriber in behind:
+                    if subscriber in self.subscribers:
+                        self.subscribers.remove(subscriber)
+                        self.dropped += subscriber.dropped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self.subscribers),
+                "published_lines": self.published,
+                "dropped_subscribers": self.dropped,
+            }
@@ -0,0 +1,513 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Incremental log tailing with persisted byte-offset checkpoints.
+
+Each log file is tracked by its inode rather than its path, so a file that is
+renamed by log rotation keeps its offset. A checkpoint also stores a hash of the
+first bytes of the file, which detects truncation and inode reuse. Checkpoints
+are saved as JSON so a restarted monitor only reads bytes it has not seen.
+
+Compressed rotated segments are never appended to, so instead of an offset they
+are recorded by checksum once they have been indexed.
+
+While reading, a checkpoint also records the byte offset of every
+LINE_MARK_INTERVAL-th line. These sparse marks let context() read the lines
+around any line number by seeking close to it, however large the file is.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .log_rotation import file_checksum
+
+# Number of leading bytes hashed to recognise a file
+FINGERPRINT_BYTES = 256
+
+# Size of each read while consuming newly appended data
+READ_BLOCK_SIZE = 1024 * 1024
+
+# An unterminated last line is consumed once the file has been idle this long
+PARTIAL_LINE_GRACE = 1.0
+
+# Lines between two recorded line offsets
+LINE_MARK_INTERVAL = 1000
+
+
+def _inode_key(st: os.stat_result) -> str:
+    return f"{st.st_dev}:{st.st_ino}"
+
+
+def _fingerprint(f, length: int) -> str:
+    f.seek(0)
+    return hashlib.blake2b(f.read(length), digest_size=8).hexdigest()
+
+
+class FileCheckpoint:
+    """Read position of a single log file."""
+
+    def __init__(
+        self,
+        key: str,
+        path: str,
+        offset: int = 0,
+        line: int = 0,
+        fingerprint: str = "",
+        fingerprint_length: int = 0,
+        stats: Optional[Dict[str, int]] = None,
+        marks: Optional[List[int]] = None,
+    ):
+        self.key = key
+        self.path = path
+        self.offset = offset
+        self.line = line
+        self.fingerprint = fingerprint
+        self.fingerprint_length = fingerprint_length
+        self.stats: Dict[str, int] = stats or {}
+        # Byte offsets of lines 1, 1 + interval, 1 + 2 * interval, ...
+        self.marks: List[int] = marks or []
+
+    def reset(self) -> None:
+        """Start reading the file again from the beginning."""
+        self.offset = 0
+        self.line = 0
+        self.fingerprint = ""
+        self.fingerprint_length = 0
+        self.stats = {}
+        self.marks = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "path": self.path,
+            "offset": self.offset,
+            "line": self.line,
+            "fingerprint": self.fingerprint,
+            "fingerprint_length": self.fingerprint_length,
+            "stats": self.stats,
+            "marks": self.marks,
+        }
+
+    @classmethod
+    def from_dict(cls, key: str, data: Dict[str, Any]) -> "FileCheckpoint":
+        return cls(
+            key,
+            data["path"],
+            data.get("offset", 0),
+            data.get("line", 0),
+            data.get("fingerprint", ""),
+            data.get("fingerprint_length", 0),
+            data.get("stats"),
+            data.get("marks"),
+        )
+
+
+class LogChunk:
+    """Lines appended to a log file since the previous read.
+
+    lines is None when the chunk was read without loading its lines; the byte
+    range and line_count still describe the consumed data.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        start_offset: int,
+        end_offset: int,
+        first_line: int,
+        lines: Optional[List[str]],
+        truncated: bool = False,
+        rotated: bool = False,
+        line_count: int = 0,
+    ):
+        self.path = path
+        self.start_offset = start_offset
+        self.end_offset = end_offset
+        self.first_line = first_line
+        self.lines = lines
+        self.line_count = len(lines) if lines is not None else line_count
+        self.truncated = truncated
+        self.rotated = rotated
+
+    @property
+    def reset(self) -> bool:
+        """Check if previously read data for this path is no longer valid."""
+        return self.truncated or self.rotated
+
+    def numbered_lines(self) -> Iterable[Tuple[int, str]]:
+        """Yield (line_number, line) pairs, numbered from 1 within the file."""
+        return enumerate(self.lines, self.first_line)
+
+
+class LogTailer:
+    """Reads only the newly appended lines of log files."""
+
+    def __init__(
+        self,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        mark_interval: int = LINE_MARK_INTERVAL,
+    ):
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.mark_interval = mark_interval
+        self.checkpoints: Dict[str, FileCheckpoint] = {}
+        self.paths: Dict[str, str] = {}
+        self.segments: Dict[str, Dict[str, Any]] = {}
+        self.bytes_read = 0
+        self._checksums: Dict[Tuple[str, int, int], str] = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return
+        try:
+            data = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for key, value in data.get("files", {}).items():
+            checkpoint = FileCheckpoint.from_dict(key, value)
+            if data.get("mark_interval") != self.mark_interval:
+                checkpoint.marks = []
+            self.checkpoints[key] = checkpoint
+            self.paths[checkpoint.path] = key
+        self.segments = data.get("segments", {})
+
+    def save(self) -> None:
+        """Atomically write the checkpoints if they changed since the last save."""
+        with self._lock:
+            if self.checkpoint_path is None or not self._dirty:
+                return
+            data = {
+                "version": 1,
+                "mark_interval": self.mark_interval,
+                "files": {key: cp.to_dict() for key, cp in self.checkpoints.items()},
+                "segments": dict(self.segments),
+            }
+            self._dirty = False
+
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.checkpoint_path.parent, prefix=f".{self.checkpoint_path.name}."
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def checkpoint(self, path: Union[str, Path]) -> Optional[FileCheckpoint]:
+        """Return the checkpoint currently associated with a path."""
+        key = self.paths.get(str(path))
+        return self.checkpoints.get(key) if key else None
+
+    def segment_checksum(self, path: Union[str, Path]) -> str:
+        """Return the checksum of a compressed segment, hashing it once per version."""
+        st = os.stat(path)
+        version = (_inode_key(st), st.st_size, st.st_mtime_ns)
+        checksum = self._checksums.get(version)
+        if checksum is None:
+            checksum = file_checksum(path)
+            self._checksums[version] = checksum
+        return checksum
+
+    def segment(self, checksum: str) -> Optional[Dict[str, Any]]:
+        """Return the record of an indexed compressed segment."""
+        return self.segments.get(checksum)
+
+    def add_segment(
+        self, checksum: str, path: Union[str, Path], lines: int, stats: Dict[str, int]
+    ) -> None:
+        """Record a compressed segment as indexed."""
+        with self._lock:
+            self.segments[checksum] = {"path": str(path), "lines": lines, "stats": stats}
+            self._dirty = True
+
+    def move_segment(self, checksum: str, path: Union[str, Path]) -> None:
+        """Follow an indexed segment that was renamed by a later rotation."""
+        with self._lock:
+            record = self.segments.get(checksum)
+            if record is not None and record["path"] != str(path):
+                record["path"] = str(path)
+                self._dirty = True
+
+    def match_prefix(self, prefix: bytes) -> Optional[FileCheckpoint]:
+        """Find the checkpoint of a tracked file whose contents start with prefix.
+
+        Used to recognise a rotated file that reappears compressed; the longest
+        read checkpoint wins.
+        """
+        best = None
+        with self._lock:
+            for checkpoint in self.checkpoints.values():
+                length = checkpoint.fingerprint_length
+                if not length or length > len(prefix) or not checkpoint.offset:
+                    continue
+                digest = hashlib.blake2b(prefix[:length], digest_size=8).hexdigest()
+                if digest == checkpoint.fingerprint and (
+                    best is None or checkpoint.offset > best.offset
+                ):
+                    best = checkpoint
+        return best
+
+    def forget_missing(self, paths: Iterable[Union[str, Path]]) -> List[str]:
+        """Drop checkpoints of files, and records of segments, that are no longer present.
+
+        Returns the paths whose checkpoints were removed.
+        """
+        paths = [str(path) for path in paths]
+        live = set()
+        for path in paths:
+            try:
+                live.add(_inode_key(os.stat(path)))
+            except OSError:
+                continue
+        present = set(paths)
+        removed = []
+        with self._lock:
+            for checksum in list(self.segments):
+                if self.segments[checksum]["path"] not in present:
+                    del self.segments[checksum]
+                    self._dirty = True
+            for key in list(self.checkpoints):
+                if key not in live:
+                    checkpoint = self.checkpoints.pop(key)
+                    if self.paths.get(checkpoint.path) == key:
+                        del self.paths[checkpoint.path]
+                    removed.append(checkpoint.path)
+                    self._dirty = True
+        return removed
+
+    def pending_bytes(self, path: Union[str, Path]) -> int:
+        """Return the number of bytes past the checkpoint of a file, or 0 if it is missing."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        with self._lock:
+            checkpoint = self.checkpoints.get(_inode_key(st))
+            offset = checkpoint.offset if checkpoint else 0
+        return st.st_size - offset if st.st_size >= offset else st.st_size
+
+    def read(self, path: Union[str, Path], load_lines: bool = True) -> LogChunk:
+        """Read the complete lines appended to a file since the last call.
+
+        Truncated files and files replaced at the same path are read again from
+        the start, which is reported on the returned chunk. With load_lines
+        False the lines are only counted, for callers that parse the byte range
+        elsewhere.
+        """
+        path = str(path)
+        with self._lock, open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            key = _inode_key(st)
+            truncated = rotated = False
+
+            previous_key = self.paths.get(path)
+            if previous_key is not None and previous_key != key:
+                # A new file now lives at this path; the old one was rotated away
+                rotated = True
+
+            checkpoint = self.checkpoints.get(key)
+            if checkpoint is None:
+                checkpoint = FileCheckpoint(key, path)
+                self.checkpoints[key] = checkpoint
+            elif checkpoint.path != path:
+                # The file was renamed; keep reading it under its new name
+                if self.paths.get(checkpoint.path) == key:
+                    del self.paths[checkpoint.path]
+                checkpoint.path = path
+            self.paths[path] = key
+
+            if checkpoint.offset:
+                if st.st_size < checkpoint.offset or (
+                    _fingerprint(f, checkpoint.fingerprint_length) != checkpoint.fingerprint
+                ):
+                    truncated = True
+                    checkpoint.reset()
+
+            if checkpoint.fingerprint_length < FINGERPRINT_BYTES and st.st_size:
+                checkpoint.fingerprint_length = min(st.st_size, FINGERPRINT_BYTES)
+                checkpoint.fingerprint = _fingerprint(f, checkpoint.fingerprint_length)
+
+            start_offset = checkpoint.offset
+            first_line = checkpoint.line + 1
+            idle = time.time() - st.st_mtime >= PARTIAL_LINE_GRACE
+            if first_line == len(checkpoint.marks) * self.mark_interval + 1:
+                checkpoint.marks.append(start_offset)
+            if load_lines:
+                lines, consumed = self._read_lines(f, checkpoint, st.st_size, idle)
+                line_count = len(lines)
+            else:
+                lines = None
+                line_count, consumed = self._count_lines(f, checkpoint, st.st_size, idle)
+
+            checkpoint.offset += consumed
+            checkpoint.line += line_count
+            self.bytes_read += consumed
+            if consumed or truncated or rotated or previous_key is None:
+                self._dirty = True
+
+            return LogChunk(
+                path,
+                start_offset,
+                checkpoint.offset,
+                first_line,
+                lines,
+                truncated=truncated,
+                rotated=rotated,
+                line_count=line_count,
+            )
+
+    def _mark_lines(
+        self,
+        checkpoint: FileCheckpoint,
+        block: bytes,
+        offset: int,
+        line: int,
+        newlines: Optional[int] = None,
+    ) -> None:
+        """Record the offsets of marked lines starting after the newlines of a block.
+
+        The block is read from offset, inside line number line. Marks are only
+        added in order, so a checkpoint restored without them stays without.
+        """
+        interval = self.mark_interval
+        if newlines is None:
+            newlines = block.count(b"\n")
+        # Index of the newline ending the line before the next mark
+        target = len(checkpoint.marks) * interval - line
+        if target < 0 or target >= newlines:
+            return
+        line_length = len(block) / newlines
+        start = seen = 0
+        while target < newlines:
+            # Count newlines up to where the target is expected, then step to it
+            needed = target - seen + 1
+            guess = min(start + int(needed * line_length), len(block))
+            found = block.count(b"\n", start, guess)
+            if found >= needed:
+                position = guess
+                for _ in range(found - needed + 1):
+                    position = block.rfind(b"\n", start, position)
+            else:
+                position = guess - 1
+                for _ in range(needed - found):
+                    position = block.find(b"\n", position + 1)
+            checkpoint.marks.append(offset + position + 1)
+            start, seen = position + 1, target + 1
+            target += interval
+
+    def _read_lines(
+        self, f, checkpoint: FileCheckpoint, size: int, include_partial: bool
+    ) -> Tuple[List[str], int]:
+        """Read lines from the checkpoint offset up to size; returns (lines, bytes consumed)."""
+        lines: List[str] = []
+        pending = b""
+        consumed = 0
+        offset = checkpoint.offset
+        f.seek(offset)
+        remaining = size - offset
+        while remaining > 0:
+            block = f.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            block = pending + block
+            cut = block.rfind(b"\n")
+            if cut < 0:
+                pending = block
+                continue
+            self._mark_lines(checkpoint, block, offset + consumed, checkpoint.line + len(lines) + 1)
+            pending = block[cut + 1 :]
+            consumed += cut + 1
+            lines.extend(block[:cut].decode("utf-8", errors="ignore").split("\n"))
+
+        if pending and include_partial:
+            consumed += len(pending)
+            lines.append(pending.decode("utf-8", errors="ignore"))
+        return lines, consumed
+
+    def _count_lines(
+        self, f, checkpoint: FileCheckpoint, size: int, include_partial: bool
+    ) -> Tuple[int, int]:
+        """Count lines from the checkpoint offset up to size; returns (lines, bytes consumed)."""
+        count = 0
+        consumed = 0
+        pending = 0
+        offset = checkpoint.offset
+        f.seek(offset)
+        remaining = size - offset
+        while remaining > 0:
+            block = f.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            newlines = block.count(b"\n")
+            if not newlines:
+                pending += len(block)
+                continue
+            self._mark_lines(
+                checkpoint,
+                block,
+                offset + consumed + pending,
+                checkpoint.line + count + 1,
+                newlines,
+            )
+            count += newlines
+            cut = block.rfind(b"\n")
+            consumed += pending + cut + 1
+            pending = len(block) - cut - 1
+
+        if pending and include_partial:
+            consumed += pending
+            count += 1
+        return count, consumed
+
+    def context(
+        self, path: Union[str, Path], line: int, before: int = 5, after: int = 5
+    ) -> List[Tuple[int, str]]:
+        """Return (line_number, line) pairs from line - before to line + after.
+
+        Reading starts at the closest marked line before them, so the cost does
+        not depend on the size of the file. Files without marks, such as ones
+        replaced since they were read, are read from the start.
+        """
+        first = max(line - before, 1)
+        last = line + after
+        with open(path, "rb") as f:
+            marks: List[int] = []
+            with self._lock:
+                checkpoint = self.checkpoints.get(_inode_key(os.fstat(f.fileno())))
+                if checkpoint is not None and (
+                    _fingerprint(f, checkpoint.fingerprint_length) == checkpoint.fingerprint
+                ):
+                    marks = checkpoint.marks[: (first - 1) // self.mark_interval + 1]
+            number = (len(marks) - 1) * self.mark_interval + 1 if marks else 1
+            f.seek(marks[-1] if marks else 0)
+
+            lines = []
+            for raw in f:
+                if number > last:
+                    break
+                if number >= first:
+                    text = raw[:-1] if raw.endswith(b"\n") else raw
+                    lines.append((number, text.decode("utf-8", errors="ignore")))
+                number += 1
+        return lines
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of tracked files and bytes read."""
+        return {
+            "tracked_files": len(self.checkpoints),
+            "indexed_segments": len(self.segments),
+            "bytes_read": self.bytes_read,
+        }
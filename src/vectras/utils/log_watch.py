@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""File system notifications for the log directory.
+
+Uses watchdog (inotify, FSEvents, ReadDirectoryChangesW) when it is installed.
+Callers should keep polling at a slower interval as a fallback, since events can
+be missed on network file systems or when watchdog is unavailable.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    HAS_WATCHDOG = True
+except ImportError:  # pragma: no cover - watchdog is an optional runtime dependency
+    FileSystemEventHandler = object
+    Observer = None
+    HAS_WATCHDOG = False
+
+# Events that may change the contents of a log file; opening a file, or closing
+# it without writing, does not, and the monitor itself opens every file it reads
+CHANGE_EVENTS = frozenset({"created", "modified", "moved", "deleted", "closed"})
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, callback: Callable[[str], None]):
+        super().__init__()
+        self.callback = callback
+
+    def on_any_event(self, event: Any) -> None:
+        if event.event_type not in CHANGE_EVENTS:
+            return
+        if event.is_directory and event.event_type != "created":
+            return
+        self.callback(getattr(event, "dest_path", "") or event.src_path)
+
+
+class LogWatcher:
+    """Calls back, from a background thread, whenever a file under a directory changes."""
+
+    def __init__(self, directory: Union[str, Path], callback: Callable[[str], None]):
+        self.directory = Path(directory)
+        self.callback = callback
+        self.events = 0
+        self._observer: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._observer is not None
+
+    def _on_change(self, path: str) -> None:
+        self.events += 1
+        self.callback(path)
+
+    def start(self) -> bool:
+        """Start watching; returns False when notifications are unavailable."""
+        with self._lock:
+            if self._observer is not None:
+                return True
+            if not HAS_WATCHDOG or not self.directory.is_dir():
+                return False
+            observer = Observer()
+            try:
+                observer.schedule(
+                    _ChangeHandler(self._on_change), str(self.directory), recursive=True
+                )
+                observer.daemon = True
+                observer.start()
+            except (OSError, RuntimeError) as e:
+                print(f"File notifications unavailable for {self.directory}: {e}")
+                return False
+            self._observer = observer
+            return True
+
+    def stop(self) -> None:
+        """Stop watching and wait for the observer thread to exit."""
+        with self._lock:
+            observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
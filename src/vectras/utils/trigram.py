@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Trigram inverted index used for fast substring and regex search.
+
+Documents are identified by increasing integer ids, so every posting list is an
+append-only sorted array. Removed documents are tombstoned and dropped from the
+posting lists on the next compaction.
+"""
+
+import base64
+import re
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse
+
+# Compact the posting lists once this fraction of indexed documents is removed
+COMPACTION_RATIO = 0.25
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of lowercase trigrams in a piece of text."""
+    text = text.lower()
+    return set(map("".join, zip(text, text[1:], text[2:], strict=False)))
+
+
+_WORD_RE = re.compile(r"\w{3,}")
+
+
+def word_trigrams(text: str) -> Set[str]:
+    """Return the lowercase trigrams inside runs of word characters.
+
+    Much cheaper than trigrams() on repetitive text such as logs, since each
+    distinct word is only split once. Any word run of a query lies inside a word
+    run of the text it matches, so the same function must be used for queries.
+    """
+    grams: Set[str] = set()
+    for word in set(_WORD_RE.findall(text.lower())):
+        grams.update(word[i : i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def regex_literals(pattern: str) -> List[str]:
+    """Return literal substrings that every match of a regex must contain.
+
+    Only literals that are unconditionally required are returned; alternations,
+    optional parts and character classes end the current literal run.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, OverflowError, RecursionError):
+        return []
+
+    literals: List[str] = []
+    _collect_literals(parsed, literals)
+    return [literal for literal in literals if literal]
+
+
+def alternative_literals(pattern: str) -> Optional[List[str]]:
+    """Return literals of which at least one occurs in every match of a regex.
+
+    Each top-level alternative contributes its longest required literal. Returns
+    None when some alternative has no required literal.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, OverflowError, RecursionError):
+        return None
+
+    items = list(parsed)
+    if len(items) == 1 and items[0][0] is sre_parse.BRANCH:
+        branches = items[0][1][1]
+    else:
+        branches = [items]
+
+    result = []
+    for branch in branches:
+        literals: List[str] = []
+        _collect_literals(branch, literals)
+        if not literals:
+            return None
+        result.append(max(literals, key=len))
+    return result
+
+
+def _collect_literals(items: Iterable, literals: List[str]) -> None:
+    run: List[str] = []
+
+    def flush() -> None:
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    for op, arg in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+        elif op is sre_parse.SUBPATTERN:
+            # A group is a sequence of its own; its literals are still required
+            flush()
+            _collect_literals(arg[-1], literals)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            flush()
+            low, _high, body = arg
+            if low >= 1:
+                _collect_literals(body, literals)
+        elif op is sre_parse.AT:
+            # Anchors do not consume characters
+            continue
+        else:
+            flush()
+    flush()
+
+
+def _intersect(postings: List[array]) -> List[int]:
+    """Intersect sorted posting arrays, smallest first."""
+    postings = sorted(postings, key=len)
+    result = list(postings[0])
+    for other in postings[1:]:
+        if not result:
+            break
+        kept = []
+        lo = 0
+        size = len(other)
+        for doc_id in result:
+            lo = bisect_left(other, doc_id, lo, size)
+            if lo == size:
+                break
+            if other[lo] == doc_id:
+                kept.append(doc_id)
+        result = kept
+    return result
+
+
+class TrigramIndex:
+    """Inverted index from lowercase trigrams to sorted document ids.
+
+    With words_only, only trigrams inside words are indexed (see word_trigrams).
+    """
+
+    def __init__(self, words_only: bool = False):
+        self.words_only = words_only
+        self.gram_function = word_trigrams if words_only else trigrams
+        self.postings: Dict[str, array] = {}
+        self.deleted: Set[int] = set()
+        self.doc_count = 0
+        self.last_doc_id = -1
+        self.entry_count = 0
+
+    def add(self, doc_id: int, text: str) -> None:
+        """Index a document; ids must be added in increasing order."""
+        self.add_trigrams(doc_id, self.gram_function(text))
+
+    def add_trigrams(self, doc_id: int, grams: Iterable[str]) -> None:
+        if doc_id <= self.last_doc_id:
+            raise ValueError(f"Document ids must increase: {doc_id} <= {self.last_doc_id}")
+        postings = self.postings
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("q")
+            posting.append(doc_id)
+            self.entry_count += 1
+        self.last_doc_id = doc_id
+        self.doc_count += 1
+
+    def remove(self, doc_id: int) -> None:
+        """Tombstone a document; it is dropped from postings on compaction."""
+        if doc_id not in self.deleted:
+            self.deleted.add(doc_id)
+            if self.doc_count and len(self.deleted) / self.doc_count > COMPACTION_RATIO:
+                self.compact()
+
+    def compact(self) -> None:
+        """Rewrite posting lists without tombstoned documents."""
+        if not self.deleted:
+            return
+        deleted = self.deleted
+        for gram in list(self.postings):
+            posting = self.postings[gram]
+            kept = array("q", (doc_id for doc_id in posting if doc_id not in deleted))
+            self.entry_count -= len(posting) - len(kept)
+            if kept:
+                self.postings[gram] = kept
+            else:
+                del self.postings[gram]
+        self.doc_count -= len(deleted)
+        self.deleted = set()
+
+    def discard_before(self, doc_id: int) -> None:
+        """Drop every document with an id lower than doc_id."""
+        for gram in list(self.postings):
+            posting = self.postings[gram]
+            cut = bisect_left(posting, doc_id)
+            self.entry_count -= cut
+            if cut == len(posting):
+                del self.postings[gram]
+            elif cut:
+                del posting[:cut]
+        self.deleted = {d for d in self.deleted if d >= doc_id}
+
+    def candidates(self, literals: Iterable[str]) -> Optional[List[int]]:
+        """Return ids of documents that may contain all literals.
+
+        Returns None when the literals are too short to narrow the search, in which
+        case every document is a candidate.
+        """
+        grams: Set[str] = set()
+        for literal in literals:
+            grams |= self.gram_function(literal)
+        if not grams:
+            return None
+
+        postings = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        result = _intersect(postings)
+        if self.deleted:
+            result = [doc_id for doc_id in result if doc_id not in self.deleted]
+        return result
+
+    @property
+    def memory_size(self) -> int:
+        """Approximate bytes held by the posting arrays."""
+        return self.entry_count * 8 + len(self.postings) * 64
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to JSON-compatible data."""
+        self.compact()
+        return {
+            "words_only": self.words_only,
+            "doc_count": self.doc_count,
+            "last_doc_id": self.last_doc_id,
+            "postings": {
+                gram: base64.b64encode(posting.tobytes()).decode("ascii")
+                for gram, posting in self.postings.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TrigramIndex":
+        """Rebuild an index serialized with to_dict."""
+        index = cls(data.get("words_only", False))
+        index.doc_count = data["doc_count"]
+        index.last_doc_id = data["last_doc_id"]
+        for gram, encoded in data["postings"].items():
+            posting = array("q")
+            posting.frombytes(base64.b64decode(encoded))
+            index.postings[gram] = posting
+            index.entry_count += len(posting)
+        return index
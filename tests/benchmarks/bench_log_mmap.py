@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Benchmark of a first-time scan: the line iterator versus the mmap bulk scan.
+
+Writes a log where about one line in a hundred is a warning or an error, then
+reads it once the way the tailer does (decoding and parsing every line) and
+once with the mmap scan (counting lines, decoding and parsing only the
+candidate warning and error lines).
+
+Usage: python tests/benchmarks/bench_log_mmap.py [lines] [error lines per 1000]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from vectras.utils.log_mmap import candidate_literals, scan_candidates
+from vectras.utils.log_parallel import parse_lines
+from vectras.utils.log_parser import DEFAULT_CLASSIFIER
+from vectras.utils.log_tail import LogTailer
+
+MESSAGES = [
+    "INFO: Request handled in 12ms",
+    "DEBUG: cache hit for key user:42",
+    "INFO: GET /api/v1/users/42 200",
+    "DEBUG: worker heartbeat ok",
+]
+
+ERRORS = [
+    "WARNING: High memory usage 87%",
+    "ERROR: Database connection failed",
+    "ERROR: ZeroDivisionError: division by zero",
+]
+
+
+def main(lines: int = 2_000_000, errors_per_1000: int = 10) -> None:
+    rng = random.Random(0)
+    today = date.today()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "service.log"
+        with open(path, "w") as f:
+            for i in range(lines):
+                messages = ERRORS if rng.randrange(1000) < errors_per_1000 else MESSAGES
+                f.write(f"2024-01-01 12:{i // 60 % 60:02d}:{i % 60:02d} {rng.choice(messages)}\n")
+        size = os.path.getsize(path)
+        # Warm the page cache so both runs read from memory
+        path.read_bytes()
+
+        start = time.perf_counter()
+        chunk = LogTailer().read(path)
+        parsed = parse_lines(chunk.lines, DEFAULT_CLASSIFIER, today)
+        iterator = time.perf_counter() - start
+        full_errors = sum(1 for line in parsed if line[4] in ("warning", "error", "critical"))
+
+        literals = candidate_literals(DEFAULT_CLASSIFIER)
+        start = time.perf_counter()
+        chunk = LogTailer().read(path, load_lines=False)
+        groups = scan_candidates(str(path), chunk.start_offset, chunk.end_offset, literals)
+        parsed = [parse_lines(group, DEFAULT_CLASSIFIER, today) for _index, group in groups]
+        bulk = time.perf_counter() - start
+        bulk_errors = sum(
+            1 for batch in parsed for line in batch if line[4] in ("warning", "error", "critical")
+        )
+
+    print(f"file:     {lines} lines, {size / 1024 / 1024:.0f} MB, {full_errors} warnings/errors")
+    print(f"iterator: {size / 1024 / 1024 / iterator:,.0f} MB/s ({iterator:.2f}s)")
+    print(
+        f"mmap:     {size / 1024 / 1024 / bulk:,.0f} MB/s ({bulk:.2f}s), {len(groups)} candidates"
+    )
+    print(f"speedup:  {iterator / bulk:.1f}x, same warnings/errors: {full_errors == bulk_errors}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Benchmark of in-process versus process pool log parsing.
+
+Writes a set of service logs and parses them once in the calling process and
+once across a process pool, including worker start-up.
+
+Usage: python tests/benchmarks/bench_log_parallel.py [lines per file] [files] [workers]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from vectras.utils.log_parallel import LogParserPool, parse_lines, split_lines, split_ranges
+from vectras.utils.log_parser import DEFAULT_CLASSIFIER
+
+MESSAGES = [
+    "INFO: Request handled in 12ms",
+    "DEBUG: cache hit for key user:42",
+    "WARNING: High memory usage 87%",
+    "ERROR: Database connection failed",
+    "ERROR: ZeroDivisionError: division by zero",
+]
+
+
+def main(lines_per_file: int = 200_000, files: int = 4, workers: int = 0) -> None:
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for n in range(files):
+            path = Path(tmpdir) / f"service{n}.log"
+            path.write_text(
+                "".join(
+                    f"2024-01-01 12:{i // 60 % 60:02d}:{i % 60:02d} {rng.choice(MESSAGES)}\n"
+                    for i in range(lines_per_file)
+                )
+            )
+            paths.append(str(path))
+        today = date.today()
+
+        start = time.perf_counter()
+        for path in paths:
+            parse_lines(split_lines(Path(path).read_bytes()), DEFAULT_CLASSIFIER, today)
+        inline = time.perf_counter() - start
+
+        pool = LogParserPool(max_workers=workers)
+        start = time.perf_counter()
+        jobs = [
+            (path, s, e, False)
+            for path in paths
+            for s, e in split_ranges(path, 0, os.path.getsize(path))
+        ]
+        for _result in pool.parse(jobs, today):
+            pass
+        parallel = time.perf_counter() - start
+        pool.close()
+
+    total = lines_per_file * files
+    print(f"lines:    {total} in {files} files, {len(jobs)} ranges, {workers} workers")
+    print(f"inline:   {total / inline:,.0f} lines/s")
+    print(f"parallel: {total / parallel:,.0f} lines/s")
+    print(f"speedup:  {inline / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    main(*args)
@@ -0,0 +1,106 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Benchmark of per-line log parsing cost.
+
+Compares the original regex/strptime path with the compiled classifier and the
+fixed-format timestamp parser.
+
+Usage: python tests/benchmarks/bench_log_parser.py [lines]
+"""
+
+import random
+import re
+import sys
+import time
+from datetime import date, datetime
+
+from vectras.utils.log_parser import DEFAULT_CLASSIFIER, ERROR_TYPE_PATTERNS, parse_timestamp
+
+TIMESTAMP_PATTERNS = [
+    r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})",
+    r"^(\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})",
+    r"^(\d{2}:\d{2}:\d{2})",
+]
+
+MESSAGES = [
+    "INFO: Request handled in 12ms",
+    "INFO: User login successful",
+    "DEBUG: cache hit for key user:42",
+    "WARNING: High memory usage 87%",
+    "ERROR: Database connection failed",
+    "ERROR: ZeroDivisionError: division by zero",
+    "INFO: GET /api/items returned HTTP 200",
+]
+
+
+def original_parse(line):
+    """The parsing path used before the compiled classifier."""
+    timestamp = None
+    content = line
+    for pattern in TIMESTAMP_PATTERNS:
+        match = re.match(pattern, line)
+        if match:
+            try:
+                timestamp_str = match.group(1)
+                if len(timestamp_str) == 8:
+                    timestamp = datetime.strptime(timestamp_str, "%H:%M:%S")
+                    timestamp = datetime.combine(datetime.now().date(), timestamp.time())
+                else:
+                    timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
+                content = line[match.end() :].strip()
+                break
+            except ValueError:
+                continue
+
+    upper = content.upper()
+    if any(level in upper for level in ["CRITICAL", "FATAL"]):
+        severity = "critical"
+    elif "ERROR" in upper:
+        severity = "error"
+    elif "WARNING" in upper or "WARN" in upper:
+        severity = "warning"
+    elif "INFO" in upper:
+        severity = "info"
+    else:
+        severity = "debug"
+    error_type = None
+    for name, pattern in ERROR_TYPE_PATTERNS:
+        if re.search(pattern, content, re.IGNORECASE):
+            error_type = name
+            break
+    return timestamp, severity, error_type
+
+
+def compiled_parse(line, today):
+    timestamp, content = parse_timestamp(line, today)
+    severity, error_type = DEFAULT_CLASSIFIER.classify(content)
+    return timestamp, severity, error_type
+
+
+def main(count: int = 200_000) -> None:
+    rng = random.Random(0)
+    lines = [
+        f"2024-01-01 12:{i // 60 % 60:02d}:{i % 60:02d} {rng.choice(MESSAGES)}"
+        for i in range(count)
+    ]
+    today = date.today()
+
+    start = time.perf_counter()
+    for line in lines:
+        original_parse(line)
+    original = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for line in lines:
+        compiled_parse(line, today)
+    compiled = time.perf_counter() - start
+
+    print(f"lines:    {count}")
+    print(f"original: {original / count * 1e6:.2f} us/line")
+    print(f"compiled: {compiled / count * 1e6:.2f} us/line")
+    print(f"speedup:  {original / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -100,6 +100,22 @@ async def test_analyze_error(code_fixer_manager):
     assert "SyntaxError" in result
 
 
+@pytest.mark.asyncio
+async def test_analyze_error_reads_context(code_fixer_manager, tmp_path):
+    """Test that error analysis only reads the lines around the error."""
+    code_fixer_manager.project_root = tmp_path
+    lines = [f"value_{i} = {i}" for i in range(1, 201)]
+    lines[99] = "result = n1 / 0"
+    (tmp_path / "calc.py").write_text("\n".join(lines) + "\n")
+
+    error_content = 'File "calc.py", line 100, in divide\nZeroDivisionError: division by zero'
+    result = await code_fixer_manager.analyze_error(error_content, context_lines=2)
+    assert "Code Context (lines 98-102)" in result
+    assert "result = n1 / 0" in result
+    assert "value_97 = 97" not in result
+    assert "Specific Fix" in result
+
+
 @pytest.mark.asyncio
 async def test_fix_code(code_fixer_manager):
     """Test code fixing."""
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the user settings store."""
+
+import asyncio
+import os
+
+import pytest
+import yaml
+
+from vectras.agents.config import UserSettingsStore, parse_duration, parse_size
+
+
+@pytest.fixture
+def settings_path(tmp_path):
+    """Path to a user settings file in a temporary config directory."""
+    return tmp_path / "config" / "user_settings.yaml"
+
+
+def test_get_missing_file(settings_path):
+    """Test that a missing settings file reads as empty settings."""
+    store = UserSettingsStore(settings_path)
+    assert store.get() == {}
+
+
+def test_get_is_cached_until_file_changes(settings_path):
+    """Test that settings are only re-read after the file changes."""
+    settings_path.parent.mkdir(parents=True)
+    settings_path.write_text("theme: dark\n")
+    store = UserSettingsStore(settings_path)
+
+    assert store.get() == {"theme": "dark"}
+    assert store.get() == {"theme": "dark"}
+    assert store.reads == 1
+
+    settings_path.write_text("theme: light\n")
+    st = os.stat(settings_path)
+    os.utime(settings_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert store.get() == {"theme": "light"}
+    assert store.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_are_coalesced(settings_path):
+    """Test that concurrent updates are all kept and written once."""
+    store = UserSettingsStore(settings_path)
+
+    results = await asyncio.gather(*(store.update({f"key_{i}": i}) for i in range(20)))
+
+    expected = {f"key_{i}": i for i in range(20)}
+    assert all(result == expected for result in results)
+    assert yaml.safe_load(settings_path.read_text()) == expected
+    assert store.writes == 1
+    assert not list(settings_path.parent.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_update_notifies_listeners(settings_path):
+    """Test that listeners receive only the keys that changed."""
+    store = UserSettingsStore(settings_path, coalesce_delay=0)
+    received = []
+    unsubscribe = store.subscribe(lambda changes, settings: received.append(changes))
+
+    await store.update({"a": 1, "b": 2})
+    await store.update({"a": 1, "b": 3})
+    unsubscribe()
+    await store.update({"c": 4})
+
+    assert received == [{"a": 1, "b": 2}, {"b": 3}]
+
+
+def test_parse_size_and_duration():
+    assert parse_size("10MB") == 10 * 1024 * 1024
+    assert parse_size("1.5 kb") == 1536
+    assert parse_size("2G") == 2 * 1024**3
+    assert parse_size(4096) == 4096
+    assert parse_duration("15m") == 900
+    assert parse_duration("7d") == 7 * 86400
+    assert parse_duration("45") == 45
+    with pytest.raises(ValueError):
+        parse_size("ten megabytes")
+    with pytest.raises(ValueError):
+        parse_duration("soon")
@@ -18,8 +18,9 @@ class TestTestingAgent:
     """Test the testing agent's e2e functionality."""
 
     @pytest.fixture
-    def testing_manager(self):
-        """Create a testing agent manager instance."""
+    def testing_manager(self, monkeypatch, tmp_path):
+        """Create a testing agent manager instance, writing its tools under tmp_path."""
+        monkeypatch.chdir(tmp_path)
         return TestingAgentManager()
 
     @pytest.fixture
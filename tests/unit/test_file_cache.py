@@ -0,0 +1,141 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the shared file cache."""
+
+import os
+
+import pytest
+
+from vectras.utils.file_cache import FileCache
+from vectras.utils.files import read_file_slice
+
+
+@pytest.fixture
+def cache():
+    """Create an empty file cache."""
+    return FileCache(max_bytes=1024 * 1024)
+
+
+def _touch(path, offset_ns):
+    """Move a file's mtime so changes are visible even on coarse filesystems."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + offset_ns))
+
+
+def test_cache_hit_and_revalidation(cache, tmp_path):
+    """Test that unchanged files are served from memory and changed files re-read."""
+    path = tmp_path / "module.py"
+    path.write_text("x = 1\n")
+
+    assert cache.read_text(path) == "x = 1\n"
+    assert cache.read_text(path) == "x = 1\n"
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    path.write_text("x = 22\n")
+    _touch(path, 1_000_000)
+    assert cache.read_text(path) == "x = 22\n"
+    assert cache.misses == 2
+
+
+def test_line_slices(cache, tmp_path):
+    """Test that line ranges are served from cached line offsets."""
+    path = tmp_path / "lines.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 51)))
+
+    file_slice = cache.read_slice(path, start_line=5, end_line=6)
+    assert file_slice.text == "line 5\nline 6\n"
+    assert file_slice.end_line == 6
+
+    entry = cache.get(path)
+    assert entry.line_count == 50
+
+
+def test_slices_count_bytes_like_disk_reads(cache, tmp_path):
+    """Test that cached slices of multibyte text match reads from disk."""
+    path = tmp_path / "unicode.txt"
+    path.write_text("".join(f"ligne {i} été 日本語\n" for i in range(1, 41)) + "fin sans retour")
+
+    cases = [
+        {"start_line": 3, "end_line": 4},
+        {"start_line": 3, "end_line": 20, "max_bytes": 70},
+        {"start_line": 40},
+        {"max_bytes": 200, "preview_lines": 2},
+    ]
+    for kwargs in cases:
+        cached = cache.read_slice(path, **kwargs)
+        direct = read_file_slice(path, **kwargs)
+        assert (cached.text, cached.to_dict()) == (direct.text, direct.to_dict()), kwargs
+    assert cache.hits == len(cases) - 1
+
+    file_slice = cache.read_slice(path, start_line=2, end_line=2)
+    line = "ligne 2 été 日本語\n"
+    assert file_slice.text == line
+    assert file_slice.end_byte - file_slice.start_byte == len(line.encode("utf-8"))
+    assert cache.read_slice(path, start_line=40).end_line == 41
+
+
+def test_cached_ast(cache, tmp_path):
+    """Test that ASTs are parsed once and syntax errors are cached."""
+    good = tmp_path / "good.py"
+    good.write_text("def f():\n    return 1\n")
+    assert cache.get_ast(good) is cache.get_ast(good)
+
+    bad = tmp_path / "bad.py"
+    bad.write_text("def f(:\n")
+    with pytest.raises(SyntaxError):
+        cache.get_ast(bad)
+
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used files are evicted over budget."""
+    cache = FileCache(max_bytes=3000)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"f{i}.txt"
+        path.write_text(str(i) * 1000)
+        paths.append(path)
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert cache.evictions == 1
+    assert cache.stats()["entries"] == 2
+    assert cache.current_bytes <= cache.max_bytes
+    # f1 was least recently used, so reading it again is a miss
+    misses = cache.misses
+    cache.get(paths[1])
+    assert cache.misses == misses + 1
+
+
+def test_binary_and_large_files_not_cached(tmp_path):
+    """Test that binary and oversized files bypass the cache."""
+    cache = FileCache(max_file_bytes=10)
+    (tmp_path / "blob.bin").write_bytes(b"\x00\x01\x02")
+    (tmp_path / "big.txt").write_text("x" * 100)
+
+    assert cache.get(tmp_path / "blob.bin") is None
+    assert cache.get(tmp_path / "big.txt") is None
+    assert cache.read_slice(tmp_path / "big.txt", max_bytes=5).text.startswith("x")
+
+
+def test_list_files_reuses_directory_listings(cache, tmp_path):
+    """Test that directory listings are cached until the directory changes."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / "pkg" / "b.py").write_text("")
+
+    files = cache.list_files(tmp_path)
+    assert sorted(p.name for p in files) == ["a.py", "b.py"]
+    assert cache.directory_misses == 2
+
+    cache.list_files(tmp_path)
+    assert cache.directory_hits == 2
+
+    (tmp_path / "pkg" / "c.py").write_text("")
+    _touch(tmp_path / "pkg", 1_000_000)
+    files = cache.list_files(tmp_path)
+    assert sorted(p.name for p in files) == ["a.py", "b.py", "c.py"]
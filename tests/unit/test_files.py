@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for bounded file reads."""
+
+import pytest
+
+from vectras.utils import files
+from vectras.utils.files import is_binary_file, read_file_slice
+
+
+@pytest.fixture
+def numbered_file(tmp_path):
+    """Create a file with 100 numbered lines."""
+    path = tmp_path / "numbers.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    return path
+
+
+def test_read_whole_small_file(numbered_file):
+    """Test that small files are returned in full."""
+    file_slice = read_file_slice(numbered_file)
+    assert file_slice.is_complete
+    assert file_slice.text.startswith("line 1\n")
+    assert file_slice.text.endswith("line 100\n")
+
+
+def test_read_line_range(numbered_file):
+    """Test reading an inclusive line range."""
+    file_slice = read_file_slice(numbered_file, start_line=10, end_line=12)
+    assert file_slice.text == "line 10\nline 11\nline 12\n"
+    assert file_slice.start_line == 10
+    assert file_slice.end_line == 12
+    assert file_slice.truncated
+
+
+def test_read_byte_range(numbered_file):
+    """Test reading a byte range."""
+    file_slice = read_file_slice(numbered_file, byte_offset=7, byte_length=7)
+    assert file_slice.text == "line 2\n"
+    assert file_slice.start_byte == 7
+    assert file_slice.end_byte == 14
+
+
+def test_head_tail_preview(numbered_file):
+    """Test that files over the cap are previewed from both ends."""
+    file_slice = read_file_slice(numbered_file, max_bytes=200, preview_lines=3)
+    assert file_slice.truncated
+    assert file_slice.text.startswith("line 1\nline 2\nline 3\n")
+    assert file_slice.text.endswith("line 98\nline 99\nline 100\n")
+    assert "bytes omitted" in file_slice.text
+
+
+def test_line_range_respects_cap(numbered_file):
+    """Test that line ranges are cut at a line boundary when over the cap."""
+    file_slice = read_file_slice(numbered_file, start_line=1, end_line=100, max_bytes=20)
+    assert file_slice.text == "line 1\nline 2\n"
+    assert file_slice.end_line == 2
+
+
+def test_mmap_line_range(numbered_file, monkeypatch):
+    """Test that large files are sliced through mmap."""
+    monkeypatch.setattr(files, "MMAP_THRESHOLD", 1)
+    file_slice = read_file_slice(numbered_file, start_line=99)
+    assert file_slice.text == "line 99\nline 100\n"
+
+
+def test_binary_detection(tmp_path):
+    """Test that binary files are detected and not decoded."""
+    path = tmp_path / "blob.bin"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00")
+    assert is_binary_file(path)
+
+    file_slice = read_file_slice(path)
+    assert file_slice.is_binary
+    assert file_slice.text == ""
@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the log analytics."""
+
+from array import array
+from datetime import datetime, timedelta
+
+import pytest
+
+from vectras.utils.log_analytics import HAS_NUMPY, LogColumns, analyze
+from vectras.utils.log_store import (
+    FLAG_CONTINUATION,
+    FLAG_ERROR,
+    FLAG_RETIRED,
+    FLAG_WARNING,
+    to_micros,
+)
+
+START = datetime(2024, 1, 1, 12)
+
+BACKENDS = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed")),
+]
+
+
+def _columns():
+    """api.log and worker.log, with errors in minutes 0 and 2 and one in minute 3."""
+    lines = [
+        (0, 0, 0),
+        (10, 0, FLAG_ERROR),
+        (20, 1, FLAG_ERROR),
+        (21, 1, FLAG_CONTINUATION),
+        (70, 1, FLAG_WARNING),
+        (125, 0, FLAG_ERROR),
+        (130, 2, FLAG_ERROR),
+        (140, 1, FLAG_ERROR | FLAG_RETIRED),
+        (200, 0, FLAG_ERROR),
+    ]
+    return LogColumns(
+        array("q", [to_micros(START + timedelta(seconds=s)) for s, _, _ in lines]),
+        array("l", [file_id for _, file_id, _ in lines]),
+        array("B", [flags for _, _, flags in lines]),
+        {0: "/logs/api.log", 1: "/logs/worker.log", 2: "/logs/api.log.1"},
+    )
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_analyze(use_numpy):
+    result = analyze(_columns(), use_numpy=use_numpy)
+
+    assert (result["total_lines"], result["total_errors"], result["total_warnings"]) == (7, 5, 1)
+    assert result["bucket_seconds"] == 60
+    assert [(b["lines"], b["errors"], b["warnings"]) for b in result["buckets"]] == [
+        (3, 2, 0),
+        (1, 0, 1),
+        (2, 2, 0),
+        (1, 1, 0),
+    ]
+    assert result["buckets"][0]["start"] == START.isoformat()
+    # Rotated segments count toward their service
+    assert result["services"] == [
+        {"service": "api", "lines": 5, "errors": 4, "error_rate": 0.8},
+        {"service": "worker", "lines": 2, "errors": 1, "error_rate": 0.5},
+    ]
+    # Gaps of 10, 105, 5 and 70 seconds between the errors
+    assert result["error_gaps"] == {
+        "count": 4,
+        "p50": 40.0,
+        "p90": 94.5,
+        "p99": 103.95,
+        "max": 105.0,
+    }
+    assert result["co_occurrence"] == {"services": ["api", "worker"], "matrix": [[3, 1], [1, 1]]}
+
+    later = analyze(_columns(), start=START + timedelta(seconds=60), use_numpy=use_numpy)
+    assert later["total_lines"] == 4 and later["error_gaps"]["count"] == 2
+    assert later["start"] == (START + timedelta(seconds=60)).isoformat()
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_analyze_empty_and_wide_ranges(use_numpy):
+    empty = analyze(LogColumns(array("q"), array("l"), array("B"), {}), use_numpy=use_numpy)
+    assert empty["total_lines"] == 0 and empty["buckets"] == []
+    assert empty["error_gaps"]["count"] == 0
+
+    # Two days need wider buckets, in whole minutes, to stay near MAX_BUCKETS
+    columns = LogColumns(
+        array("q", [to_micros(START), to_micros(START + timedelta(days=2))]),
+        array("l", [0, 0]),
+        array("B", [FLAG_ERROR, FLAG_ERROR]),
+        {0: "/logs/api.log"},
+    )
+    result = analyze(columns, use_numpy=use_numpy)
+    assert result["bucket_seconds"] == 120 and len(result["buckets"]) == 1441
+    assert result["error_gaps"]["max"] == 172800.0
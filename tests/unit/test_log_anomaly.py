@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for streaming error-rate anomaly detection."""
+
+from vectras.utils.log_anomaly import HandoffDebouncer, RateAnomalyDetector, service_name
+
+
+def _run(detector, counts, key=("api", "exception"), start=0):
+    """Feed one bucket per count and return the anomalies of each bucket."""
+    results = []
+    for bucket, count in enumerate(counts, start):
+        if count:
+            detector.observe(*key, now=bucket * 60 + 1, count=count)
+        results.append(detector.tick(now=(bucket + 1) * 60))
+    return results
+
+
+def test_spike_over_steady_rate_is_reported():
+    detector = RateAnomalyDetector()
+    results = _run(detector, [2, 3, 2, 3, 2, 2, 3, 40, 3])
+
+    assert [len(found) for found in results] == [0, 0, 0, 0, 0, 0, 0, 1, 0]
+    [anomaly] = results[7]
+    assert anomaly.key == ("api", "exception")
+    assert anomaly.count == 40
+    # The baseline starts at zero and moves towards the usual rate
+    assert 1 <= anomaly.expected <= 3
+    assert anomaly.z_score >= detector.threshold
+
+
+def test_warmup_and_minimum_count():
+    detector = RateAnomalyDetector()
+    # A burst while warming up, then a new key with too few errors to matter
+    assert not any(_run(detector, [50, 0, 0]))
+    key = ("worker", "connection_error")
+    assert not any(_run(detector, [0, 4], key=key, start=3))
+    assert _run(detector, [0, 30], key=key, start=5)[1]
+
+
+def test_empty_buckets_after_a_pause_lower_the_rate():
+    detector = RateAnomalyDetector(warmup_buckets=0)
+    _run(detector, [20] * 10)
+    # Ten quiet minutes without any tick in between
+    assert detector.tick(now=20 * 60) == []
+    assert detector.rates[("api", "exception")].mean < 10
+
+
+def test_debouncer_batches_and_cools_down():
+    detector = RateAnomalyDetector(warmup_buckets=0)
+    first = _run(detector, [0, 25])[1]
+    second = _run(detector, [0, 30], key=("worker", "exception"), start=2)[1]
+
+    debouncer = HandoffDebouncer(debounce_seconds=30, cooldown_seconds=600)
+    debouncer.add(first, now=1000)
+    debouncer.add(second, now=1010)
+    assert not debouncer.due(now=1020)
+    assert debouncer.due(now=1030)
+    batch = debouncer.take(now=1030)
+    assert {anomaly.key for anomaly in batch} == {("api", "exception"), ("worker", "exception")}
+
+    debouncer.add(first, now=1100)
+    assert not debouncer.pending
+    debouncer.add(first, now=1700)
+    assert debouncer.pending
+
+
+def test_service_name():
+    assert service_name("/var/log/coding.log") == "coding"
+    assert service_name("logs/api.log.2.gz") == "api"
+    assert service_name("worker.err") == "worker"
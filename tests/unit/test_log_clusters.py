@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for near-duplicate message clustering."""
+
+from datetime import datetime, timedelta
+
+from vectras.utils.log_clusters import LogClusterer, minhash, similarity, tokenize
+
+START = datetime(2024, 1, 1, 12)
+
+
+def test_tokenize_masks_variable_parts():
+    assert tokenize("ERROR: Request a1b2c3d4 for user 42 failed at /api/v1/users/42") == [
+        "ERROR:",
+        "Request",
+        "<id>",
+        "for",
+        "user",
+        "<num>",
+        "failed",
+        "at",
+        "<path>",
+    ]
+    assert tokenize("fetch https://example.com/x?id=7 failed: 'boom'") == [
+        "fetch",
+        "<url>",
+        "failed:",
+        "<str>",
+    ]
+
+
+def test_minhash_estimates_jaccard_similarity():
+    first = minhash("connection to db-primary refused by host alpha".split())
+    assert similarity(first, first) == 1.0
+    # 5 shared tokens out of 9
+    second = minhash("connection to db-replica refused by host beta".split())
+    assert 0.3 <= similarity(first, second) <= 0.8
+    assert similarity(first, minhash("disk full".split())) < 0.2
+
+
+def test_clusters_near_duplicates_into_templates():
+    clusterer = LogClusterer()
+    hosts = ["alpha", "beta", "gamma", "delta"]
+    for i in range(40):
+        clusterer.add(
+            f"ERROR: Connection to db-{hosts[i % 4]} refused by host {hosts[(i + 1) % 4]}",
+            START + timedelta(seconds=i),
+            "connection_error",
+            "api" if i % 2 else "worker",
+        )
+    for i in range(5):
+        clusterer.add(f"ERROR: Disk full on /dev/sda{i}", START, None, "worker")
+
+    connection, disk = clusterer.top(2)
+    assert connection.template == "ERROR: Connection to <*> refused by host <*>"
+    assert connection.count == 40 and connection.services == {"api": 20, "worker": 20}
+    assert connection.last_seen == START + timedelta(seconds=39)
+    assert disk.template == "ERROR: Disk full on <path>" and disk.count == 5
+    assert len(clusterer.clusters) == 2 and clusterer.total == 45
+
+    assert clusterer.matching([("worker", "unknown")]) == [disk]
+
+    restored = LogClusterer()
+    restored.restore(clusterer.to_dict())
+    assert restored.add("ERROR: Disk full on /dev/sdb1", START).cluster_id == disk.cluster_id
+    assert restored.top(1)[0].count == 40
+
+
+def test_cluster_count_is_bounded():
+    clusterer = LogClusterer(max_clusters=3)
+    words = ["alpha", "bravo", "charlie", "delta", "echo"]
+    for word in words:
+        clusterer.add(f"{word} {word}-only unique failure", START)
+    assert len(clusterer.clusters) == 3
+    assert [cluster.template.split()[0] for cluster in clusterer.top(3)] == [
+        "charlie",
+        "delta",
+        "echo",
+    ]
@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for traceback assembly and incident deduplication."""
+
+from datetime import datetime, timedelta
+
+from vectras.utils.log_incidents import IncidentTracker, normalize_message
+
+TRACEBACK = [
+    "2024-01-01 12:00:00 ERROR: Unhandled exception",
+    "Traceback (most recent call last):",
+    '  File "/srv/app/main.py", line 10, in <module>',
+    "    run()",
+    '  File "/srv/app/jobs.py", line 42, in run',
+    "    return 1 / 0",
+    "ZeroDivisionError: division by zero",
+]
+
+
+def _feed(tracker, lines, path="app.log", start=datetime(2024, 1, 1, 12, 0, 0)):
+    starts = []
+    for number, line in enumerate(lines, 1):
+        content = line[20:] if line[:4].isdigit() else line
+        is_error = "ERROR" in line or "Error" in line or line.startswith("Traceback")
+        if tracker.feed(path, number, number, line, content, start, is_error, None):
+            starts.append(number)
+    return starts
+
+
+def test_traceback_is_one_incident():
+    tracker = IncidentTracker()
+    starts = _feed(tracker, TRACEBACK + ["2024-01-01 12:00:01 INFO: recovered"])
+
+    # Only the header line and the following info line start events
+    assert starts == [1, 8]
+    [incident] = tracker.incidents.values()
+    assert incident.kind == "traceback"
+    assert incident.title == "ZeroDivisionError: division by zero"
+    assert incident.count == 1
+    assert 'File "/srv/app/jobs.py", line 42, in run' in incident.sample
+
+
+def test_repeats_share_a_fingerprint():
+    tracker = IncidentTracker()
+    first = datetime(2024, 1, 1, 12, 0, 0)
+    _feed(tracker, TRACEBACK, start=first)
+    tracker.flush()
+    # Line numbers and paths of the frames moved, the code path did not
+    moved = [
+        line.replace("line 42", "line 57").replace("/srv/app", "/opt/app") for line in TRACEBACK
+    ]
+    _feed(tracker, moved, path="other.log", start=first + timedelta(minutes=5))
+    tracker.flush()
+
+    [incident] = tracker.incidents.values()
+    assert incident.count == 2
+    assert incident.first_seen == first
+    assert incident.last_seen == first + timedelta(minutes=5)
+    assert incident.last_file == "other.log"
+
+    different = [line.replace("ZeroDivisionError", "ValueError") for line in TRACEBACK]
+    _feed(tracker, different)
+    tracker.flush()
+    assert len(tracker.incidents) == 2
+
+
+def test_chained_traceback_and_partial_writes():
+    tracker = IncidentTracker()
+    chained = [
+        "Traceback (most recent call last):",
+        '  File "db.py", line 3, in connect',
+        "ConnectionError: refused",
+        "During handling of the above exception, another exception occurred:",
+        "Traceback (most recent call last):",
+        '  File "app.py", line 9, in start',
+    ]
+    assert _feed(tracker, chained) == [1]
+
+    # The final exception line has not been written yet
+    assert tracker.flush() == []
+    line = "RuntimeError: startup failed"
+    assert not tracker.feed("app.log", 7, 7, line, line, datetime.now(), True)
+    [incident] = tracker.flush()
+    assert incident.title == "RuntimeError: startup failed"
+
+
+def test_single_line_errors_are_normalized():
+    assert normalize_message("user 42 failed at 0xdeadbeef: 'bob'") == (
+        "user <num> failed at <hex>: <str>"
+    )
+    tracker = IncidentTracker()
+    _feed(
+        tracker,
+        [
+            "2024-01-01 12:00:00 ERROR: request 17 timed out",
+            "2024-01-01 12:00:01 ERROR: request 93 timed out",
+            "2024-01-01 12:00:02 ERROR: disk full",
+        ],
+    )
+    tracker.flush(force=True)
+    counts = sorted(incident.count for incident in tracker.incidents.values())
+    assert counts == [1, 2]
@@ -0,0 +1,188 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the persistent SQLite log index."""
+
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from vectras.utils.log_incidents import IncidentTracker
+from vectras.utils.log_index import LogIndex
+from vectras.utils.log_store import FLAG_CONTINUATION, FLAG_ERROR, SEVERITY_CODES, to_micros
+
+START = datetime(2024, 1, 1, 12)
+
+
+def _rows(lines, start_line=1):
+    """Index rows for (content, severity) pairs, one second apart."""
+    rows = []
+    for offset, (content, severity) in enumerate(lines):
+        flags = FLAG_ERROR if severity == "error" else 0
+        rows.append(
+            (
+                start_line + offset,
+                to_micros(START + timedelta(seconds=start_line + offset)),
+                SEVERITY_CODES[severity],
+                "database_error" if severity == "error" else None,
+                flags,
+                content,
+            )
+        )
+    return rows
+
+
+def test_search_and_filters(tmp_path):
+    index = LogIndex(tmp_path / "logs.db", batch_rows=2)
+    api = index.file_id("1:10", "/logs/api.log")
+    worker = index.file_id("1:11", "/logs/worker.log")
+    index.add(api, _rows([("INFO: job 1 done", "info"), ("ERROR: Job 150 failed", "error")]))
+    index.add(worker, _rows([("ERROR: job 7 failed", "error"), ("Ünïcode ÄBC", "info")]))
+    index.add(worker, [(3, to_micros(START), 1, None, FLAG_CONTINUATION, "  at job()")])
+    index.commit()
+
+    total, records = index.search("JOB 150")
+    assert total == 1 and records[0].file_path == "/logs/api.log"
+    assert records[0].severity == "error" and records[0].line_number == 2
+
+    total, records = index.search(r"job \d+ failed", regex=True)
+    assert [r.content for r in records] == ["ERROR: job 7 failed", "ERROR: Job 150 failed"]
+    assert index.search("job", case_sensitive=True)[0] == 3
+    assert index.search("äbc")[0] == 1
+    assert index.search("b", min_severity="error")[0] == 2
+    assert index.search("failed", paths=["/logs/worker.log"])[0] == 1
+    assert index.search("job", offset=1, limit=1)[1][0].content == "ERROR: job 7 failed"
+    with pytest.raises(re.error):
+        index.search("(", regex=True)
+
+    assert index.count() == 5
+    assert index.count(errors_only=True) == 2
+    assert index.count(start=START + timedelta(seconds=2)) == 2
+    assert [r.line_number for r in index.time_range(errors_only=True)] == [2, 1]
+    assert sorted(index.paths()) == ["/logs/api.log", "/logs/worker.log"]
+
+
+def test_history_survives_reopening_and_reconcile(tmp_path):
+    path = tmp_path / "logs.db"
+    index = LogIndex(path)
+    file_id = index.file_id("1:10", "/logs/api.log")
+    index.add(file_id, _rows([(f"INFO: request {i}", "info") for i in range(10)]))
+    segment = index.file_id("1:20", "/logs/old.log")
+    index.add(segment, _rows([("INFO: old", "info")]))
+    index.close()
+
+    index = LogIndex(path)
+    assert index.count() == 11
+    # The checkpoint was saved after line 6 and the segment was never registered
+    assert index.reconcile({"1:10": 6}) == 5
+    assert index.count() == 6
+    assert index.paths() == ["/logs/api.log"]
+
+    index.move_source("1:10", "segment-checksum")
+    assert index.reconcile({"segment-checksum": None}) == 0
+    assert index.retire_source("segment-checksum") == 6
+    assert index.count() == 0
+
+
+def test_retention(tmp_path):
+    index = LogIndex(tmp_path / "logs.db")
+    file_id = index.file_id("1:10", "/logs/api.log")
+    index.add(file_id, _rows([(f"INFO: request {i}", "info") for i in range(10)]))
+
+    assert index.enforce_retention(max_rows=8) == 2
+    assert index.count() == 8
+    removed = index.enforce_retention(
+        max_age=timedelta(seconds=5), now=START + timedelta(seconds=10)
+    )
+    assert removed == 2
+    assert [r.line_number for r in index.time_range(limit=10)] == [10, 9, 8, 7, 6, 5]
+    assert index.search("request 2")[0] == 0
+
+
+def test_retention_bounds_size_on_disk(tmp_path):
+    index = LogIndex(tmp_path / "logs.db")
+    file_id = index.file_id("1:10", "/logs/api.log")
+    index.add(
+        file_id,
+        _rows([(f"INFO: request {i} served /api/items/{i * 7919}", "info") for i in range(20_000)]),
+    )
+    index.commit()
+    size = index.size_bytes()
+    limit = size // 2
+
+    removed = index.enforce_retention(max_bytes=limit)
+    assert 0 < removed < 20_000
+    # Freed pages are returned, not only the lines removed
+    assert index.size_bytes() <= limit
+    assert index.stats()["size_bytes"] == index.size_bytes()
+    newest = index.time_range(limit=1)[0]
+    assert newest.line_number == 20_000
+    assert index.search("request 19999")[0] == 1
+    assert index.search("request 1 served")[0] == 0
+    assert index.enforce_retention(max_bytes=limit) == 0
+
+
+def test_retention_skips_work_within_limits(tmp_path):
+    index = LogIndex(tmp_path / "logs.db")
+    file_id = index.file_id("1:10", "/logs/api.log")
+    index.add(
+        file_id,
+        _rows([(f"INFO: request {i} served /api/items/{i * 7919}", "info") for i in range(5000)]),
+    )
+    index.commit()
+    statements = []
+    index._conn.set_trace_callback(statements.append)
+
+    assert index.enforce_retention(max_rows=5000, max_bytes=index.size_bytes() * 2) == 0
+    assert not any("OFFSET" in sql or "optimize" in sql for sql in statements)
+
+    # A trim merges the text index once, not once per batch of lines removed
+    statements.clear()
+    assert index.enforce_retention(max_bytes=index.size_bytes() // 4) > 0
+    assert sum("'optimize'" in sql for sql in statements) == 1
+
+
+def test_existing_database_switches_to_incremental_vacuum(tmp_path):
+    path = tmp_path / "logs.db"
+    sqlite3.connect(str(path)).execute("CREATE TABLE legacy (id INTEGER)").connection.close()
+
+    index = LogIndex(path)
+    assert index._conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_incidents_round_trip(tmp_path):
+    tracker = IncidentTracker()
+    for second in range(3):
+        tracker.feed("api.log", second, second + 1, "x", "ERROR: db down 42", START, True, "db")
+        tracker.flush(force=True)
+    tracker.feed("api.log", 9, 9, "x", "ERROR: disk full", START, True, "disk")
+    tracker.flush(force=True)
+
+    path = tmp_path / "logs.db"
+    index = LogIndex(path)
+    index.save_incidents(tracker.take_updated())
+    index.close()
+    assert tracker.take_updated() == []
+
+    index = LogIndex(path)
+    total, unique, by_type = index.error_summary()
+    assert (total, unique) == (4, 2)
+    assert by_type[0][:2] == ("db", 3)
+    [top] = index.top_incidents(1)
+    assert top.count == 3 and top.title == "ERROR: db down 42"
+
+    restored = IncidentTracker()
+    restored.restore(index.load_incidents())
+    assert restored.total == 4
+    assert restored.top(1)[0].fingerprint == top.fingerprint
+
+
+def test_summaries_round_trip(tmp_path):
+    path = tmp_path / "logs.db"
+    index = LogIndex(path)
+    assert index.load_summary("heavy_hitters") is None
+    index.save_summary("heavy_hitters", {"total": 3})
+    index.close()
+    assert LogIndex(path).load_summary("heavy_hitters") == {"total": 3}
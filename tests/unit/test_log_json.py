@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for structured JSON-lines logs."""
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+from vectras.utils.log_json import JSON_FORMAT, TEXT_FORMAT, parse_record, sniff_format
+from vectras.utils.log_parallel import parse_lines
+from vectras.utils.log_parser import LogClassifier
+
+TRACEBACK = (
+    "Traceback (most recent call last):\n"
+    '  File "/srv/app/db.py", line 12, in connect\n'
+    "    raise ConnectionError('refused')\n"
+    "ConnectionError: refused"
+)
+
+
+def test_sniff_format(tmp_path):
+    json_log = tmp_path / "app.log"
+    json_log.write_text('{"level": "info", "msg": "up"}\n\n{"level": "warn", "msg": "slow"}\n')
+    text_log = tmp_path / "text.log"
+    text_log.write_text('2024-01-01 12:00:00 INFO: {"not": "structured"}\nplain line\n')
+    compressed = tmp_path / "app.log.1.gz"
+    compressed.write_bytes(gzip.compress(b'{"level": 30, "msg": "up"}\n'))
+    empty = tmp_path / "empty.log"
+    empty.write_text("")
+
+    assert sniff_format(json_log) == JSON_FORMAT
+    assert sniff_format(compressed) == JSON_FORMAT
+    assert sniff_format(text_log) == TEXT_FORMAT
+    assert sniff_format(empty) == TEXT_FORMAT
+    assert sniff_format(tmp_path / "missing.log") == TEXT_FORMAT
+
+
+def test_parse_record_levels_and_timestamps():
+    timestamp, severity, content, exception = parse_record(
+        '{"time": 1704110400000, "level": 50, "name": "api", "msg": "request  failed"}'
+    )
+    assert severity == "error"
+    assert timestamp == datetime.fromtimestamp(1704110400)
+    assert content == "ERROR: [api] request failed"
+    assert exception is None
+
+    timestamp, severity, content, _exc = parse_record(
+        '{"@timestamp": "2024-01-01T12:00:00+00:00", "levelname": "WARNING", "message": "slow"}'
+    )
+    assert severity == "warning"
+    expected = datetime(2024, 1, 1, 12, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert timestamp == expected
+    assert content == "WARNING: slow"
+
+    # An unknown level keeps its name but leaves the severity to the classifier
+    _ts, severity, content, _exc = parse_record('{"level": "audit", "event": "login"}')
+    assert severity is None and content == "AUDIT: login"
+
+
+def test_parse_record_exceptions_and_fallback():
+    record = json.dumps({"level": "error", "msg": "db down", "exc_info": TRACEBACK})
+    _ts, severity, content, exception = parse_record(record)
+    assert severity == "error"
+    assert content == "ERROR: db down | ConnectionError: refused"
+    assert exception == TRACEBACK
+
+    record = json.dumps({"level": "error", "err": {"type": "TypeError", "message": "bad"}})
+    assert parse_record(record)[3] == "TypeError: bad"
+
+    assert parse_record("{not json") is None
+    assert parse_record("[1, 2]") is None
+
+
+def test_parse_lines_uses_fields_for_json_lines():
+    lines = [
+        # The message mentions an error, but the record says it is informational
+        '{"level": "info", "msg": "retrying after error"}',
+        '{"level": "error", "msg": "gave up", "exception": "ValueError: x"}',
+        "2024-01-01 12:00:00 ERROR: plain text line",
+    ]
+    parsed = parse_lines(lines, LogClassifier(), json_lines=True)
+
+    assert [line[4] for line in parsed] == ["info", "error", "error"]
+    assert parsed[0][5] is None
+    assert parsed[1][5] == "exception" and parsed[1][6] == "ValueError: x"
+    assert parsed[2][2] == datetime(2024, 1, 1, 12) and parsed[2][6] is None
@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for bulk scanning of log files through mmap."""
+
+from vectras.utils import log_mmap
+from vectras.utils.log_mmap import candidate_literals, scan_candidates
+from vectras.utils.log_parser import DEFAULT_CLASSIFIER, LogClassifier
+
+LINES = [
+    "2024-01-01 12:00:00 INFO: started",
+    "2024-01-01 12:00:01 ERROR: Unhandled exception",
+    "Traceback (most recent call last):",
+    '  File "app.py", line 10, in handler',
+    "    compute()",
+    "ZeroDivisionError: division by zero",
+    "2024-01-01 12:00:02 DEBUG: cache hit",
+    "2024-01-01 12:00:03 Warning: disk at 91%",
+    "2024-01-01 12:00:04 INFO: GET /users returned status 503",
+    "2024-01-01 12:00:05 INFO: done",
+]
+
+
+def test_candidates_cover_every_warning_and_error():
+    literals = candidate_literals(DEFAULT_CLASSIFIER)
+    for line in LINES:
+        severity, error_type = DEFAULT_CLASSIFIER.classify(line)
+        if severity in ("warning", "error", "critical") or error_type is not None:
+            assert any(literal in line.lower().encode() for literal in literals), line
+    assert not any(literal in b"2024-01-01 12:00:00 info: started" for literal in literals)
+
+    assert candidate_literals(LogClassifier([r"\d{3} ms"])) is not None
+    # A configured pattern without a required literal may match any line
+    assert candidate_literals(LogClassifier([r"\d+"])) is None
+
+
+def test_scan_candidates(tmp_path, monkeypatch):
+    path = tmp_path / "app.log"
+    data = ("\n".join(LINES) + "\n2024-01-01 12:00:06 ERROR: partial").encode()
+    path.write_bytes(data)
+    literals = candidate_literals(DEFAULT_CLASSIFIER)
+
+    groups = scan_candidates(str(path), 0, len(data), literals)
+    # Traceback frames are kept with the line above them
+    expected = [
+        (1, LINES[1:2]),
+        (2, LINES[2:5]),
+        (5, LINES[5:6]),
+        (7, LINES[7:8]),
+        (8, LINES[8:9]),
+        (10, ["2024-01-01 12:00:06 ERROR: partial"]),
+    ]
+    assert groups == expected
+
+    # Blocks end on line boundaries and never split a traceback
+    monkeypatch.setattr(log_mmap, "SCAN_BLOCK_BYTES", 16)
+    assert scan_candidates(str(path), 0, len(data), literals) == expected
+
+    # Ranges start on a line boundary; the partial line is left out
+    start = len("\n".join(LINES[:6])) + 1
+    end = len("\n".join(LINES)) + 1
+    assert scan_candidates(str(path), start, end, literals) == [(1, LINES[7:8]), (2, LINES[8:9])]
@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for parallel log parsing."""
+
+from datetime import date
+
+from vectras.utils.log_parallel import LogParserPool, parse_lines, split_lines, split_ranges
+from vectras.utils.log_parser import LogClassifier
+
+LINES = [
+    f"2024-01-01 12:00:{i % 60:02d} {'ERROR: failed' if i % 7 == 0 else 'INFO: request'} {i}"
+    for i in range(500)
+]
+
+
+def test_split_ranges_are_newline_aligned(tmp_path):
+    log = tmp_path / "app.log"
+    data = ("\n".join(LINES) + "\n").encode()
+    log.write_bytes(data)
+
+    ranges = split_ranges(str(log), 0, len(data), chunk_bytes=1000)
+    assert len(ranges) > 5
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_start, end), (next_start, _end) in zip(ranges, ranges[1:], strict=False):
+        assert end == next_start
+        assert data[end - 1 : end] == b"\n"
+
+    lines = [line for start, end in ranges for line in split_lines(data[start:end])]
+    assert lines == LINES
+
+
+def test_pool_matches_inline_parsing(tmp_path):
+    log = tmp_path / "app.log"
+    data = ("\n".join(LINES) + "\n\n").encode()
+    log.write_bytes(data)
+    today = date(2024, 1, 1)
+    classifier = LogClassifier(["request 42"])
+    expected = parse_lines(split_lines(data), classifier, today)
+
+    pool = LogParserPool(["request 42"], max_workers=2)
+    try:
+        ranges = split_ranges(str(log), 0, len(data), chunk_bytes=2000)
+        merged = []
+        first = 0
+        for line_count, parsed in pool.parse([(str(log), s, e, False) for s, e in ranges], today):
+            merged.extend((first + index, *rest) for index, *rest in parsed)
+            first += line_count
+    finally:
+        pool.close()
+
+    assert merged == expected
+    assert first == len(LINES) + 1
+    assert any(line[5] == "custom_pattern" for line in merged)
@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the compiled log line classifier and timestamp parser."""
+
+import re
+from datetime import date, datetime
+
+import pytest
+
+from vectras.utils.log_parser import (
+    CUSTOM_ERROR_TYPE,
+    DEFAULT_CLASSIFIER,
+    ERROR_TYPE_PATTERNS,
+    LogClassifier,
+    parse_timestamp,
+)
+
+LINES = [
+    "INFO: Application started",
+    "ERROR: Database connection failed",
+    "warning: disk almost full",
+    "FATAL error while booting",
+    "GET /api returned HTTP 503 after timeout",
+    "ModuleNotFoundError: No module named 'foo'",
+    "connection refused by PermissionError handler",
+    "open failed: No such file or directory",
+    "Traceback (most recent call last):",
+    "debug: value=3",
+    "status code 404 while fetching; Access is denied",
+    "",
+]
+
+
+def _reference(content):
+    """The original per-line classification rules."""
+    upper = content.upper()
+    if "CRITICAL" in upper or "FATAL" in upper:
+        severity = "critical"
+    elif "ERROR" in upper:
+        severity = "error"
+    elif "WARN" in upper:
+        severity = "warning"
+    elif "INFO" in upper:
+        severity = "info"
+    else:
+        severity = "debug"
+    for name, pattern in ERROR_TYPE_PATTERNS:
+        if re.search(pattern, content, re.IGNORECASE):
+            return severity, name
+    return severity, None
+
+
+@pytest.mark.parametrize("line", LINES)
+def test_classifier_matches_original_rules(line):
+    assert DEFAULT_CLASSIFIER.classify(line) == _reference(line)
+
+
+def test_error_type_priority_beats_position():
+    # file_error appears first but exception has priority
+    assert DEFAULT_CLASSIFIER.error_type("No such file: ValueError: bad") == "exception"
+
+
+def test_configured_error_patterns():
+    classifier = LogClassifier(["OOMKilled", "panic(", "ERROR"])
+    assert classifier.classify("container OOMKilled") == ("debug", CUSTOM_ERROR_TYPE)
+    assert classifier.error_type("kernel panic(0x1)") == CUSTOM_ERROR_TYPE
+    assert classifier.error_type("Traceback (most recent call last):") == "exception"
+    assert classifier.error_type("all good") is None
+
+
+def test_parse_timestamp_formats():
+    assert parse_timestamp("2024-01-02 03:04:05 INFO: ok") == (
+        datetime(2024, 1, 2, 3, 4, 5),
+        "INFO: ok",
+    )
+    assert parse_timestamp("2024-01-02T03:04:05.250 x") == (
+        datetime(2024, 1, 2, 3, 4, 5, 250000),
+        "x",
+    )
+    assert parse_timestamp("01/02/2024 03:04:05 y") == (datetime(2024, 1, 2, 3, 4, 5), "y")
+    assert parse_timestamp("03:04:05,1 z", today=date(2024, 5, 6)) == (
+        datetime(2024, 5, 6, 3, 4, 5, 100000),
+        "z",
+    )
+
+
+@pytest.mark.parametrize(
+    "line", ["no timestamp here", "2024-13-02 03:04:05 bad month", "2024-01-02 aa:04:05", "1:2:3"]
+)
+def test_parse_timestamp_rejects_invalid(line):
+    assert parse_timestamp(line) == (None, line)
@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the log query language."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from vectras.utils.log_query import QueryError, parse_query
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+def test_parse_conditions():
+    query = parse_query(
+        'level>=error service:coding,api since:15m "ZeroDivisionError: x" /fail(ed)?/ timeout',
+        now=NOW,
+    )
+    assert query.severities == ["error", "critical"]
+    assert query.services == ["coding", "api"]
+    assert query.start == NOW - timedelta(minutes=15) and query.end is None
+    assert query.terms == ["ZeroDivisionError: x", "timeout"]
+    assert query.regexes == ["fail(ed)?"]
+    assert query.describe()[0] == "time range 2024-01-01 11:45:00 to now"
+
+    query = parse_query(
+        "level>debug level<error file:*.log type:Connection_Error is:error "
+        "until:2024-01-01T11:00:00 http://host/path",
+        now=NOW,
+    )
+    assert query.severities == ["info", "warning"]
+    assert query.files == ["*.log"]
+    assert query.error_types == ["connection_error"]
+    assert query.errors_only
+    assert query.end == datetime(2024, 1, 1, 11)
+    # Unknown fields are plain text
+    assert query.terms == ["http://host/path"]
+
+    assert parse_query("level:warn").severities == ["warning"]
+    assert parse_query("").to_dict()["terms"] == []
+
+
+def test_matches_text_conditions():
+    query = parse_query('"db DOWN" /retry \\d+/')
+    assert query.matches("ERROR: DB down, retry 3")
+    assert not query.matches("ERROR: db down")
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["level>=loud", "since:yesterday", "service>api", "/(/", "is:info", "is:error is:warning"],
+)
+def test_invalid_queries(text):
+    with pytest.raises(QueryError):
+        parse_query(text)
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for rotated and compressed log segments."""
+
+import gzip
+from pathlib import Path
+
+from vectras.utils import log_rotation
+from vectras.utils.log_rotation import (
+    iter_segment_lines,
+    order_rotation_chains,
+    parse_segment_name,
+)
+
+
+def test_parse_segment_name():
+    assert parse_segment_name("app.log") == ("app.log", 0, None)
+    assert parse_segment_name("app.log.1") == ("app.log", 1, None)
+    assert parse_segment_name("app.log.12.gz") == ("app.log", 12, ".gz")
+    assert parse_segment_name("app.log.gz") == ("app.log", 1, ".gz")
+    assert parse_segment_name("app.log.swp") is None
+    assert parse_segment_name("notes.md") is None
+    if not log_rotation.HAS_ZSTD:
+        assert parse_segment_name("app.log.2.zst") is None
+
+
+def test_rotation_chain_is_ordered_oldest_first():
+    paths = [
+        Path("logs/app.log"),
+        Path("logs/app.log.1"),
+        Path("logs/app.log.10.gz"),
+        Path("logs/app.log.2.gz"),
+        Path("logs/api.err"),
+        Path("logs/app.log.swp"),
+    ]
+    assert order_rotation_chains(paths) == [
+        Path("logs/api.err"),
+        Path("logs/app.log.10.gz"),
+        Path("logs/app.log.2.gz"),
+        Path("logs/app.log.1"),
+        Path("logs/app.log"),
+    ]
+
+
+def test_gzip_segment_is_streamed_in_blocks(tmp_path):
+    segment = tmp_path / "app.log.1.gz"
+    lines = [f"line {i}" for i in range(1000)]
+    with gzip.open(segment, "wt") as f:
+        f.write("\n".join(lines))  # no trailing newline
+
+    batches = list(iter_segment_lines(segment, block_size=512))
+    assert len(batches) > 10
+    assert [line for batch in batches for line in batch] == lines
+
+    skip = len("line 0\nline 1\n")
+    assert next(iter_segment_lines(segment, skip_bytes=skip))[0] == "line 2"
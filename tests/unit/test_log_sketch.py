@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the heavy-hitter error message sketches."""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from vectras.utils.log_sketch import HeavyHitterWindows, SpaceSaving
+
+START = datetime(2024, 1, 1, 12)
+
+
+def test_space_saving_keeps_frequent_messages():
+    rng = random.Random(7)
+    stream = [f"rare {i}" for i in range(2000)] + ["db down"] * 300 + ["disk full"] * 150
+    rng.shuffle(stream)
+    sketch = SpaceSaving(capacity=20)
+    for message in stream:
+        sketch.add(message)
+
+    assert len(sketch.counters) == 20 and sketch.total == len(stream)
+    top = sketch.top(2)
+    assert [hitter.message for hitter in top] == ["db down", "disk full"]
+    truth = Counter(stream)
+    for hitter in sketch.counters.values():
+        # Counts are overestimated by at most their error bound
+        assert hitter.guaranteed <= truth[hitter.message] <= hitter.count
+
+
+def test_merge_bounds_missing_counts():
+    first, second = SpaceSaving(capacity=2), SpaceSaving(capacity=2)
+    for message in ["a", "a", "a", "b", "c"]:
+        first.add(message)
+    for message in ["a", "d", "d"]:
+        second.add(message)
+
+    merged = SpaceSaving.merge([first, second], capacity=3)
+    assert merged.total == 8
+    a, d = merged.top(2)
+    assert (a.message, a.count, a.error) == ("a", 4, 0)
+    # "d" may have been among the occurrences "first" no longer monitors
+    assert (d.message, d.guaranteed, d.count) == ("d", 2, 4)
+
+
+def test_windows_and_restore():
+    windows = HeavyHitterWindows(window_seconds=60, max_windows=3, capacity=4)
+    for minute in range(5):
+        for attempt in range(minute + 1):
+            windows.add(
+                f"ERROR: timeout after {attempt}s on job {minute}",
+                START + timedelta(minutes=minute),
+                "timeout",
+            )
+    windows.add("ERROR: late straggler", START, "other")
+
+    [hitter] = windows.top(1)
+    assert hitter.message == "ERROR: timeout after <num>s on job <num>" and hitter.count == 15
+    assert hitter.error_type == "timeout" and hitter.last_seen == START + timedelta(minutes=4)
+    # The straggler is older than every window kept
+    assert [(start, errors) for start, errors, _ in windows.by_window()] == [
+        (START + timedelta(minutes=4), 5),
+        (START + timedelta(minutes=3), 4),
+        (START + timedelta(minutes=2), 3),
+    ]
+    assert windows.top(1, windows=2)[0].count == 9
+
+    restored = HeavyHitterWindows(window_seconds=60, max_windows=3, capacity=4)
+    restored.restore(windows.to_dict())
+    assert restored.top(2)[1].message == "ERROR: late straggler"
+    assert restored.by_window()[0][1] == 5
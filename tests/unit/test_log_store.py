@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the columnar log store."""
+
+from datetime import datetime, timedelta
+
+from vectras.utils.log_store import LogStore, from_micros, to_micros
+
+
+def _fill(store, path="app.log", count=10):
+    file_id = store.intern_file(path)
+    for i in range(count):
+        severity = ["info", "warning", "error"][i % 3]
+        error_type = "exception" if i == 4 else None
+        store.append(file_id, i + 1, datetime(2024, 1, 1, 12, 0, i), severity, error_type, f"l{i}")
+    return file_id
+
+
+def test_micros_round_trip():
+    timestamp = datetime(2024, 5, 6, 7, 8, 9, 123456)
+    assert from_micros(to_micros(timestamp)) == timestamp
+
+
+def test_append_and_record():
+    store = LogStore()
+    _fill(store, count=3)
+    record = store.record(2)
+    assert record.file_path == "app.log"
+    assert record.line_number == 3
+    assert record.content == "l2"
+    assert record.severity == "error"
+    assert record.is_error
+    assert record.timestamp == datetime(2024, 1, 1, 12, 0, 2)
+    assert record.to_dict()["content"] == "l2"
+
+
+def test_column_filters():
+    store = LogStore()
+    app = _fill(store, "app.log")
+    other = _fill(store, "other.log", count=3)
+
+    # Rows 2, 5, 8 are error lines and row 4 has an error type
+    assert list(store.rows(errors_only=True, file_ids=[app])) == [2, 4, 5, 8]
+    assert list(store.rows(warnings_only=True, file_ids=[app])) == [1, 7]
+    assert store.count(min_severity="warning") == 8
+    assert list(store.rows(error_types=["exception"])) == [4]
+    assert list(store.rows(file_ids=[other])) == [10, 11, 12]
+    assert list(store.rows(start_id=3, end_id=6, severities=["info"])) == [3]
+    assert [r.row_id for r in store.latest(2, errors_only=True)] == [12, 8]
+
+
+def test_retire_file_hides_rows():
+    store = LogStore()
+    _fill(store, "app.log", count=3)
+    assert store.retire_file("app.log") == 3
+    assert store.count() == 0
+
+    # A new generation of the same path gets a fresh file id
+    _fill(store, "app.log", count=2)
+    assert list(store.rows()) == [3, 4]
+    assert store.record(3).file_path == "app.log"
+
+
+def test_memory_bound_evicts_oldest_rows():
+    store = LogStore(max_bytes=2000)
+    file_id = store.intern_file("app.log")
+    for i in range(200):
+        store.append(file_id, i + 1, datetime(2024, 1, 1), "info", None, "x" * 20)
+
+    assert store.memory_size <= 2000
+    assert store.evicted_rows > 0
+    assert store.first_id == store.evicted_rows
+    assert store.record(199).content == "x" * 20
+    assert list(store.rows())[0] == store.first_id
+    assert len(store.file_rows[file_id]) == len(store)
+
+
+def test_retention_by_count_and_age():
+    store = LogStore(max_rows=6)
+    _fill(store, count=10)
+    assert store.enforce_retention() == 4
+    assert list(store.rows()) == [4, 5, 6, 7, 8, 9]
+
+    store.max_age = timedelta(seconds=3)
+    # Rows stamped before 12:00:07 are older than three seconds at 12:00:10
+    assert store.enforce_retention(now=datetime(2024, 1, 1, 12, 0, 10)) == 3
+    assert store.first_id == 7
+    assert store.evicted_rows == 7
+    assert store.time_index.entry_count == 3
+    assert store.time_range(datetime(2024, 1, 1), datetime(2024, 1, 2)) == [7, 8, 9]
+
+
+def test_time_range_queries():
+    store = LogStore()
+    file_id = store.intern_file("app.log")
+    # Out-of-order timestamps, several per minute
+    times = [(12, 0, 10), (12, 5, 30), (12, 1, 0), (12, 1, 59), (12, 3, 0), (11, 59, 59)]
+    for i, (h, m, sec) in enumerate(times):
+        severity = "error" if i % 2 else "info"
+        store.append(file_id, i + 1, datetime(2024, 1, 1, h, m, sec), severity, None, f"l{i}")
+
+    window = store.time_range(datetime(2024, 1, 1, 12, 0, 30), datetime(2024, 1, 1, 12, 3, 0))
+    assert window == [2, 3]
+    assert store.time_range(datetime(2024, 1, 1, 12, 1), errors_only=True) == [3, 1]
+    assert store.time_range(end=datetime(2024, 1, 1, 12, 0, 10)) == [5]
+    assert store.time_range(reverse=True)[0] == 1
+
+    # Evicted rows leave the index
+    store.discard_before(3)
+    assert store.time_range() == [5, 3, 4]
+    assert len(store.time_index.buckets) == 3
+
+
+def test_search_with_index_and_filters():
+    store = LogStore()
+    app = store.intern_file("app.log")
+    other = store.intern_file("other.log")
+    for i in range(300):
+        file_id = app if i % 2 else other
+        severity = "error" if i % 10 == 0 else "info"
+        content = f"request {i} failed: ZeroDivisionError" if i % 50 == 0 else f"request {i} ok"
+        store.append(file_id, i + 1, datetime(2024, 1, 1), severity, None, content)
+
+    total, records = store.search("zerodivisionerror")
+    assert total == 6
+    assert [r.row_id for r in records] == [250, 200, 150, 100, 50, 0]
+    assert store.indexed_until == 256
+
+    total, records = store.search("ZeroDivision", case_sensitive=True, offset=2, limit=2)
+    assert total == 6
+    assert [r.row_id for r in records] == [150, 100]
+
+    total, _ = store.search(r"request 2\d0 failed", regex=True)
+    assert total == 2
+
+    total, records = store.search("request 1", file_ids=[app], min_severity="error")
+    assert total == 0
+    total, records = store.search("request 1", file_ids=[other], min_severity="error")
+    assert [r.row_id for r in records] == [190, 180, 170, 160, 150, 140, 130, 120, 110, 100, 10][
+        :20
+    ]
+    assert total == 11
+
+    # Queries too short for trigrams fall back to a column scan
+    total, _ = store.search("29", limit=1)
+    assert total == 13
@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for streaming ingested log lines to live subscribers."""
+
+import asyncio
+import re
+import threading
+from datetime import datetime
+
+import pytest
+
+from vectras.utils.log_store import LogRecord
+from vectras.utils.log_stream import LogBroadcaster, TailFilter
+
+
+def _record(row_id, path, content, severity="info", error_type=None):
+    return LogRecord(row_id, path, row_id, content, datetime(2024, 1, 1), severity, error_type)
+
+
+RECORDS = [
+    _record(1, "/logs/api.log", "GET /users ok"),
+    _record(2, "/logs/api.log", "Database connection failed", "error", "database_error"),
+    _record(3, "/logs/worker.log", "queue slow", "warning"),
+    _record(4, "/logs/worker.log", "Job 42 crashed", "critical"),
+]
+
+
+def test_tail_filter():
+    def matching(tail_filter):
+        return [record.row_id for record in RECORDS if tail_filter.matches(record)]
+
+    assert matching(TailFilter()) == [1, 2, 3, 4]
+    assert matching(TailFilter(level="WARNING")) == [2, 3, 4]
+    assert matching(TailFilter(file_pattern="worker")) == [3, 4]
+    assert matching(TailFilter(file_pattern="api.*")) == [1, 2]
+    assert matching(TailFilter(error_type="database_error")) == [2]
+    assert matching(TailFilter(level="error", regex=r"Job \d+")) == [4]
+
+    with pytest.raises(ValueError):
+        TailFilter(level="loud")
+    with pytest.raises(re.error):
+        TailFilter(regex="(")
+
+
+@pytest.mark.asyncio
+async def test_broadcaster_delivers_across_threads_and_drops_slow_subscribers():
+    broadcaster = LogBroadcaster()
+    errors = broadcaster.subscribe(TailFilter(level="error"))
+    slow = broadcaster.subscribe(TailFilter(), buffer_size=2)
+
+    # Ingestion publishes from a worker thread
+    thread = threading.Thread(target=broadcaster.publish, args=(RECORDS[:2],))
+    thread.start()
+    thread.join()
+    assert [r.row_id for r in await asyncio.wait_for(errors.get(), 1)] == [2]
+    assert await errors.get(timeout=0.01) == []
+
+    # slow never read its full buffer, so it is dropped when more lines arrive
+    broadcaster.publish(RECORDS[2:])
+    assert slow.dropped
+    assert await slow.get(timeout=1) is None
+    assert broadcaster.stats() == {
+        "subscribers": 1,
+        "published_lines": 4,
+        "dropped_subscribers": 1,
+    }
+    assert [r.row_id for r in await errors.get(timeout=1)] == [4]
+
+    broadcaster.unsubscribe(errors)
+    assert await errors.get(timeout=1) is None
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_larger_than_the_buffer_keeps_the_newest_lines():
+    broadcaster = LogBroadcaster()
+    subscriber = broadcaster.subscribe(TailFilter(), buffer_size=3)
+    burst = [_record(row_id, "/logs/api.log", f"failure {row_id}", "error") for row_id in range(10)]
+
+    broadcaster.publish(burst)
+    assert not subscriber.dropped
+    assert [r.row_id for r in await subscriber.get(timeout=1)] == [7, 8, 9]
+    assert subscriber.skipped == 7
+
+    # Having read its lines, it stays subscribed through the next burst
+    broadcaster.publish(burst)
+    assert [r.row_id for r in await subscriber.get(timeout=1)] == [7, 8, 9]
+    assert subscriber.skipped == 14
+    assert broadcaster.stats()["subscribers"] == 1
@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for incremental log tailing."""
+
+import os
+
+from vectras.utils import log_tail
+from vectras.utils.log_tail import LogTailer
+
+
+def _write(path, text, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_reads_only_appended_lines(tmp_path):
+    log = tmp_path / "app.log"
+    _write(log, "one\ntwo\n")
+    tailer = LogTailer()
+
+    chunk = tailer.read(log)
+    assert chunk.lines == ["one", "two"]
+    assert chunk.first_line == 1
+
+    _write(log, "three\n")
+    chunk = tailer.read(log)
+    assert list(chunk.numbered_lines()) == [(3, "three")]
+    assert chunk.start_offset == len("one\ntwo\n")
+
+    assert tailer.read(log).lines == []
+
+
+def test_partial_line_waits_for_newline(tmp_path, monkeypatch):
+    log = tmp_path / "app.log"
+    _write(log, "done\nhalf")
+    monkeypatch.setattr(log_tail, "PARTIAL_LINE_GRACE", 3600)
+    tailer = LogTailer()
+
+    assert tailer.read(log).lines == ["done"]
+    _write(log, " line\n")
+    assert tailer.read(log).lines == ["half line"]
+
+
+def test_truncation_restarts_from_beginning(tmp_path):
+    log = tmp_path / "app.log"
+    _write(log, "old line one\nold line two\n")
+    tailer = LogTailer()
+    tailer.read(log)
+
+    _write(log, "new\n", mode="w")
+    chunk = tailer.read(log)
+    assert chunk.truncated
+    assert chunk.lines == ["new"]
+    assert chunk.first_line == 1
+
+
+def test_rotation_is_detected_and_renamed_file_continues(tmp_path):
+    log = tmp_path / "app.log"
+    _write(log, "first\n")
+    tailer = LogTailer()
+    tailer.read(log)
+
+    rotated = tmp_path / "app.log.1"
+    os.rename(log, rotated)
+    _write(rotated, "late write\n")
+    _write(log, "fresh\n")
+
+    chunk = tailer.read(log)
+    assert chunk.rotated
+    assert chunk.lines == ["fresh"]
+
+    # The rotated file keeps its offset under its new name
+    chunk = tailer.read(rotated)
+    assert chunk.lines == ["late write"]
+    assert chunk.first_line == 2
+
+
+def test_checkpoints_survive_restart(tmp_path):
+    log = tmp_path / "app.log"
+    checkpoints = tmp_path / "data" / "offsets.json"
+    _write(log, "a\nb\n")
+
+    tailer = LogTailer(checkpoints)
+    tailer.read(log)
+    tailer.checkpoint(log).stats["errors"] = 2
+    tailer.save()
+
+    _write(log, "c\n")
+    restarted = LogTailer(checkpoints)
+    assert restarted.checkpoint(log).stats == {"errors": 2}
+    assert restarted.read(log).lines == ["c"]
+
+
+def test_forget_missing(tmp_path):
+    log = tmp_path / "app.log"
+    _write(log, "a\n")
+    tailer = LogTailer()
+    tailer.read(log)
+
+    os.unlink(log)
+    assert tailer.forget_missing([]) == [str(log)]
+    assert tailer.checkpoint(log) is None
+
+
+def test_line_marks_and_context(tmp_path, monkeypatch):
+    log = tmp_path / "app.log"
+    lines = [f"line {number}" for number in range(1, 24)]
+    _write(log, "\n".join(lines[:10]) + "\n")
+    monkeypatch.setattr(log_tail, "READ_BLOCK_SIZE", 16)
+    tailer = LogTailer(mark_interval=3)
+
+    tailer.read(log)
+    _write(log, "\n".join(lines[10:]) + "\n")
+    tailer.read(log, load_lines=False)
+
+    # Offsets of lines 1, 4, 7, ... whether the lines were loaded or only counted
+    data = log.read_bytes()
+    starts = [0] + [index + 1 for index, byte in enumerate(data[:-1]) if byte == ord("\n")]
+    assert tailer.checkpoint(log).marks == starts[::3]
+
+    assert tailer.context(log, 12, before=2, after=1) == [
+        (number, lines[number - 1]) for number in range(10, 14)
+    ]
+    assert tailer.context(log, 2, before=5, after=0) == [(1, "line 1"), (2, "line 2")]
+    assert tailer.context(log, 23, before=0, after=5) == [(23, "line 23")]
+
+    # Without marks the file is read from the start
+    assert LogTailer().context(log, 12, before=0, after=0) == [(12, "line 12")]
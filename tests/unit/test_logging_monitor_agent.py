@@ -3,14 +3,26 @@
 
 """Unit tests for log monitor agent."""
 
+import asyncio
+import gzip
+import json
 import tempfile
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from vectras.agents.logging_monitor import LogEntry, LogMonitorManager, app
+from vectras.agents import logging_monitor
+from vectras.agents.config import AgentSettings
+from vectras.agents.logging_monitor import LogMonitorManager, app
+from vectras.utils.log_anomaly import Anomaly, RateAnomalyDetector
+from vectras.utils.log_parser import LogClassifier
+from vectras.utils.log_query import parse_query
+from vectras.utils.log_store import LogRecord, LogStore
+from vectras.utils.log_stream import TailFilter
 
 
 @pytest.fixture
@@ -29,6 +41,7 @@ def log_monitor_manager(monkeypatch, temp_logs):
     # Create manager and then patch the instance attribute
     manager = LogMonitorManager()
     manager.logs_directory = temp_logs
+    manager.data_directory = temp_logs / ".data"
     yield manager
 
 
@@ -38,37 +51,29 @@ def test_client():
     return TestClient(app)
 
 
-def test_log_entry_creation():
-    """Test LogEntry creation and classification."""
-    # Test error entry
-    error_entry = LogEntry("test.log", 10, "2024-01-01 12:00:00 ERROR: Something went wrong")
+def test_log_line_classification():
+    """Test severity and error type classification of log lines."""
+    classifier = LogClassifier()
 
-    assert error_entry.severity == "error"
-    assert error_entry.is_error
-    assert error_entry.file_path == "test.log"
-    assert error_entry.line_number == 10
+    severity, _ = classifier.classify("2024-01-01 12:00:00 ERROR: Something went wrong")
+    assert severity == "error"
 
-    # Test info entry
-    info_entry = LogEntry("test.log", 5, "2024-01-01 12:00:00 INFO: Application started")
-
-    assert info_entry.severity == "info"
-    assert not info_entry.is_error
-
-    # Test exception entry
-    exception_entry = LogEntry(
-        "test.log",
-        15,
-        "Traceback (most recent call last):\n  File test.py, line 10, in <module>\nValueError: Invalid value",
+    assert classifier.classify("2024-01-01 12:00:00 INFO: Application started") == (
+        "info",
+        None,
     )
 
-    assert exception_entry.error_type == "exception"
-    assert exception_entry.is_error
+    _, error_type = classifier.classify(
+        "Traceback (most recent call last):\n  File test.py, line 10, in <module>\nValueError: Invalid value"
+    )
+    assert error_type == "exception"
 
 
-def test_log_entry_to_dict():
-    """Test LogEntry to_dict method."""
-    entry = LogEntry("test.log", 10, "ERROR: Test error")
-    entry_dict = entry.to_dict()
+def test_log_record_to_dict():
+    """Test LogRecord to_dict method."""
+    severity, error_type = LogClassifier().classify("ERROR: Test error")
+    record = LogRecord(0, "test.log", 10, "ERROR: Test error", datetime.now(), severity, error_type)
+    entry_dict = record.to_dict()
 
     assert entry_dict["file_path"] == "test.log"
     assert entry_dict["line_number"] == 10
@@ -101,23 +106,104 @@ async def test_check_logs(log_monitor_manager, temp_logs):
     assert "Log Check Results" in result
     assert "test.log" in result
 
-    @pytest.mark.asyncio
-    async def test_check_recent_logs(log_monitor_manager, temp_logs):
-        """Test checking recent logs."""
-        # Create a test log file
-        log_file = temp_logs / "recent.log"
-        log_content = """2024-01-01 12:00:00 INFO: Recent log entry
-    2024-01-01 12:01:00 ERROR: Recent error
-    """
-        log_file.write_text(log_content)
 
-        # First check logs to populate log_entries
-        await log_monitor_manager.check_logs()
+@pytest.mark.asyncio
+async def test_check_recent_logs(log_monitor_manager, temp_logs):
+    """Test checking recent logs over all ingested history."""
+    now = datetime.now()
+    old = (now - timedelta(hours=5)).strftime("%Y-%m-%d %H:%M:%S")
+    recent = (now - timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S")
+    lines = [f"{old} ERROR: old failure"]
+    lines += [f"{recent} INFO: request {i}" for i in range(150)]
+    lines.append(f"{recent} ERROR: Recent error")
+    (temp_logs / "recent.log").write_text("\n".join(lines) + "\n")
+
+    result = await log_monitor_manager.check_recent_logs()
+    assert "Recent Log Activity" in result
+    assert "Total Entries:** 151" in result
+    assert "Errors:** 1" in result
+    assert "Recent error" in result
+    assert "old failure" not in result
+
+    result = await log_monitor_manager.check_recent_logs(hours=6)
+    assert "Total Entries:** 152" in result
+
 
-        result = await log_monitor_manager.check_recent_logs()
-        assert "Recent Log Activity" in result
-        # The recent logs check might not show the file name in the output, so just check for the activity
-        assert "Total Entries" in result
+@pytest.mark.asyncio
+async def test_check_logs_is_incremental(log_monitor_manager, temp_logs):
+    """Test that repeated checks only parse newly appended lines."""
+    log_file = temp_logs / "app.log"
+    log_file.write_text("2024-01-01 12:00:00 ERROR: first failure\n")
+
+    await log_monitor_manager.check_logs()
+    assert log_monitor_manager.error_count == 1
+
+    result = await log_monitor_manager.check_logs()
+    assert "New Entries:** 0" in result
+    assert log_monitor_manager.error_count == 1
+
+    with open(log_file, "a") as f:
+        f.write("2024-01-01 12:01:00 ERROR: second failure\n")
+    result = await log_monitor_manager.check_logs()
+    assert "New Entries:** 1" in result
+    assert log_monitor_manager.error_count == 2
+
+    # A new manager resumes from the persisted checkpoints
+    restarted = LogMonitorManager()
+    restarted.logs_directory = temp_logs
+    restarted.data_directory = log_monitor_manager.data_directory
+    result = await restarted.check_logs()
+    assert "New Entries:** 0" in result
+    assert restarted.error_count == 2
+
+    # Truncation resets the totals for the file
+    log_file.write_text("2024-01-01 13:00:00 INFO: restarted\n")
+    await restarted.check_logs()
+    assert restarted.error_count == 0
+    assert restarted.total_entries == 1
+    assert restarted.index.count() == 1
+
+
+@pytest.mark.asyncio
+async def test_history_is_queried_from_persistent_index(log_monitor_manager, temp_logs):
+    """Test that search, recent activity and error summaries survive a restart."""
+    recent = (datetime.now() - timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S")
+    lines = [f"{recent} INFO: request {i}" for i in range(20)]
+    lines += [f"{recent} ERROR: Database connection failed (attempt {i})" for i in range(3)]
+    (temp_logs / "api.log").write_text("\n".join(lines) + "\n")
+    await log_monitor_manager.check_logs()
+    assert (log_monitor_manager.data_directory / "logging_monitor.db").exists()
+
+    restarted = LogMonitorManager()
+    restarted.logs_directory = temp_logs
+    restarted.data_directory = log_monitor_manager.data_directory
+    result = await restarted.search_logs("connection FAILED")
+    assert "Matches Found:** 3" in result
+    assert restarted.store.count() == 0
+
+    result = await restarted.check_recent_logs()
+    assert "Total Entries:** 23" in result
+    assert "Errors:** 3" in result
+
+    summary = await restarted.get_error_summary()
+    assert "**Total Errors:** 3" in summary
+    assert "**Unique Incidents:** 1" in summary
+    assert restarted.incidents.total == 3
+    # Message counts and templates are restored from the index
+    assert "`ERROR: Database connection failed (attempt <num>)` (×3, api)" in summary
+    assert "`ERROR: Database connection failed (attempt <num>)` (exception, ×3)" in summary
+
+    # A crash after the index commit but before the checkpoint save
+    with open(temp_logs / "api.log", "a") as f:
+        f.write(f"{recent} ERROR: Disk full\n")
+    restarted.ingest(force_save=False)
+    assert restarted.index.count() == 24
+    again = LogMonitorManager()
+    again.logs_directory = temp_logs
+    again.data_directory = restarted.data_directory
+    await again.check_logs()
+    assert again.index.count() == 24
+    assert again.index.search("Disk full")[0] == 1
 
 
 @pytest.mark.asyncio
@@ -136,6 +222,204 @@ async def test_search_logs(log_monitor_manager, temp_logs):
     assert "error" in result.lower()
 
 
+@pytest.mark.asyncio
+async def test_search_logs_filters_and_pages(log_monitor_manager, temp_logs):
+    """Test regex search with file and severity filters over all lines."""
+    lines = [f"2024-01-01 12:00:00 INFO: job {i} done" for i in range(200)]
+    lines[150] = "2024-01-01 12:00:00 ERROR: job 150 failed with ValueError"
+    (temp_logs / "worker.log").write_text("\n".join(lines) + "\n")
+    (temp_logs / "api.log").write_text("2024-01-01 12:00:00 ERROR: job 7 failed\n")
+
+    result = await log_monitor_manager.search_logs("job 150")
+    assert "Matches Found:** 1" in result
+    assert "worker.log" in result
+
+    result = await log_monitor_manager.search_logs(r"job \d+ failed", regex=True, severity="error")
+    assert "Matches Found:** 2" in result
+
+    result = await log_monitor_manager.search_logs("failed", file_pattern="api*")
+    assert "Matches Found:** 1" in result
+    assert "job 7" in result
+
+    result = await log_monitor_manager.search_logs("done", page=2, page_size=50)
+    assert "Matches Found:** 199" in result
+    assert "Page:** 2 of 4" in result
+
+    result = await log_monitor_manager.search_logs("(", regex=True)
+    assert "Invalid regular expression" in result
+
+
+@pytest.mark.asyncio
+async def test_query_logs(log_monitor_manager, temp_logs, monkeypatch):
+    """Test the query language through the tool, the HTTP endpoint and the store fallback."""
+    now = datetime.now()
+    old = (now - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S")
+    recent = (now - timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S")
+    (temp_logs / "coding.log").write_text(
+        f"{old} ERROR: ZeroDivisionError in old job\n"
+        f"{recent} ERROR: ZeroDivisionError: division by zero\n"
+        f"{recent} WARNING: retry scheduled\n"
+        f"{recent} INFO: job done\n"
+    )
+    (temp_logs / "api.log").write_text(f"{recent} ERROR: ZeroDivisionError in handler\n")
+
+    query = 'level>=error service:coding since:15m "ZeroDivisionError"'
+    result = await log_monitor_manager.query_logs(query)
+    assert "Matches Found:** 1" in result
+    assert "division by zero" in result
+    assert "services coding" in result
+
+    result = await log_monitor_manager.query_logs("level>=loud")
+    assert "Invalid query" in result
+
+    # Without the persistent index the in-memory store answers the same query
+    monkeypatch.setattr(log_monitor_manager, "_index_unavailable", log_monitor_manager.index.path)
+    monkeypatch.setattr(log_monitor_manager, "_index", None)
+    assert log_monitor_manager.run_query(parse_query(query))[0] == 1
+    assert log_monitor_manager.run_query(parse_query("zerodivisionerror"))[0] == 3
+    assert log_monitor_manager.run_query(parse_query("is:warning /retr(y|ied)/"))[0] == 1
+
+    monkeypatch.setattr("vectras.agents.logging_monitor.log_monitor_manager", log_monitor_manager)
+    client = TestClient(app)
+    response = client.get("/logs/query", params={"q": "service:api,coding level:error"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert data["query"]["severities"] == ["error"]
+    assert "ERROR: ZeroDivisionError in handler" in [e["content"] for e in data["entries"]]
+    assert client.get("/logs/query", params={"q": "since:never"}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_log_analytics(log_monitor_manager, temp_logs, monkeypatch):
+    """Test the analytics tool and endpoint, from the index and from the store."""
+    (temp_logs / "api.log").write_text(
+        "2024-01-01 12:00:05 ERROR: Database connection failed\n"
+        "2024-01-01 12:00:45 INFO: request done\n"
+        "2024-01-01 12:02:10 ERROR: Database connection failed\n"
+    )
+    (temp_logs / "worker.log").write_text(
+        "2024-01-01 12:00:30 ERROR: Job crashed\n2024-01-01 12:01:00 WARNING: queue slow\n"
+    )
+
+    result = await log_monitor_manager.log_analytics(hours=0)
+    assert "**Errors:** 3" in result
+    assert "**api:** 2 errors in 3 lines (66.67%)" in result
+    assert "median 62.5s" in result
+    assert "- api + worker: 1" in result
+
+    recent = await log_monitor_manager.log_analytics(hours=1)
+    assert "No log activity" in recent
+
+    from_index = log_monitor_manager.analytics(hours=0)
+    monkeypatch.setattr(log_monitor_manager, "_index_unavailable", log_monitor_manager.index.path)
+    monkeypatch.setattr(log_monitor_manager, "_index", None)
+    assert log_monitor_manager.analytics(hours=0) == from_index
+
+    monkeypatch.setattr("vectras.agents.logging_monitor.log_monitor_manager", log_monitor_manager)
+    response = TestClient(app).get("/logs/analytics", params={"hours": 0})
+    assert response.status_code == 200
+    data = response.json()
+    assert [bucket["errors"] for bucket in data["buckets"]] == [2, 0, 1]
+    assert data["co_occurrence"]["matrix"] == [[2, 1], [1, 1]]
+
+
+@pytest.mark.asyncio
+async def test_get_log_context(log_monitor_manager, temp_logs, monkeypatch):
+    """Test reading the lines around a line, from tailed files and compressed segments."""
+    lines = [f"2024-01-01 12:00:00 INFO: step {number}" for number in range(1, 2501)]
+    lines[1499] = "2024-01-01 12:00:00 ERROR: step failed"
+    (temp_logs / "api.log").write_text("\n".join(lines) + "\n")
+    with gzip.open(temp_logs / "api.log.1.gz", "wt") as f:
+        f.write("2024-01-01 11:00:00 INFO: old\n2024-01-01 11:00:01 ERROR: old failure\n")
+    (temp_logs / "worker.log").write_text("2024-01-01 12:00:00 INFO: idle\n")
+    log_monitor_manager.ingest()
+
+    result = await log_monitor_manager.get_log_context("api.log", 1500, before=2, after=1)
+    assert "**Lines:** 1498-1501" in result
+    assert "> 1500 | 2024-01-01 12:00:00 ERROR: step failed" in result
+    assert "  1498 | 2024-01-01 12:00:00 INFO: step 1498" in result
+
+    path, segment = log_monitor_manager.log_context("api.log.1.gz", 2, before=5)
+    assert segment == [
+        (1, "2024-01-01 11:00:00 INFO: old"),
+        (2, "2024-01-01 11:00:01 ERROR: old failure"),
+    ]
+
+    assert "matches several log files" in await log_monitor_manager.get_log_context("api*", 1)
+    assert "No ingested log file" in await log_monitor_manager.get_log_context("db.log", 1)
+    assert "has no line 9" in await log_monitor_manager.get_log_context("worker.log", 9, 0, 0)
+
+    monkeypatch.setattr("vectras.agents.logging_monitor.log_monitor_manager", log_monitor_manager)
+    client = TestClient(app)
+    response = client.get("/logs/context", params={"file": "api.log", "line": 2500, "after": 3})
+    assert response.status_code == 200
+    assert [entry["line_number"] for entry in response.json()["lines"]] == list(range(2495, 2501))
+    assert client.get("/logs/context", params={"file": "db.log", "line": 1}).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_logs_tail_streams_new_lines(log_monitor_manager, temp_logs, monkeypatch):
+    """Test that /logs/tail streams filtered new lines and drops clients that fall behind."""
+    log = temp_logs / "api.log"
+    log.write_text("2024-01-01 12:00:00 ERROR: backlog failure\n")
+    log_monitor_manager.ingest()
+    monkeypatch.setattr("vectras.agents.logging_monitor.log_monitor_manager", log_monitor_manager)
+
+    response = await logging_monitor.logs_tail(level="error", file="api", buffer=10)
+    events = response.body_iterator
+    assert (await anext(events)).startswith("event: subscribed\n")
+    slow = (await logging_monitor.logs_tail(buffer=1)).body_iterator
+    await anext(slow)
+
+    with log.open("a") as f:
+        f.write("2024-01-01 12:00:01 INFO: fine\n2024-01-01 12:00:02 ERROR: Database down\n")
+    (temp_logs / "worker.log").write_text("2024-01-01 12:00:03 ERROR: Job crashed\n")
+    await asyncio.to_thread(log_monitor_manager.ingest)
+
+    event = await asyncio.wait_for(anext(events), 1)
+    assert event.startswith("event: line\n")
+    line = json.loads(event.split("data: ", 1)[1])
+    assert (line["content"], line["line_number"]) == ("ERROR: Database down", 3)
+
+    # The pass had more lines than slow buffers: it gets the newest one
+    assert await asyncio.wait_for(anext(slow), 1) == 'event: skipped\ndata: {"lines": 2}\n\n'
+    assert "Job crashed" in await asyncio.wait_for(anext(slow), 1)
+
+    # Lines it does not read before the next pass get it dropped
+    for second in (4, 5):
+        with log.open("a") as f:
+            f.write(f"2024-01-01 12:00:0{second} INFO: tick\n")
+        await asyncio.to_thread(log_monitor_manager.ingest)
+    assert (await asyncio.wait_for(anext(slow), 1)).startswith("event: dropped\n")
+    with pytest.raises(StopAsyncIteration):
+        await anext(slow)
+
+    await events.aclose()
+    assert log_monitor_manager.live.stats()["subscribers"] == 0
+    assert TestClient(app).get("/logs/tail", params={"regex": "("}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_live_tail_survives_eviction_during_a_pass(log_monitor_manager, temp_logs):
+    """Test that lines evicted within the pass that stored them are not streamed."""
+    log_monitor_manager.store = LogStore(max_bytes=200_000)
+    log = temp_logs / "api.log"
+    log.write_text("2024-01-01 12:00:00 INFO: started\n")
+    log_monitor_manager.ingest()
+    subscriber = log_monitor_manager.live.subscribe(TailFilter(), buffer_size=10)
+
+    with log.open("a") as f:
+        for i in range(5000):
+            f.write(f"2024-01-01 12:00:01 INFO: request {i} served from the cache\n")
+    await asyncio.to_thread(log_monitor_manager.ingest)
+
+    assert log_monitor_manager.store.evicted_rows > 0
+    assert log_monitor_manager.ingest_passes == 2
+    records = await asyncio.wait_for(subscriber.get(), 1)
+    assert records[-1].content.endswith("request 4999 served from the cache")
+
+
 @pytest.mark.asyncio
 async def test_get_error_summary(log_monitor_manager):
     """Test getting error summary."""
@@ -144,6 +428,208 @@ async def test_get_error_summary(log_monitor_manager):
     assert "Total Errors" in result
 
 
+@pytest.mark.asyncio
+async def test_traceback_counts_as_one_error(log_monitor_manager, temp_logs):
+    """Test that a traceback is counted and summarized as a single incident."""
+    traceback = (
+        "2024-01-01 12:00:00 ERROR: Unhandled exception\n"
+        "Traceback (most recent call last):\n"
+        '  File "app.py", line 10, in handler\n'
+        "    compute()\n"
+        "ZeroDivisionError: division by zero\n"
+    )
+    (temp_logs / "app.log").write_text(traceback * 3 + "2024-01-01 12:01:00 INFO: done\n")
+
+    await log_monitor_manager.check_logs()
+    assert log_monitor_manager.error_count == 3
+    assert log_monitor_manager.store.count(errors_only=True) == 3
+
+    summary = await log_monitor_manager.get_error_summary()
+    assert "**Total Errors:** 3" in summary
+    assert "**Unique Incidents:** 1" in summary
+
+    incidents = await log_monitor_manager.get_incidents()
+    assert "**Count:** 3" in incidents
+    assert "ZeroDivisionError: division by zero" in incidents
+
+
+def test_json_lines_are_classified_by_field(log_monitor_manager, temp_logs):
+    """Test that JSON-lines logs take severity and tracebacks from their fields."""
+    traceback = (
+        "Traceback (most recent call last):\n"
+        '  File "app.py", line 10, in handler\n'
+        "    compute()\n"
+        "ZeroDivisionError: division by zero"
+    )
+    records = [
+        {"time": "2024-01-01T12:00:00", "level": "info", "msg": "retrying after error"},
+        {"time": "2024-01-01T12:00:01", "level": "error", "msg": "failed", "exc_info": traceback},
+        {"time": "2024-01-01T12:00:02", "level": "error", "msg": "failed", "exc_info": traceback},
+    ]
+    (temp_logs / "app.log").write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    log_monitor_manager.ingest()
+    store = log_monitor_manager.store
+    assert store.count() == 3
+    assert store.count(errors_only=True) == 2
+    assert log_monitor_manager.incidents.total == 2
+
+    [incident] = log_monitor_manager.incidents.top()
+    assert incident.kind == "traceback" and incident.count == 2
+    assert incident.title == "ZeroDivisionError: division by zero"
+
+
+def test_parallel_ingest_matches_sequential(log_monitor_manager, temp_logs, monkeypatch):
+    """Test that parsing in the process pool stores the same lines in file order."""
+    lines = [
+        f"2024-01-01 12:00:{i % 60:02d} {'ERROR' if i % 5 == 0 else 'INFO'}: event {i}"
+        for i in range(400)
+    ]
+    (temp_logs / "a.log").write_text("\n".join(lines) + "\n")
+    (temp_logs / "b.log").write_text("\n".join(lines[:50]) + "\n")
+
+    monkeypatch.setattr("vectras.agents.logging_monitor.PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr("vectras.utils.log_parallel.CHUNK_BYTES", 2048)
+    log_monitor_manager.parser_pool.max_workers = 2
+    try:
+        log_monitor_manager.ingest()
+    finally:
+        log_monitor_manager.parser_pool.close()
+
+    assert log_monitor_manager.parser_pool.tasks > 2
+    assert log_monitor_manager.total_entries == 450
+    assert log_monitor_manager.error_count == 90
+    file_id = log_monitor_manager.store.file_id(str(temp_logs / "a.log"))
+    records = log_monitor_manager.store.records(log_monitor_manager.store.file_rows[file_id])
+    assert [r.line_number for r in records] == list(range(1, 401))
+    assert [r.content for r in records] == [line[20:] for line in lines]
+
+
+def test_rotated_and_compressed_segments(log_monitor_manager, temp_logs):
+    """Test that rotation chains are read in order and compressed copies are not re-indexed."""
+    with gzip.open(temp_logs / "app.log.2.gz", "wt") as f:
+        f.write("2024-01-01 10:00:00 INFO: oldest\n")
+    (temp_logs / "app.log.1").write_text("2024-01-01 11:00:00 INFO: older\n")
+    live = temp_logs / "app.log"
+    live.write_text("2024-01-01 12:00:00 ERROR: first\n")
+
+    log_monitor_manager.ingest()
+    assert [r.content for r in reversed(log_monitor_manager.store.latest(10))] == [
+        "INFO: oldest",
+        "INFO: older",
+        "ERROR: first",
+    ]
+
+    # logrotate with copytruncate, after one more line was written
+    (temp_logs / "app.log.2.gz").rename(temp_logs / "app.log.3.gz")
+    (temp_logs / "app.log.1").rename(temp_logs / "app.log.2")
+    rotated = live.read_text() + "2024-01-01 12:00:01 ERROR: second\n"
+    with gzip.open(temp_logs / "app.log.1.gz", "wt") as f:
+        f.write(rotated)
+    live.write_text("2024-01-01 12:00:02 INFO: reopened\n")
+
+    new_rows = log_monitor_manager.ingest()
+    contents = [r.content for r in log_monitor_manager.store.records(new_rows)]
+    assert contents == ["ERROR: second", "INFO: reopened"]
+    assert log_monitor_manager.error_count == 2
+    assert log_monitor_manager.store.count(errors_only=True) == 2
+
+    assert len(log_monitor_manager.ingest()) == 0
+    assert log_monitor_manager.total_entries == 5
+
+
+def test_retention_settings_bound_the_store(monkeypatch, temp_logs):
+    """Test that max_log_size and max_log_entries limit the in-memory index."""
+    settings = AgentSettings(log_directory=str(temp_logs), max_log_size="64KB", max_log_entries=50)
+    monkeypatch.setattr("vectras.agents.logging_monitor._load_settings", lambda: settings)
+    manager = LogMonitorManager()
+    manager.data_directory = temp_logs / ".data"
+    assert manager.store.max_bytes == 64 * 1024
+
+    (temp_logs / "app.log").write_text(
+        "".join(f"2024-01-01 12:00:00 INFO: event {i}\n" for i in range(200))
+    )
+    manager.ingest()
+    assert len(manager.store) == 50
+    assert manager.total_entries == 200
+
+    memory = manager.memory_usage()
+    assert 0 < memory["total_bytes"] <= memory["limit_bytes"]
+    assert "Index Memory" in manager.get_status()
+
+
+def test_large_files_are_bulk_scanned_on_first_read(monkeypatch, temp_logs):
+    """Test that a first read above bulk_scan_size only stores warnings and errors."""
+    settings = AgentSettings(log_directory=str(temp_logs), bulk_scan_size="1KB")
+    monkeypatch.setattr("vectras.agents.logging_monitor._load_settings", lambda: settings)
+    manager = LogMonitorManager()
+    manager.data_directory = temp_logs / ".data"
+
+    traceback = (
+        "2024-01-01 12:00:00 ERROR: Unhandled exception\n"
+        "Traceback (most recent call last):\n"
+        '  File "app.py", line 10, in handler\n'
+        "    compute()\n"
+        "ZeroDivisionError: division by zero\n"
+    )
+    info = "".join(f"2024-01-01 12:00:01 INFO: request {i} done\n" for i in range(100))
+    log_file = temp_logs / "app.log"
+    log_file.write_text(info + traceback + info + "2024-01-01 12:00:02 WARNING: slow\n" + traceback)
+    manager.ingest()
+
+    assert manager.total_entries == 211
+    assert (manager.error_count, manager.warning_count) == (2, 1)
+    # Tracebacks are stored with their frames and line numbers, the rest only counted
+    assert manager.store.count() == 11
+    assert [r.line_number for r in manager.store.latest(2, errors_only=True)] == [207, 101]
+    [incident] = manager.incidents.top()
+    assert incident.count == 2 and incident.kind == "traceback"
+
+    # Lines appended later are read in full
+    with open(log_file, "a") as f:
+        f.write("2024-01-01 12:00:03 INFO: back to normal\n")
+    manager.ingest()
+    assert manager.store.count() == 12 and manager.total_entries == 212
+
+
+@pytest.mark.asyncio
+async def test_error_spike_is_handed_off_once(log_monitor_manager, temp_logs):
+    """Test that an error burst on the live stream leads to one debounced handoff."""
+    log_file = temp_logs / "api.log"
+    log_file.write_text("2024-01-01 12:00:00 ERROR: old failure\n" * 50)
+    log_monitor_manager.detector = RateAnomalyDetector(warmup_buckets=0)
+    log_monitor_manager.handoffs.debounce_seconds = 0
+
+    # The backlog read by the first pass does not count towards the rates
+    log_monitor_manager.ingest()
+    assert log_monitor_manager.detector.tick(now=time.time() + 120) == []
+
+    with open(log_file, "a") as f:
+        f.write("2024-01-01 12:05:00 ERROR: ZeroDivisionError: division by zero\n" * 20)
+    log_monitor_manager.ingest()
+    anomalies = log_monitor_manager.detector.tick(now=time.time() + 240)
+    assert [(a.service, a.error_type, a.count) for a in anomalies] == [("api", "exception", 20)]
+    log_monitor_manager.handoffs.add(anomalies)
+    log_monitor_manager.handoffs.add(anomalies)
+
+    response = MagicMock(status="success")
+    with patch(
+        "vectras.agents.logging_monitor.handoff_to_agent", AsyncMock(return_value=response)
+    ) as handoff:
+        record = await log_monitor_manager.dispatch_handoff()
+        assert await log_monitor_manager.dispatch_handoff() is None
+
+    handoff.assert_awaited_once()
+    target, query, context, _timeout = handoff.await_args.args
+    assert target == "coding"
+    assert "api exception: 20 errors" in query
+    assert "ZeroDivisionError: division by zero" in query
+    assert "- ERROR: ZeroDivisionError: division by zero (x20)" in query
+    assert context["anomalies"][0]["count"] == 20
+    assert record["status"] == "success"
+    assert "Last Handoff" in await log_monitor_manager.get_anomalies()
+
+
 @pytest.mark.asyncio
 async def test_get_log_monitor_status(log_monitor_manager):
     """Test getting log monitor status."""
@@ -169,6 +655,7 @@ def test_status_endpoint(test_client):
     assert data["agent"] == "Logging Monitor Agent"
     assert data["status"] == "active"
     assert "tools" in data
+    assert "total_bytes" in data["memory"]
 
 
 @pytest.mark.asyncio
@@ -200,3 +687,96 @@ async def test_query_endpoint_error(test_client):
         data = response.json()
         assert data["status"] == "error"
         assert "Error processing query" in data["response"]
+
+
+@pytest.mark.asyncio
+async def test_background_monitoring_ingests_new_lines(log_monitor_manager, temp_logs):
+    """Test that the background monitor picks up appended lines on its own."""
+    log_file = temp_logs / "live.log"
+    log_file.write_text("2024-01-01 12:00:00 INFO: started\n")
+    log_monitor_manager.monitor_interval = 0.1
+
+    await log_monitor_manager.start_monitoring()
+    try:
+        assert log_monitor_manager.is_monitoring
+        with open(log_file, "a") as f:
+            f.write("2024-01-01 12:00:01 ERROR: live failure\n")
+
+        for _ in range(100):
+            if log_monitor_manager.error_count:
+                break
+            await asyncio.sleep(0.02)
+        assert log_monitor_manager.error_count == 1
+        assert log_monitor_manager.monitor_mode in ("watchdog", "polling")
+    finally:
+        await log_monitor_manager.stop_monitoring()
+
+    assert not log_monitor_manager.is_monitoring
+    assert (log_monitor_manager.data_directory / "logging_monitor_offsets.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_monitoring_keeps_ingesting_during_a_handoff(log_monitor_manager, temp_logs):
+    """Test that a slow coding agent does not hold up ingestion."""
+    log_file = temp_logs / "live.log"
+    log_file.write_text("2024-01-01 12:00:00 INFO: started\n")
+    log_monitor_manager.monitor_interval = 0.1
+    log_monitor_manager.handoffs.debounce_seconds = 0
+    log_monitor_manager.handoffs.add([Anomaly("api", "exception", 20, 1.0, 9.0, datetime.now())])
+
+    answered = asyncio.Event()
+
+    async def slow_handoff(*args):
+        await answered.wait()
+        return MagicMock(status="success")
+
+    with patch("vectras.agents.logging_monitor.handoff_to_agent", side_effect=slow_handoff):
+        await log_monitor_manager.start_monitoring()
+        try:
+            for _ in range(100):
+                if log_monitor_manager._handoff_tasks:
+                    break
+                await asyncio.sleep(0.02)
+            assert log_monitor_manager._handoff_tasks
+
+            with open(log_file, "a") as f:
+                f.write("2024-01-01 12:00:01 ERROR: live failure\n")
+            for _ in range(100):
+                if log_monitor_manager.error_count:
+                    break
+                await asyncio.sleep(0.02)
+            assert log_monitor_manager.error_count == 1
+            assert log_monitor_manager.last_handoff is None
+
+            answered.set()
+            for _ in range(100):
+                if not log_monitor_manager._handoff_tasks:
+                    break
+                await asyncio.sleep(0.02)
+            assert log_monitor_manager.last_handoff["status"] == "success"
+        finally:
+            await log_monitor_manager.stop_monitoring()
+
+
+@pytest.mark.asyncio
+async def test_idle_watched_directory_does_not_wake_the_monitor(
+    log_monitor_manager, temp_logs, tmp_path
+):
+    """Test that reading the log files does not trigger further ingestion passes."""
+    (temp_logs / "live.log").write_text("2024-01-01 12:00:00 INFO: started\n")
+    # Keep the checkpoints and index out of the watched directory
+    log_monitor_manager.data_directory = tmp_path / "data"
+    log_monitor_manager.monitor_interval = 5
+
+    await log_monitor_manager.start_monitoring()
+    try:
+        for _ in range(100):
+            if log_monitor_manager.ingest_passes:
+                break
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.3)
+        passes = log_monitor_manager.ingest_passes
+        await asyncio.sleep(1)
+        assert log_monitor_manager.ingest_passes == passes
+    finally:
+        await log_monitor_manager.stop_monitoring()
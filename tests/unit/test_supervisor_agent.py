@@ -3,14 +3,23 @@
 
 """Unit tests for Vectras supervisor agent."""
 
+import asyncio
 import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from vectras.agents.supervisor import SupervisorManager, app
+from vectras.agents.supervisor import (
+    FIX_PIPELINE,
+    ProjectSearchIndex,
+    SupervisorManager,
+    WorkflowEngine,
+    WorkflowStep,
+    app,
+)
 
 
 @pytest.fixture
@@ -31,6 +40,8 @@ def temp_project():
 def supervisor_manager(monkeypatch, temp_project):
     """Create a supervisor manager with fake OpenAI."""
     monkeypatch.setenv("VECTRAS_FAKE_OPENAI", "1")
+    # User settings and workflow checkpoints are written relative to the working directory
+    monkeypatch.chdir(temp_project)
 
     # Create manager and then patch the instance attribute
     manager = SupervisorManager()
@@ -59,6 +70,8 @@ async def test_get_project_files(supervisor_manager):
     assert isinstance(result, str)
     assert "Project Files" in result
     assert "test.py" in result
+    # Listing walks the directory without building or loading the search index
+    assert supervisor_manager._search_index is None
 
 
 @pytest.mark.asyncio
@@ -73,6 +86,215 @@ async def test_read_file(supervisor_manager):
     assert "not found" in content
 
 
+@pytest.mark.asyncio
+async def test_read_file_ranges(supervisor_manager, temp_project):
+    """Test reading parts of a large project file."""
+    (temp_project / "big.py").write_text("".join(f"x{i} = {i}\n" for i in range(1, 5001)))
+
+    content = await supervisor_manager.read_file("big.py", start_line=10, end_line=11)
+    assert "**Lines:** 10-11" in content
+    assert "x10 = 10\nx11 = 11" in content
+    assert "x12 = 12" not in content
+
+    content = await supervisor_manager.read_file("big.py", max_bytes=1000)
+    assert "showing head and tail only" in content
+    assert "x1 = 1" in content
+    assert "x5000 = 5000" in content
+    assert "x2500 = 2500" not in content
+
+
+@pytest.mark.asyncio
+async def test_search_project(supervisor_manager, temp_project):
+    """Test indexed project search."""
+    (temp_project / "pkg").mkdir()
+    (temp_project / "pkg" / "math_utils.py").write_text(
+        "def divide(a, b):\n    return a / b\n\n\nresult = divide(4, 2)\n"
+    )
+    (temp_project / "logs").mkdir()
+    (temp_project / "logs" / "app.txt").write_text("divide failed\n")
+
+    result = await supervisor_manager.search_project("divide")
+    assert "Project Search Results" in result
+    assert "`pkg/math_utils.py:1`" in result
+    assert "`pkg/math_utils.py:5`" in result
+    assert "logs/app.txt" not in result
+    # Definitions rank ahead of uses
+    assert result.index("math_utils.py:1`") < result.index("math_utils.py:5`")
+
+    result = await supervisor_manager.search_project(r"def\s+div\w+", regex=True)
+    assert "`pkg/math_utils.py:1`" in result
+    assert "math_utils.py:5" not in result
+
+    result = await supervisor_manager.search_project("nothing_matches_this")
+    assert "No matches found" in result
+
+
+def test_search_waits_for_index_changes(temp_project):
+    """Test that a search does not read the index while a refresh is changing it."""
+    index = ProjectSearchIndex(temp_project)
+    index.refresh(force=True)
+    changing = threading.Event()
+    release = threading.Event()
+
+    def hold_lock():
+        with index._lock:
+            changing.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    changing.wait(5)
+    results = []
+    searcher = threading.Thread(target=lambda: results.append(index.search("hello")))
+    searcher.start()
+    searcher.join(0.2)
+    assert results == []
+
+    release.set()
+    searcher.join(5)
+    holder.join(5)
+    assert results[0][0][0][1] == "test.py"
+
+
+@pytest.mark.asyncio
+async def test_search_project_updates_incrementally(supervisor_manager, temp_project):
+    """Test that the index follows file changes and persists to disk."""
+    index = supervisor_manager.search_index
+    index.refresh_interval = 0
+
+    result = await supervisor_manager.search_project("hello world")
+    assert "`test.py:1`" in result
+    assert (temp_project / "data" / "project_search_index.json.gz").exists()
+
+    (temp_project / "new_module.py").write_text("GREETING = 'hello world'\n")
+    (temp_project / "test.py").unlink()
+
+    result = await supervisor_manager.search_project("hello world")
+    assert "`new_module.py:1`" in result
+    assert "test.py" not in result
+
+    # A fresh index picks up the saved state without re-indexing anything
+    supervisor_manager._search_index = None
+    assert supervisor_manager.search_index.refresh(force=True) == {
+        "added": 0,
+        "updated": 0,
+        "removed": 0,
+    }
+
+
+def test_workflow_validation():
+    """Test that invalid workflow graphs are rejected."""
+    WorkflowEngine.validate(FIX_PIPELINE)
+
+    with pytest.raises(ValueError, match="unknown"):
+        WorkflowEngine.validate([WorkflowStep("a", "coding", "q", depends_on=["missing"])])
+
+    with pytest.raises(ValueError, match="cycle"):
+        WorkflowEngine.validate(
+            [
+                WorkflowStep("a", "coding", "q", depends_on=["b"]),
+                WorkflowStep("b", "coding", "q", depends_on=["a"]),
+            ]
+        )
+
+
+@pytest.mark.asyncio
+async def test_workflow_runs_independent_steps_concurrently(tmp_path):
+    """Test that lint and test run in parallel once the fix is done."""
+    active = set()
+    overlaps = []
+    queries = {}
+
+    async def runner(agent_id, query, context):
+        active.add(context["step"])
+        overlaps.append(set(active))
+        await asyncio.sleep(0.01)
+        active.discard(context["step"])
+        queries[context["step"]] = query
+        return f"{context['step']} done"
+
+    engine = WorkflowEngine(tmp_path, runner)
+    run = await engine.run("fix", FIX_PIPELINE, {"error": "ZeroDivisionError"})
+
+    assert run.status == "completed"
+    assert {"lint", "test"} in overlaps
+    assert "ZeroDivisionError" in queries["detect"]
+    assert "analyze done" in queries["lint"]
+    assert "lint done" in queries["pull_request"]
+    assert "test done" in queries["pull_request"]
+    assert (tmp_path / f"{run.run_id}.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_workflow_resume_skips_completed_steps(tmp_path):
+    """Test that resuming a failed run only re-runs unfinished steps."""
+    calls = []
+    fail = {"test"}
+
+    async def runner(agent_id, query, context):
+        calls.append(context["step"])
+        if context["step"] in fail:
+            raise RuntimeError("tests failed")
+        return "ok"
+
+    engine = WorkflowEngine(tmp_path, runner)
+    run = await engine.run("fix", FIX_PIPELINE, {"error": "boom"})
+    assert run.status == "failed"
+    assert run.states["test"]["status"] == "failed"
+    assert run.states["pull_request"]["status"] == "pending"
+
+    # Resume from the checkpoint, as after a restart
+    fail.clear()
+    calls.clear()
+    resumed = await WorkflowEngine(tmp_path, runner).resume(run.run_id)
+    assert resumed.status == "completed"
+    assert sorted(calls) == ["pull_request", "test"]
+
+
+@pytest.mark.asyncio
+async def test_workflow_checkpoints_stay_in_their_directory(tmp_path):
+    """Test that run names and ids cannot address files outside the checkpoint directory."""
+
+    async def runner(agent_id, query, context):
+        return "ok"
+
+    steps = [WorkflowStep("a", "coding", "q")]
+    engine = WorkflowEngine(tmp_path / "workflows", runner)
+    with pytest.raises(ValueError, match="Invalid workflow name"):
+        await engine.run("../escape", steps)
+    for run_id in ("../escape", "/etc/passwd", "a/b", ""):
+        with pytest.raises(ValueError, match="Invalid workflow run id"):
+            engine.load(run_id)
+    with pytest.raises(ValueError):
+        await engine.resume("../../etc/passwd")
+    assert list(tmp_path.iterdir()) == []
+
+    # Newest first, whatever the workflow names
+    first = await engine.run("zeta", steps)
+    second = await engine.run("alpha", steps)
+    assert WorkflowEngine(tmp_path / "workflows", runner).list_runs() == [
+        second.run_id,
+        first.run_id,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_fix_workflow_reports_status(supervisor_manager, tmp_path):
+    """Test the fix workflow through the supervisor manager."""
+
+    async def runner(agent_id, query, context):
+        return f"{agent_id} ok"
+
+    supervisor_manager.workflow_engine = WorkflowEngine(tmp_path, runner)
+    result = await supervisor_manager.run_fix_workflow("divide by zero in calculator")
+    assert "Workflow Run" in result
+    assert "completed" in result
+    assert "pull_request" in result
+
+    status = supervisor_manager.get_workflow_status()
+    assert "Total Runs:** 1" in status
+
+
 @pytest.mark.asyncio
 async def test_user_settings(supervisor_manager):
     """Test user settings management."""
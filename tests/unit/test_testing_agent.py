@@ -13,8 +13,9 @@ from vectras.agents.testing import TestingAgentManager, TestingTool, app
 
 
 @pytest.fixture
-def testing_manager():
-    """Create a testing manager for tests."""
+def testing_manager(monkeypatch, tmp_path):
+    """Create a testing manager for tests, writing its tools under tmp_path."""
+    monkeypatch.chdir(tmp_path)
     return TestingAgentManager()
 
 
@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 dr.max
+
+"""Unit tests for the trigram index."""
+
+from vectras.utils.trigram import TrigramIndex, regex_literals, trigrams
+
+
+def test_trigrams_are_lowercase():
+    """Test trigram extraction."""
+    assert trigrams("AbCd") == {"abc", "bcd"}
+    assert trigrams("ab") == set()
+
+
+def test_regex_literals():
+    """Test extraction of literals required by a regex."""
+    assert regex_literals(r"def\s+load_config") == ["def", "load_config"]
+    assert regex_literals(r"Zero(Division)Error") == ["Zero", "Division", "Error"]
+    assert regex_literals(r"(foo|bar)baz") == ["baz"]
+    assert regex_literals(r"(abc)?xyz") == ["xyz"]
+    assert regex_literals(r"[") == []
+
+
+def test_candidates_and_removal():
+    """Test candidate lookup, tombstones and compaction."""
+    index = TrigramIndex()
+    index.add(0, "import os")
+    index.add(1, "import sys")
+    index.add(2, "print('hello')")
+
+    assert index.candidates(["import"]) == [0, 1]
+    assert index.candidates(["IMPORT SYS"]) == [1]
+    assert index.candidates(["missing"]) == []
+    assert index.candidates(["os"]) is None
+
+    index.remove(0)
+    assert index.candidates(["import"]) == [1]
+    index.compact()
+    assert index.doc_count == 2
+    assert index.candidates(["import"]) == [1]
+
+
+def test_discard_before():
+    """Test dropping the oldest documents."""
+    index = TrigramIndex()
+    for doc_id in range(5):
+        index.add(doc_id, f"error {doc_id}")
+    index.discard_before(3)
+    assert index.candidates(["error"]) == [3, 4]
+
+
+def test_round_trip():
+    """Test serializing and restoring an index."""
+    index = TrigramIndex()
+    index.add(0, "alpha beta")
+    index.add(1, "beta gamma")
+    restored = TrigramIndex.from_dict(index.to_dict())
+    assert restored.candidates(["beta"]) == [0, 1]
+    assert restored.candidates(["gamma"]) == [1]
+    assert restored.last_doc_id == 1
+
+
+def test_words_only_index():
+    index = TrigramIndex(words_only=True)
+    index.add(0, "connection failed: timeout")
+    index.add(1, "user login ok")
+    assert index.candidates(["nection fail"]) == [0]
+    assert index.candidates(["login"]) == [1]
+    assert index.candidates([": "]) is None
+    restored = TrigramIndex.from_dict(index.to_dict())
+    assert restored.words_only
+    assert restored.candidates(["timeout"]) == [0]